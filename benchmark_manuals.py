@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Benchmark the PDF manual pipeline.
+
+Builds the three manuals and synthetic manuals scaled up from the screenshot
+manual's sections (10x, 100x and 1000x by default), each cold (empty section
+and image caches) in a fresh worker process, and records wall time,
+throughput in pages/s, peak RSS and output size.
+
+Results can be saved as a baseline and later runs compared against it: a
+case regresses when its throughput drops, or its peak RSS or output size
+grows, by more than the threshold (20% by default).
+
+    python benchmark_manuals.py --save-baseline
+    python benchmark_manuals.py --scales 10 100       # compare to the baseline
+
+Synthetic copies repeat the screenshot manual's sections with distinct
+headings, so every section is laid out and drawn again, and with their own
+screenshots: before the timed build, every screenshot is written out once
+per copy with a few pixels changed, so each copy's screenshots are
+prepared, decoded and embedded again instead of being shared.  Writing
+them is not timed, but it takes a while: 100x writes 1,800 screenshots
+(about 0.8 GB of temporary files) and 1000x ten times as many, which is
+why 1000x is only run when asked for.
+
+--tables instead lays out a 14-column contact listing (the columns of
+Sample_Contacts.csv) of 1k, 10k and 100k rows, once with reportlab's stock
+auto-sized Table and once with manual_tables.FixedTable:
+
+    python benchmark_manuals.py --tables
+    python benchmark_manuals.py --tables 1000 10000
+"""
+
+import argparse
+import copy
+import json
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is then not reported
+    resource = None
+
+
+BASE_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = BASE_DIR / "benchmarks" / "baseline.json"
+
+MANUAL_CASES = {
+    "user": "user_manual.yaml",
+    "complete": "complete_manual.yaml",
+    "screenshot": "screenshot_manual.yaml",
+}
+DEFAULT_SCALES = (10, 100)
+DEFAULT_TABLE_ROWS = (1000, 10000, 100000)
+TABLE_KINDS = ("stock", "fixed")
+TABLE_FONT_SIZE = 7
+DEFAULT_THRESHOLD = 0.20
+
+# metric -> True if larger is better
+METRICS = {"pages_per_second": True, "peak_rss_kb": False, "output_bytes": False}
+
+
+def _write_variants(source, directory, numbers):
+    """Write source as <stem>-<number><suffix> in directory for each number, each with different pixels."""
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.load()
+        for number in numbers:
+            variant = image.copy()
+            # The copy number in binary as 16-pixel squares along the top edge, large enough to survive
+            # resampling, so no cache or dedup can share one copy's screenshots with another's.  The squares
+            # are opaque: a transparent black one would be flattened to white like a white one.
+            for bit in range(number.bit_length() + 1):
+                value = 255 if number >> bit & 1 else 0
+                fill = tuple(255 if band == "A" else value for band in variant.getbands())
+                variant.paste(fill, (16 * bit, 0, 16 * bit + 16, 16))
+            variant.save(directory / f"{source.stem}-{number}{source.suffix}", compress_level=1)
+
+
+def synthetic_screenshots(sources, scale, directory, workers=None):
+    """Write a distinct variant of every source image for each of ``scale`` copies into directory."""
+    directory.mkdir(parents=True, exist_ok=True)
+    numbers = list(range(1, scale + 1))
+    chunks = [numbers[start:start + 50] for start in range(0, len(numbers), 50)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(_write_variants, source, directory, chunk) for source in sources
+                       for chunk in chunks]:
+            future.result()
+
+
+def synthetic_definition(scale, source="screenshot_manual.yaml", image_dir=None):
+    """Return the screenshot manual with its content sections repeated ``scale`` times.
+
+    With ``image_dir``, every copy gets screenshots of its own, written
+    there by synthetic_screenshots(); otherwise the copies share the
+    manual's screenshots (which the build embeds once).
+    """
+    from manual_definitions import MANUALS_DIR, load_manual
+
+    definition = load_manual(MANUALS_DIR / source)
+    title_page, *sections = definition["sections"]
+    scaled = [title_page]
+    names = set()
+    for number in range(1, scale + 1):
+        for section in sections:
+            section = copy.deepcopy(section)
+            section["id"] = f"{section.get('id', 'section')}-{number}"
+            for block in section["blocks"]:
+                if "heading" in block:
+                    block["heading"] = f"{block['heading']} (copy {number})"
+                if "images" in block and image_dir is not None:
+                    names.update(block["images"])
+                    block["images"] = [f"{Path(name).stem}-{number}{Path(name).suffix}" for name in block["images"]]
+            scaled.append(section)
+    if image_dir is not None:
+        sources = BASE_DIR / definition.get("image_dir", "screenshots")
+        synthetic_screenshots([sources / name for name in sorted(names) if (sources / name).exists()], scale,
+                              Path(image_dir))
+        definition["image_dir"] = str(Path(image_dir).resolve())
+    definition["sections"] = scaled
+    definition["cache_name"] = f"synthetic-{scale}x"
+    definition["output"] = f"synthetic_{scale}x.pdf"
+    return definition
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _count_pages(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    return len(PdfReader(str(path)).pages)
+
+
+def table_flowable(kind, count, width):
+    """Return a listing of ``count`` synthetic contacts as a stock Table or a FixedTable."""
+    from contact_directory import CSV_COLUMNS, csv_row, synthetic_contacts
+
+    header = list(CSV_COLUMNS)
+    rows = [csv_row(contact) for contact in synthetic_contacts(count)]
+    if kind == "fixed":
+        from manual_tables import FixedTable, widths_from_sample
+
+        widths = widths_from_sample(rows[:200], width, font_size=TABLE_FONT_SIZE, header=header)
+        return FixedTable(rows, widths, header=header, font_size=TABLE_FONT_SIZE)
+
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    table = Table([header] + rows, repeatRows=1)
+    table.setStyle(TableStyle([
+        ("FONTSIZE", (0, 0), (-1, -1), TABLE_FONT_SIZE),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("LINEBELOW", (0, 0), (-1, 0), 1, colors.black),
+        ("LINEBELOW", (0, 1), (-1, -1), 1, colors.HexColor("#e0e0e0")),
+    ]))
+    return table
+
+
+def run_table_case(name):
+    """Lay out one ``table-<kind>-<rows>`` case and return its measurements."""
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.platypus import SimpleDocTemplate
+
+    _, kind, count = name.split("-")
+    count = int(count)
+    work_dir = Path(tempfile.mkdtemp(prefix="table-bench-"))
+    try:
+        output_pdf = work_dir / f"{name}.pdf"
+        start = time.perf_counter()
+        doc = SimpleDocTemplate(str(output_pdf), pagesize=landscape(A4))
+        # The frame pads its contents by 6 points on every side.
+        doc.build([table_flowable(kind, count, doc.width - 12)])
+        seconds = time.perf_counter() - start
+        return {
+            "seconds": round(seconds, 3),
+            "pages": doc.page,
+            "pages_per_second": round(doc.page / seconds, 2),
+            "rows_per_second": round(count / seconds, 1),
+            "peak_rss_kb": _peak_rss_kb(),
+            "output_bytes": output_pdf.stat().st_size,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_case(name, warm=False, stream=False):
+    """Worker entry point: build one case cold (or warm, or streamed) and return its measurements."""
+    from manual_definitions import MANUALS_DIR, build_from_definition, load_manual
+    from manual_images import ImageStore
+
+    if name.startswith("table-"):
+        return run_table_case(name)
+    work_dir = Path(tempfile.mkdtemp(prefix="manual-bench-"))
+    try:
+        if name in MANUAL_CASES:
+            definition = load_manual(MANUALS_DIR / MANUAL_CASES[name])
+        else:
+            definition = synthetic_definition(int(name.split("-")[1].rstrip("x")), image_dir=work_dir / "screenshots")
+        cache_dir = work_dir / "cache"
+        output_pdf = work_dir / definition["output"]
+
+        def build():
+            images = ImageStore(cache_dir=cache_dir / "images")
+            # force: a warm rebuild of unchanged inputs would otherwise be skipped.
+            build_from_definition(definition, output_pdf, images=images, cache_dir=cache_dir, stream=stream,
+                                  force=True)
+
+        if warm:
+            build()
+        start = time.perf_counter()
+        build()
+        seconds = time.perf_counter() - start
+
+        pages = _count_pages(output_pdf)
+        return {
+            "seconds": round(seconds, 3),
+            "pages": pages,
+            "pages_per_second": round(pages / seconds, 2) if pages else None,
+            "peak_rss_kb": _peak_rss_kb(),
+            "output_bytes": output_pdf.stat().st_size,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def case_names(manuals=True, scales=DEFAULT_SCALES):
+    names = list(MANUAL_CASES) if manuals else []
+    return names + [f"synthetic-{scale}x" for scale in scales]
+
+
+def table_case_names(rows=DEFAULT_TABLE_ROWS):
+    return [f"table-{kind}-{count}" for count in rows for kind in TABLE_KINDS]
+
+
+def run_benchmarks(names, warm=False, stream=False):
+    """Run each case in its own fresh process, so peak RSS is per case.
+
+    Warm and streamed results are keyed ``<case>:warm`` / ``<case>:stream``
+    so they never compare against cold cached builds.
+    """
+    suffix = ":warm" if warm else ":stream" if stream else ""
+    results = {}
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results[name + suffix] = pool.submit(run_case, name, warm, stream).result()
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Return a list of (case, metric, baseline, current, change) regressions."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append((name, metric, old, new, change))
+    return regressions
+
+
+def format_results(results, baseline=None):
+    baseline = baseline or {}
+    lines = [f"{'Case':<22} {'Seconds':>8} {'Pages':>6} {'Pages/s':>8} {'Peak RSS':>10} {'Size':>10} {'vs base':>8}"]
+    for name, result in results.items():
+        previous = baseline.get(name, {})
+        if previous.get("pages_per_second") and result["pages_per_second"]:
+            delta = f"{100.0 * (result['pages_per_second'] / previous['pages_per_second'] - 1):+.0f}%"
+        else:
+            delta = "-"
+        rss = "-" if result["peak_rss_kb"] is None else f"{result['peak_rss_kb'] / 1024:.0f} MB"
+        lines.append(
+            f"{name:<22} {result['seconds']:>8.2f} {result['pages'] or '-':>6} "
+            f"{result['pages_per_second'] or '-':>8} {rss:>10} {result['output_bytes'] / 1024:>7.0f} KB {delta:>8}"
+        )
+    return "\n".join(lines)
+
+
+def format_table_speedups(results):
+    """Return one line per row count comparing FixedTable to the stock Table."""
+    lines = []
+    for name, result in results.items():
+        if not name.startswith("table-fixed-"):
+            continue
+        count = name.rsplit("-", 1)[1]
+        stock = results.get(f"table-stock-{count}")
+        if stock:
+            lines.append(
+                f"{int(count):>7,} rows: FixedTable {result['rows_per_second']:,.0f} rows/s, "
+                f"stock Table {stock['rows_per_second']:,.0f} rows/s ({stock['seconds'] / result['seconds']:.1f}x)"
+            )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark manual generation.")
+    parser.add_argument("--scales", type=int, nargs="*", default=list(DEFAULT_SCALES),
+                        help="synthetic scale factors to run (default: 10 100; 1000 writes 18,000 screenshots)")
+    parser.add_argument("--no-manuals", action="store_true", help="only run the synthetic cases")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--warm", action="store_true", help="measure a rebuild with populated caches")
+    mode.add_argument("--stream", action="store_true", help="measure uncached streaming builds")
+    mode.add_argument("--tables", type=int, nargs="*", default=None, metavar="ROWS",
+                      help="compare FixedTable with the stock Table at these row counts instead "
+                           "(default: 1000 10000 100000)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed relative regression before failing (default: 0.20)")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--output", type=Path, default=None, help="also write the results as JSON here")
+    args = parser.parse_args(argv)
+
+    if args.tables is not None:
+        names = table_case_names(args.tables or DEFAULT_TABLE_ROWS)
+    else:
+        names = case_names(not args.no_manuals, args.scales)
+    if not names:
+        parser.error("nothing to run")
+
+    results = run_benchmarks(names, warm=args.warm, stream=args.stream)
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+    print(format_results(results, baseline))
+    if args.tables is not None:
+        print(format_table_speedups(results))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({**baseline, **results}, indent=2), encoding="utf-8")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, metric, old, new, change in regressions:
+        print(f"REGRESSION {name}: {metric} {old} -> {new} ({change:+.0%})")
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Build all PDF manuals in parallel, one worker process per manual.
+
+Each manual is written to a staging directory first and only moved over the
+published PDFs once every build has succeeded, so a failing build never
+leaves a mix of old and new manuals behind.
+
+With --profile DIR every build is instrumented (see manual_profile.py) and
+writes <manual>.profile.json and <manual>.profile.txt into DIR.  With
+--linearize the PDFs are rewritten for fast web view (see
+manual_linearize.py) before they are published, and with --html the
+mobile help pages (see manual_html.py) are rebuilt from the same
+definitions once the PDFs are published.
+
+A published PDF whose recorded inputs digest (see manual_definitions.py)
+matches the current inputs is not rebuilt or rewritten; --force rebuilds
+it anyway.  Set SOURCE_DATE_EPOCH (or pass --source-date-epoch) to stamp
+the manuals with a fixed date instead of the build time, so rebuilding the
+same sources produces byte-identical files.
+"""
+
+import argparse
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# name -> (generator module, output file name)
+MANUALS = {
+    "user": ("create_user_manual", "Contact_Management_System_User_Manual.pdf"),
+    "complete": ("create_enhanced_manual", "Contact_Management_System_Complete_Manual.pdf"),
+    "screenshot": ("generate_screenshot_manual_pdf", "Contact_Management_System_Screenshot_Manual.pdf"),
+}
+
+
+class ManualBuildError(RuntimeError):
+    """Raised when one or more manuals failed to build; nothing was published."""
+
+    def __init__(self, results):
+        failed = ", ".join(name for name, result in results.items() if result["error"])
+        super().__init__(f"Manual build failed: {failed}")
+        self.results = results
+
+
+def build_one(module_name, output_pdf, profile_path=None, trace_memory=True, section_workers=1,
+              linearize=False, published=None, force=False):
+    """Worker entry point: build a single manual.
+
+    Returns a dict with its wall time (``seconds``), whether ``published``
+    is already up to date (``unchanged``; nothing is built then) and, with
+    ``linearize``, the manual_linearize size report (``web``).  With
+    ``profile_path`` the build is profiled and the JSON report written
+    there (plus a .txt rendering next to it).  ``section_workers`` > 1
+    shards the manual's uncached sections over that many processes.
+    ``force`` is passed on to the manual's build_manual().
+    """
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    if published is not None and Path(published).exists():
+        from manual_definitions import up_to_date
+        from manual_linearize import is_linearized
+
+        if up_to_date(module.DEFINITION, published) and (not linearize or is_linearized(published)):
+            return {"seconds": time.perf_counter() - start, "web": None, "unchanged": True}
+    if profile_path is None:
+        module.build_manual(Path(output_pdf), workers=section_workers, force=force)
+    else:
+        from manual_profile import BuildProfiler
+
+        profiler = BuildProfiler(Path(output_pdf).stem, trace_memory=trace_memory)
+        module.build_manual(Path(output_pdf), profiler=profiler, workers=section_workers, force=force)
+        profiler.write(profile_path)
+    web = None
+    if linearize:
+        from manual_linearize import linearize_pdf
+
+        web = linearize_pdf(output_pdf)
+    return {"seconds": time.perf_counter() - start, "web": web, "unchanged": False}
+
+
+def build_all(names=None, output_dir=BASE_DIR, max_workers=None, profile_dir=None, trace_memory=True,
+              section_workers=1, linearize=False, force=False):
+    """Build the selected manuals (all by default) in a process pool.
+
+    Returns a dict of per-manual results (``seconds``, ``error``, ``output``,
+    ``unchanged`` and, with ``linearize``, the ``web`` size report).
+    Published manuals built from the current inputs are left alone unless
+    ``force`` is set.
+    Raises ManualBuildError, without touching ``output_dir``, if any build
+    fails.  ``profile_dir`` enables per-section profiling reports;
+    ``trace_memory`` controls whether they include peak memory.
+    ``section_workers`` and ``force`` are passed on to each manual's
+    build_manual().
+    """
+    names = list(names or MANUALS)
+    unknown = [name for name in names if name not in MANUALS]
+    if unknown:
+        raise ValueError(f"Unknown manual(s): {', '.join(unknown)}")
+
+    output_dir = Path(output_dir)
+    staging = Path(tempfile.mkdtemp(prefix=".manual-build-", dir=output_dir))
+    results = {}
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers or len(names)) as pool:
+            futures = {}
+            for name in names:
+                module_name, file_name = MANUALS[name]
+                profile_path = str(Path(profile_dir) / f"{name}.profile.json") if profile_dir else None
+                published = None if force else str(output_dir / file_name)
+                futures[name] = pool.submit(
+                    build_one, module_name, str(staging / file_name), profile_path, trace_memory, section_workers,
+                    linearize, published, force,
+                )
+
+            for name, future in futures.items():
+                result = {"seconds": None, "error": None, "output": str(output_dir / MANUALS[name][1]), "web": None,
+                          "unchanged": False}
+                try:
+                    result.update(future.result())
+                except Exception as exc:
+                    result["error"] = f"{type(exc).__name__}: {exc}"
+                results[name] = result
+
+        if any(result["error"] for result in results.values()):
+            raise ManualBuildError(results)
+
+        for name in names:
+            file_name = MANUALS[name][1]
+            if not results[name]["unchanged"]:
+                os.replace(staging / file_name, output_dir / file_name)
+        return results
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the PDF manuals in parallel.")
+    parser.add_argument("manuals", nargs="*", help=f"manuals to build: {', '.join(MANUALS)} (default: all)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per manual)")
+    parser.add_argument("--section-workers", type=int, default=1,
+                        help="processes each manual uses to lay out its sections (default: 1)")
+    parser.add_argument("--profile", metavar="DIR", default=None,
+                        help="write per-section timing/memory reports for each manual into DIR")
+    parser.add_argument("--profile-timing-only", action="store_true",
+                        help="skip peak memory tracing, which slows the profiled build down considerably")
+    parser.add_argument("--linearize", action="store_true",
+                        help="write linearized PDFs with object streams (needs pikepdf or qpdf)")
+    parser.add_argument("--html", action="store_true",
+                        help="also rebuild the HTML help pages in the app's wwwroot/help")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild manuals even when their inputs have not changed")
+    parser.add_argument("--source-date-epoch", type=int, default=None, metavar="SECONDS",
+                        help="date the manuals with this Unix time instead of now (sets SOURCE_DATE_EPOCH)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.manuals if name not in MANUALS]
+    if unknown:
+        parser.error(f"unknown manual(s): {', '.join(unknown)}")
+    if args.source_date_epoch is not None:
+        os.environ["SOURCE_DATE_EPOCH"] = str(args.source_date_epoch)
+
+    start = time.perf_counter()
+    try:
+        results = build_all(
+            args.manuals, max_workers=args.workers, profile_dir=args.profile,
+            trace_memory=not args.profile_timing_only, section_workers=args.section_workers,
+            linearize=args.linearize, force=args.force,
+        )
+        exit_code = 0
+    except ManualBuildError as exc:
+        results = exc.results
+        exit_code = 1
+    if args.html and exit_code == 0:
+        from manual_html import HELP_DIR, build_help_site, format_site_report
+
+        definitions = [importlib.import_module(MANUALS[name][0]).DEFINITION for name in results]
+        site = build_help_site(definitions, workers=args.section_workers)
+    total = time.perf_counter() - start
+
+    for name, result in results.items():
+        if result["error"]:
+            print(f"✗ {name:<11} FAILED  {result['error']}")
+        else:
+            unchanged = "  (unchanged)" if result["unchanged"] else ""
+            print(f"✓ {name:<11} {result['seconds']:6.2f}s  {result['output']}{unchanged}")
+            if result["web"]:
+                from manual_linearize import format_report
+
+                print(f"  {format_report('web view', result['web'])}")
+    if args.html and exit_code == 0:
+        print(format_site_report(site))
+        print(f"✓ Help pages: {HELP_DIR}")
+    print(f"Total wall time: {total:.2f}s" + ("" if exit_code == 0 else " (nothing published)"))
+    if args.profile:
+        print(f"Profiles written to {Path(args.profile).resolve()}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Check that the manual generators stay cheap to import.
+
+Each module in BUDGETS is imported in a fresh interpreter with
+``python -X importtime``.  A module fails the check when its cumulative
+import time (the median of several runs, so one slow run does not fail it)
+exceeds its budget, or when it imports a package listed in HEAVY_PACKAGES
+at import time.  The generators import reportlab, Pillow and pypdf only
+when they build a manual, so other tools can import them as libraries.
+
+    python check_import_budget.py            # exit status 1 on a violation
+    python check_import_budget.py --runs 7 --verbose
+
+tests/test_import_budget.py checks in the default test run that no module
+pulls in a heavy package; wall-clock times vary too much between machines
+for that, so the time budgets are only tested with IMPORT_BUDGET=1 set
+(run this script on a quiet machine instead).
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# module -> cumulative import time budget in milliseconds
+BUDGETS = {
+    "create_user_manual": 30,
+    "create_enhanced_manual": 30,
+    "generate_screenshot_manual_pdf": 30,
+    "build_all_manuals": 80,
+    "contact_directory": 30,
+    "contact_cards": 30,
+    "contact_import_check": 30,
+    "contact_import_stub": 30,
+    "contact_import_upload": 30,
+}
+HEAVY_PACKAGES = ("reportlab", "PIL", "pypdf", "pikepdf", "yaml")
+DEFAULT_RUNS = 5
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def import_profile(module):
+    """Return (cumulative microseconds, {imported module: cumulative microseconds}) for one fresh import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules[module], modules
+
+
+def heavy_imports(modules):
+    """Return {module: [heavy packages it imports]} for modules imported one after another in a fresh interpreter.
+
+    A module is charged only with the packages that are new after its own
+    import, so the result is exact as long as the earlier ones are clean.
+    """
+    script = (
+        "import importlib, json, sys\n"
+        f"heavy = {HEAVY_PACKAGES!r}\n"
+        "seen = {}\n"
+        "for module in sys.argv[1:]:\n"
+        "    before = {name.split('.')[0] for name in sys.modules}\n"
+        "    importlib.import_module(module)\n"
+        "    seen[module] = sorted({name.split('.')[0] for name in sys.modules} - before & set(heavy))\n"
+        "print(json.dumps(seen))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script, *modules], cwd=BASE_DIR, capture_output=True, text=True,
+                            check=True)
+    return json.loads(result.stdout)
+
+
+def check(module, budget_ms, runs=DEFAULT_RUNS):
+    """Return (median ms, heavy packages imported, slowest imports) for module."""
+    times = []
+    for _ in range(runs):
+        total, modules = import_profile(module)
+        times.append(total / 1000.0)
+    heavy = sorted({name.split(".")[0] for name in modules if name.split(".")[0] in HEAVY_PACKAGES})
+    slowest = sorted(
+        ((name, micros / 1000.0) for name, micros in modules.items() if name != module),
+        key=lambda item: -item[1],
+    )[:5]
+    return statistics.median(times), heavy, slowest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enforce the import-time budget of the manual generators.")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="imports per module (median is used)")
+    parser.add_argument("--verbose", action="store_true", help="list the slowest imports of every module")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for module, budget in BUDGETS.items():
+        median, heavy, slowest = check(module, budget, args.runs)
+        problems = []
+        if median > budget:
+            problems.append(f"over budget of {budget} ms")
+        if heavy:
+            problems.append(f"imports {', '.join(heavy)} at import time")
+        mark = "✗" if problems else "✓"
+        print(f"{mark} {module:<32} {median:7.1f} ms  (budget {budget} ms)  {'; '.join(problems)}".rstrip())
+        if problems or args.verbose:
+            for name, milliseconds in slowest:
+                print(f"    {milliseconds:7.1f} ms  {name}")
+        failures += bool(problems)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+"""
+Per-contact "contact card" PDFs for offline field use.
+
+Each card is one A5 page or more with what the app's Details view shows
+for a contact: the profile photo (PhotoPath), basic, contact, address and
+identity information, bank accounts, the documents on file and other
+details.  Contacts are read from a JSON or JSON Lines export using the
+Contact model's property names (BankAccounts and Documents nested, any
+letter case), or from a CSV in the Sample_Contacts.csv layout.
+
+Cards are laid out in a process pool, CHUNK_SIZE contacts per task.  Every
+worker builds the shared styles (manual_styles) and fonts once, and keeps
+one CardRenderer for all of its cards.  Profile photos go through
+PhotoCache: each distinct photo is resampled once to the size it is drawn
+at and stored under .manual_cache/photos/ named by the sha256 of its
+contents, so workers and later runs share it, and contacts with the same
+photo file share its decoded stream through a manual_memory.ImageBufferCache.
+
+Finished cards are written, in input order, to a directory or, for an
+output ending in .zip, into a zip archive as they arrive; only a few
+chunks are in flight at a time, so memory does not grow with the number
+of contacts.  A contact whose card cannot be built is reported with its
+error and the batch carries on; a photo that is missing or unreadable is
+left off the card and reported too.
+
+    python contact_cards.py contacts.jsonl -o contact_cards/
+    python contact_cards.py contacts.json -o /tmp/cards.zip --workers 8 --failures /tmp/failures.csv
+    python contact_cards.py --synthetic 5000 -o /tmp/cards.zip
+
+Set SOURCE_DATE_EPOCH for reproducible cards and zip entries.
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent
+# manual_cache.CACHE_DIR, without importing reportlab for --help.
+CACHE_DIR = BASE_DIR / ".manual_cache"
+WEB_ROOT = BASE_DIR / "ContactManagementAPI" / "wwwroot"
+OUTPUT_DIR = BASE_DIR / "contact_cards"
+PHOTO_CACHE_DIR = CACHE_DIR / "photos"
+SYNTHETIC_UPLOADS = CACHE_DIR / "synthetic-uploads"
+
+CHUNK_SIZE = 100
+# Chunks queued per worker; results are written in input order.
+IN_FLIGHT = 2
+PHOTO_FORMATS = ("jpeg", "png", "original")
+# 3 cm wide, at most 4 cm high.
+PHOTO_WIDTH = 85
+PHOTO_HEIGHT = 113
+# Decoded photo streams each worker keeps for cards that share a photo.
+PHOTO_BUFFER_BYTES = 32 * 1024 * 1024
+MARGIN = 34
+FONT_SIZE = 9
+# Failed contacts listed by CardReport.format(); --failures writes them all.
+MAX_LISTED = 20
+SYNTHETIC_PHOTOS = 50
+
+# Sections of the app's Details view: (heading, [(label, field)]).
+DETAIL_SECTIONS = (
+    ("Basic Information", (("Nick Name", "nickname"), ("Gender", "gender"), ("Date of Birth", "dateofbirth"),
+                           ("Group", "group"))),
+    ("Contact Information", (("Email", "email"), ("Mobile 1", "mobile1"), ("Mobile 2", "mobile2"),
+                             ("Mobile 3", "mobile3"), ("WhatsApp", "whatsappnumber"))),
+    ("Address Information", (("Address", "address"), ("City", "city"), ("State", "state"),
+                             ("Postal Code", "postalcode"), ("Country", "country"))),
+    ("Identity Information", (("Passport Number", "passportnumber"), ("PAN Number", "pannumber"),
+                              ("Aadhar Number", "aadharnumber"), ("Driving License Number", "drivinglicensenumber"),
+                              ("Voters ID", "votersid"))),
+)
+# DateTime fields of the contact (Document.UploadedAt is one too).
+DATE_FIELDS = ("dateofbirth",)
+BANK_COLUMNS = (("Account Number", "accountnumber", 2), ("Bank Name", "bankname", 2),
+                ("Branch Name", "branchname", 2), ("IFSC Code", "ifsccode", 1.4))
+DOCUMENT_COLUMNS = (("Type", 1.2), ("File", 3), ("Size", 1), ("Uploaded", 1.3))
+
+
+def normalise(value):
+    """Return a contact with every key lower-cased, so PascalCase and camelCase exports read the same."""
+    if isinstance(value, dict):
+        return {str(key).lower(): normalise(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [normalise(item) for item in value]
+    return value
+
+
+def read_contacts(path):
+    """Yield the contacts of a .json (array), .jsonl or .csv export as dicts."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        from contact_directory import read_contacts as read_csv
+
+        yield from read_csv(path)
+    elif suffix == ".jsonl":
+        with open(path, encoding="utf-8-sig") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, encoding="utf-8-sig") as handle:
+            yield from json.load(handle)
+
+
+def card_name(contact, number):
+    """Return the file name of a contact's card: its Id, or its row number when it has none."""
+    contact_id = contact.get("id", contact.get("Id"))
+    if contact_id in (None, ""):
+        return f"contact-row{number}.pdf"
+    safe = "".join(char if char.isalnum() or char in "-_" else "_" for char in str(contact_id))
+    return f"contact-{safe}.pdf"
+
+
+def resolve_upload(photo_path, uploads_root, web_root=WEB_ROOT):
+    """Return the file behind a stored /uploads/... path, as FileUploadService resolves it.
+
+    Raises ValueError for a path that leads out of its root (``..``, links),
+    so a crafted PhotoPath cannot embed other local files in a card.
+    """
+    normalised = "/" + photo_path.strip().replace("\\", "/").lstrip("/")
+    if normalised.lower().startswith("/uploads/"):
+        root, relative = Path(uploads_root).resolve(), normalised[len("/uploads/"):]
+    else:
+        root, relative = Path(web_root).resolve(), normalised.lstrip("/")
+    path = (root / relative).resolve()
+    if not path.is_relative_to(root):
+        raise ValueError(f"{photo_path} is outside {root}")
+    return path
+
+
+def default_uploads_root():
+    """UPLOADS_ROOT when it is set, as in the app, else wwwroot/uploads."""
+    return Path(os.environ.get("UPLOADS_ROOT", "").strip() or WEB_ROOT / "uploads")
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, dict):  # a nested Group
+        return _text(value.get("name"))
+    return " ".join(str(value).split())
+
+
+def _date(value):
+    """Return a DateTime value (1990-05-01T00:00:00) as its date; the cards show no times."""
+    text = _text(value)
+    if len(text) >= 19 and text[4] == "-" and text[10] == "T":
+        return text[:10]
+    return text
+
+
+def _file_size(size):
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        return ""
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    return f"{max(1, round(size / 1024))} KB"
+
+
+class PhotoCache:
+    """Profile photos resampled once per distinct content and shared across cards.
+
+    Prepared files are named by the sha256 of the source photo (see
+    manual_images.prepare_screenshot), so they are shared between worker
+    processes and runs; within a process the prepared photo is looked up
+    by that digest, and ``buffers`` holds its decoded stream.
+    """
+
+    def __init__(self, uploads_root, web_root=WEB_ROOT, image_format="jpeg", cache_dir=PHOTO_CACHE_DIR):
+        from manual_memory import ImageBufferCache
+
+        self.uploads_root = Path(uploads_root)
+        self.web_root = Path(web_root)
+        self.image_format = image_format
+        self.cache_dir = Path(cache_dir)
+        self.buffers = ImageBufferCache(max_bytes=PHOTO_BUFFER_BYTES)
+        self._prepared = {}
+
+    def get(self, photo_path):
+        """Return the PreparedImage for a stored PhotoPath; raises OSError if it cannot be read."""
+        from manual_cache import file_digest
+        from manual_images import prepare_screenshot
+
+        source = resolve_upload(photo_path, self.uploads_root, self.web_root)
+        digest = file_digest(source)
+        prepared = self._prepared.get(digest)
+        if prepared is None:
+            prepared = self._prepared[digest] = prepare_screenshot(
+                source, PHOTO_WIDTH, image_format=self.image_format, cache_dir=self.cache_dir,
+            )
+        return prepared
+
+    def flowable(self, prepared):
+        from manual_images import LazyImage
+
+        width, height = prepared.size
+        scale = min(PHOTO_WIDTH / width, PHOTO_HEIGHT / height)
+        return LazyImage(prepared.path, width * scale, height * scale, hAlign="LEFT", buffers=self.buffers)
+
+    def close(self):
+        self.buffers.close()
+
+
+class CardRenderer:
+    """Lays out contact cards with one set of styles, fonts and photos, reused for every card."""
+
+    def __init__(self, font="Helvetica", uploads_root=None, web_root=WEB_ROOT, photo_format="jpeg"):
+        from manual_definitions import source_date
+        from manual_fonts import bold_font_name
+        from manual_styles import derive_style
+
+        self.font = font
+        self.bold_font = bold_font_name(font)
+        self.photos = PhotoCache(uploads_root or default_uploads_root(), web_root, photo_format)
+        self.generated = source_date().strftime("%Y-%m-%d %H:%M:%S")
+        self.name_style = derive_style("CustomTitle", "CardName", fontSize=18, leading=22, alignment="left",
+                                       spaceAfter=4, fontName=self.bold_font)
+        self.heading_style = derive_style("CustomSubHeading", "CardHeading", spaceBefore=8, spaceAfter=4,
+                                          keepWithNext=1, fontName=self.bold_font)
+        self.body_style = derive_style("CustomBody", "CardBody", alignment="left", fontName=self.font)
+
+    def _table(self, rows, weights, width, header=None):
+        from manual_tables import FixedTable, widths_from_schema
+
+        return FixedTable(rows, widths_from_schema(weights, width), header=header, font_name=self.font,
+                          bold_font=self.bold_font, font_size=FONT_SIZE, overflow="wrap")
+
+    def _paragraph(self, text, style):
+        from xml.sax.saxutils import escape
+
+        from reportlab.platypus import Paragraph
+
+        return Paragraph(escape(text), style)
+
+    def story(self, contact, problems, width):
+        """Return the flowables of one (normalised) contact's card; photo problems are appended to problems."""
+        from reportlab.platypus import Table, TableStyle
+
+        if not _text(contact.get("firstname")):
+            raise ValueError("FirstName is required")
+        name = f"{_text(contact.get('firstname'))} {_text(contact.get('lastname'))}".strip()
+        title = [self._paragraph(name, self.name_style)]
+        if _text(contact.get("id")):
+            title.append(self._paragraph(f"Contact #{_text(contact.get('id'))}", self.body_style))
+
+        photo = ""
+        photo_path = _text(contact.get("photopath"))
+        if photo_path:
+            try:
+                photo = self.photos.flowable(self.photos.get(photo_path))
+            except Exception as exc:  # a missing or unreadable photo leaves the card without one
+                problems.append(("no photo", f"{photo_path}: {type(exc).__name__}: {exc}"))
+        header = Table([[photo, title]], colWidths=[PHOTO_WIDTH + 12, width - PHOTO_WIDTH - 12])
+        header.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "TOP"), ("LEFTPADDING", (0, 0), (0, 0), 0)]))
+        story = [header]
+
+        for heading, fields in DETAIL_SECTIONS:
+            rows = [[label, (_date if field in DATE_FIELDS else _text)(contact.get(field))] for label, field in fields
+                    if _text(contact.get(field))]
+            if rows:
+                story += [self._paragraph(heading, self.heading_style), self._table(rows, (1, 2.4), width)]
+
+        accounts = contact.get("bankaccounts") or []
+        if not accounts and _text(contact.get("bankaccountnumber")):
+            # Contacts from before BankAccounts keep a single account on the contact itself.
+            accounts = [{"accountnumber": contact.get("bankaccountnumber"), "bankname": contact.get("bankname"),
+                         "branchname": contact.get("branchname"), "ifsccode": contact.get("ifsccode")}]
+        if accounts:
+            story.append(self._paragraph("Bank Information", self.heading_style))
+            story.append(self._table(
+                [[_text(account.get(field)) for _, field, _ in BANK_COLUMNS] for account in accounts],
+                [weight for _, _, weight in BANK_COLUMNS], width, header=[label for label, _, _ in BANK_COLUMNS],
+            ))
+
+        documents = contact.get("documents") or []
+        if documents:
+            story.append(self._paragraph(f"Documents ({len(documents)})", self.heading_style))
+            story.append(self._table(
+                [[_text(document.get("documenttype")), _text(document.get("filename")),
+                  _file_size(document.get("filesize")), _date(document.get("uploadedat"))] for document in documents],
+                [weight for _, weight in DOCUMENT_COLUMNS], width, header=[label for label, _ in DOCUMENT_COLUMNS],
+            ))
+
+        if _text(contact.get("otherdetails")):
+            story.append(self._paragraph("Other Details", self.heading_style))
+            story.append(self._paragraph(_text(contact.get("otherdetails")), self.body_style))
+        return story
+
+    def render(self, contact, number):
+        """Return (PDF bytes, problems) for one contact dict."""
+        from reportlab.lib.pagesizes import A5
+        from reportlab.platypus import SimpleDocTemplate
+
+        contact = normalise(contact)
+        problems = []
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A5, leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN,
+                                bottomMargin=MARGIN + 12, title=card_name(contact, number)[:-4])
+        footer = f"{card_name(contact, number)[:-4]} | Generated on {self.generated}"
+        page_width = doc.pagesize[0]
+
+        def decorate(canvas, doc):
+            canvas.saveState()
+            canvas.setFont(self.font, 7)
+            canvas.setFillColor("#666666")
+            canvas.drawCentredString(page_width / 2, MARGIN / 2, f"{footer} | Page {doc.page}")
+            canvas.restoreState()
+
+        # The frame pads its contents by 6 points on every side.
+        doc.build(self.story(contact, problems, doc.width - 12), onFirstPage=decorate, onLaterPages=decorate)
+        return buffer.getvalue(), problems
+
+
+_renderer = None
+
+
+def _start_worker(options):
+    global _renderer
+    _renderer = CardRenderer(**options)
+
+
+def render_chunk(start, contacts):
+    """Worker entry point: render contacts numbered from start.
+
+    Returns [(card name, PDF bytes or None, [(status, message)])]; a card
+    that fails is returned with status "failed" instead of raising.
+    """
+    results = []
+    for number, contact in enumerate(contacts, start):
+        name = card_name(contact, number)
+        try:
+            pdf, problems = _renderer.render(contact, number)
+        except Exception as exc:
+            pdf, problems = None, [("failed", f"{type(exc).__name__}: {exc}")]
+        results.append((name, pdf, problems))
+    return results
+
+
+class CardSink:
+    """Writes finished cards into a directory or, for a .zip output, a zip archive."""
+
+    def __init__(self, output):
+        self.output = Path(output)
+        self.output_bytes = 0
+        self._names = set()
+        self._zip = None
+        if self.output.suffix.lower() == ".zip":
+            import zipfile
+
+            from manual_definitions import source_date
+
+            self.output.parent.mkdir(parents=True, exist_ok=True)
+            # PDF streams are compressed already, so the cards are stored as they are.
+            self._zip = zipfile.ZipFile(self.output, "w", zipfile.ZIP_STORED)
+            self._zip_info = zipfile.ZipInfo
+            self._date_time = max(source_date().timetuple()[:6], (1980, 1, 1, 0, 0, 0))
+        else:
+            self.output.mkdir(parents=True, exist_ok=True)
+
+    def write(self, name, data, number):
+        """Write one card; a name already used (a repeated Id) gets the row number appended."""
+        if name in self._names:
+            name = f"{name[:-4]}-row{number}.pdf"
+        self._names.add(name)
+        if self._zip is not None:
+            info = self._zip_info(name, self._date_time)
+            info.external_attr = 0o644 << 16
+            self._zip.writestr(info, data)
+        else:
+            (self.output / name).write_bytes(data)
+        self.output_bytes += len(data)
+        return name
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self.output_bytes = self.output.stat().st_size
+
+
+class CardReport:
+    """Cards written, per-contact problems, time and size of one batch."""
+
+    def __init__(self, output):
+        self.output = Path(output)
+        self.cards = 0
+        self.contacts = 0
+        # (row number, card name, status, message)
+        self.problems = []
+        self.seconds = 0.0
+        self.output_bytes = 0
+
+    @property
+    def failed(self):
+        return [problem for problem in self.problems if problem[2] == "failed"]
+
+    @property
+    def cards_per_second(self):
+        return self.cards / self.seconds if self.seconds else None
+
+    def as_dict(self):
+        return {
+            "output": str(self.output),
+            "contacts": self.contacts,
+            "cards": self.cards,
+            "failed": len(self.failed),
+            "without_photo": sum(1 for problem in self.problems if problem[2] == "no photo"),
+            "seconds": round(self.seconds, 3),
+            "cards_per_second": round(self.cards_per_second or 0, 1),
+            "output_bytes": self.output_bytes,
+        }
+
+    def write_problems(self, path):
+        """Write every problem as CSV: row, card, status, message."""
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["row", "card", "status", "message"])
+            writer.writerows(self.problems)
+
+    def format(self):
+        summary = self.as_dict()
+        lines = [
+            f"{self.cards:,} of {self.contacts:,} cards in {self.seconds:.2f}s "
+            f"({self.cards_per_second or 0:,.0f} cards/s), {self.output_bytes / (1024 * 1024):,.1f} MB; "
+            f"{summary['failed']:,} failed, {summary['without_photo']:,} without photo"
+        ]
+        failed = self.failed
+        for number, name, _, message in failed[:MAX_LISTED]:
+            lines.append(f"  row {number} ({name}): {message}")
+        if len(failed) > MAX_LISTED:
+            lines.append(f"  ... and {len(failed) - MAX_LISTED:,} more")
+        return "\n".join(lines)
+
+
+def _chunks(contacts, chunk_size):
+    contacts = iter(contacts)
+    start = 1
+    while True:
+        chunk = list(itertools.islice(contacts, chunk_size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def _collect(report, sink, start, chunk, results):
+    report.contacts += len(chunk)
+    for number, (name, pdf, problems) in enumerate(results, start):
+        if pdf is not None:
+            name = sink.write(name, pdf, number)
+            report.cards += 1
+        report.problems.extend((number, name, status, message) for status, message in problems)
+
+
+def _pool_results(start, chunk, future):
+    try:
+        return future.result()
+    except Exception as exc:  # the worker died; every contact of the chunk failed with it
+        error = [("failed", f"{type(exc).__name__}: {exc}")]
+        return [(card_name(contact, number), None, error) for number, contact in enumerate(chunk, start)]
+
+
+def generate_cards(contacts, output=OUTPUT_DIR, workers=None, chunk_size=CHUNK_SIZE, font="Helvetica",
+                   uploads_root=None, web_root=WEB_ROOT, photo_format="jpeg"):
+    """Write a card for every contact dict to output (a directory or a .zip) and return a CardReport.
+
+    ``workers`` defaults to the number of CPUs; with 1 the cards are laid
+    out in this process.  ``uploads_root`` is where /uploads/... photo
+    paths live (default_uploads_root() by default).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from manual_fonts import bold_font_name
+
+    if photo_format not in PHOTO_FORMATS:
+        raise ValueError(f"photo_format must be one of {PHOTO_FORMATS}, not {photo_format!r}")
+    # Checked here, or every worker would fail each of its contacts on it.
+    bold_font_name(font)
+    start_time = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    options = dict(font=font, uploads_root=str(uploads_root or default_uploads_root()), web_root=str(web_root),
+                   photo_format=photo_format)
+    report = CardReport(output)
+    sink = CardSink(output)
+    try:
+        if workers == 1:
+            _start_worker(options)
+            for start, chunk in _chunks(contacts, chunk_size):
+                _collect(report, sink, start, chunk, render_chunk(start, chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker, initargs=(options,)) as pool:
+                pending = deque()
+                for start, chunk in _chunks(contacts, chunk_size):
+                    pending.append((start, chunk, pool.submit(render_chunk, start, chunk)))
+                    if len(pending) >= workers * IN_FLIGHT:
+                        start, chunk, future = pending.popleft()
+                        _collect(report, sink, start, chunk, _pool_results(start, chunk, future))
+                while pending:
+                    start, chunk, future = pending.popleft()
+                    _collect(report, sink, start, chunk, _pool_results(start, chunk, future))
+    finally:
+        sink.close()
+        if _renderer is not None and workers == 1:
+            _renderer.photos.close()
+    report.output_bytes = sink.output_bytes
+    report.seconds = time.perf_counter() - start_time
+    return report
+
+
+def synthetic_photos(uploads_root, count=SYNTHETIC_PHOTOS):
+    """Write ``count`` made-up profile photos under uploads_root/photos (once) and return their PhotoPaths."""
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError:  # without Pillow the synthetic contacts have no photos
+        return []
+    paths = []
+    for number in range(count):
+        path = Path(uploads_root) / "photos" / f"synthetic-{number}.jpg"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            hue = (number * 47) % 256
+            image = Image.new("RGB", (600, 800), (hue, 180, 255 - hue))
+            ImageDraw.Draw(image).ellipse((150, 120, 450, 420), fill=(240, 220, 200))
+            ImageDraw.Draw(image).ellipse((60, 480, 540, 960), fill=(60, 60, 90))
+            image.save(path, "JPEG", quality=90)
+        paths.append(f"/uploads/photos/{path.name}")
+    return paths
+
+
+def synthetic_card_contacts(count, photo_paths=()):
+    """Yield ``count`` made-up contacts with bank accounts, documents and photos, for benchmarks."""
+    from contact_directory import synthetic_contacts
+
+    for number, contact in enumerate(synthetic_contacts(count), 1):
+        contact.update(
+            Id=number,
+            Gender=("Male", "Female")[number % 2],
+            DateOfBirth=f"{1950 + number % 50}-{number % 12 + 1:02d}-{number % 28 + 1:02d}T00:00:00",
+            PanNumber=f"ABCDE{number % 10000:04d}F",
+            PhotoPath=photo_paths[number % len(photo_paths)] if photo_paths else None,
+            BankAccounts=[
+                {"AccountNumber": f"{number:08d}{index}", "BankName": "State Bank", "BranchName": "Main Branch",
+                 "IfscCode": f"SBIN000{number % 1000:04d}"}
+                for index in range(number % 3)
+            ],
+            Documents=[
+                {"DocumentType": ("ID", "Address", "Contract")[index], "FileName": f"document-{number}-{index}.pdf",
+                 "FileSize": 40000 + number % 500000, "UploadedAt": "2025-01-15T10:30:00"}
+                for index in range(number % 4)
+            ],
+        )
+        yield contact
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write one contact card PDF per contact.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("contacts", nargs="?", type=Path, help="contacts export: .json, .jsonl or .csv")
+    source.add_argument("--synthetic", type=int, metavar="N", help="use N made-up contacts instead")
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT_DIR,
+                        help=f"output directory, or a .zip file (default: {OUTPUT_DIR.name}/)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help=f"contacts per task (default: {CHUNK_SIZE})")
+    parser.add_argument("--font", default="Helvetica",
+                        help="a built-in font such as Helvetica, Times-Roman or Courier, or an embedded family "
+                             "such as Lato for non-Latin names")
+    parser.add_argument("--uploads-root", type=Path, default=None,
+                        help="where /uploads/... photos live (default: $UPLOADS_ROOT or wwwroot/uploads)")
+    parser.add_argument("--photo-format", choices=PHOTO_FORMATS, default="jpeg",
+                        help="how photos are re-encoded for the cards (default: jpeg)")
+    parser.add_argument("--failures", type=Path, default=None, help="write every per-contact problem to this CSV")
+    args = parser.parse_args(argv)
+
+    uploads_root = args.uploads_root
+    if args.synthetic is not None:
+        uploads_root = uploads_root or SYNTHETIC_UPLOADS
+        contacts = synthetic_card_contacts(args.synthetic, synthetic_photos(uploads_root))
+    else:
+        contacts = read_contacts(args.contacts)
+    try:
+        report = generate_cards(contacts, args.output, workers=args.workers, chunk_size=args.chunk_size,
+                                font=args.font, uploads_root=uploads_root, photo_format=args.photo_format)
+    except (ValueError, LookupError) as exc:
+        print(f"✗ {exc}", file=sys.stderr)
+        return 2
+    if args.failures:
+        report.write_problems(args.failures)
+    print(f"{'✓' if not report.failed else '✗'} Cards written: {report.output}")
+    print(report.format())
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
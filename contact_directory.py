@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Offline contact directory PDFs from a contacts CSV export.
+
+ImportExportService.ExportToPdf builds the whole contact list in memory for
+every request, which does not scale to large tenants.  This script produces
+the same directory (A4 landscape, Name / Email / Mobile 1 / Mobile 2 /
+City / State) offline from a CSV in the Sample_Contacts.csv layout.
+
+Rows are read one at a time and laid out through
+manual_streaming.StreamingDocTemplate as manual_tables.FixedTable chunks
+of one page each.  Column widths and row heights are fixed up front and
+every value is truncated to its column with cached string widths, so no
+cell is ever measured by reportlab and no table needs splitting.  Only the
+chunk being laid out is held as flowables; finished pages are kept
+compressed until the file is written.
+
+With --all-columns every column of the CSV is listed, sized from the
+widths of the first SAMPLE_ROWS rows.  A CSV without contacts gives one
+page with just the header row.  --font takes a built-in font or a
+manual_fonts.FONT_FAMILIES family; the header row uses its bold face.
+
+    python contact_directory.py contacts.csv -o Contact_Directory.pdf
+    python contact_directory.py --synthetic 100000 -o /tmp/directory.pdf
+
+The footer is dated like the manuals, so SOURCE_DATE_EPOCH makes the
+output reproducible.
+"""
+
+import argparse
+import csv
+import itertools
+import sys
+import time
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent
+OUTPUT_PDF = BASE_DIR / "Contact_Directory.pdf"
+
+# The header of Sample_Contacts.csv, which ImportFromCsv reads.
+CSV_COLUMNS = (
+    "FirstName", "LastName", "NickName", "Email", "Mobile1", "Mobile2", "Mobile3", "WhatsAppNumber",
+    "Address", "City", "State", "PostalCode", "Country", "OtherDetails",
+)
+
+# (heading, relative width), as in ExportToPdf.
+DIRECTORY_COLUMNS = (("Name", 2), ("Email", 2), ("Mobile 1", 1.5), ("Mobile 2", 1.5), ("City", 2), ("State", 1.5))
+
+TITLE = "Contact List"
+FONT_SIZE = 9
+ALL_COLUMNS_FONT_SIZE = 7
+TITLE_SIZE = 20
+CELL_PADDING = 5
+# Rows --all-columns measures to size its columns.
+SAMPLE_ROWS = 200
+
+
+def read_contacts(path):
+    """Yield each row of a contacts CSV as a dict keyed by its header."""
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        yield from csv.DictReader(handle)
+
+
+def synthetic_contacts(count):
+    """Yield ``count`` made-up contacts in the Sample_Contacts.csv layout, for benchmarks."""
+    cities = (("New York", "NY"), ("Los Angeles", "CA"), ("Chicago", "IL"), ("Houston", "TX"), ("Phoenix", "AZ"))
+    for number in range(1, count + 1):
+        city, state = cities[number % len(cities)]
+        yield {
+            "FirstName": f"Contact{number}",
+            "LastName": f"Surname{number % 9973}",
+            "NickName": f"C{number}" if number % 4 else "",
+            "Email": f"contact{number}@example.com",
+            "Mobile1": f"+1-555-{number % 10000:04d}",
+            "Mobile2": f"+1-556-{number % 10000:04d}" if number % 3 else "",
+            "Mobile3": "",
+            "WhatsAppNumber": f"+1-555-{number % 10000:04d}",
+            "Address": f"{number % 900 + 100} Main St",
+            "City": city,
+            "State": state,
+            "PostalCode": f"{number % 90000 + 10000}",
+            "Country": "USA",
+            "OtherDetails": "Imported contact" if number % 5 else "",
+        }
+
+
+def directory_row(contact):
+    """Return the directory cells of one contact; missing values print as "-" like ExportToPdf."""
+    def value(key):
+        text = " ".join((contact.get(key) or "").split())
+        return text or "-"
+
+    name = " ".join(f"{contact.get('FirstName') or ''} {contact.get('LastName') or ''}".split())
+    return [name or "-", value("Email"), value("Mobile1"), value("Mobile2"), value("City"), value("State")]
+
+
+def csv_row(contact):
+    """Return every CSV_COLUMNS value of one contact, for --all-columns."""
+    return [" ".join((contact.get(key) or "").split()) for key in CSV_COLUMNS]
+
+
+class DirectoryLayout:
+    """Fixed page, column and row metrics for a directory, computed once."""
+
+    def __init__(self, doc, col_widths, header, font="Helvetica", bold_font="Helvetica-Bold", font_size=FONT_SIZE):
+        self.header = header
+        self.col_widths = col_widths
+        self.font = font
+        self.bold_font = bold_font
+        self.font_size = font_size
+        row_height = font_size * 1.2 + 2 * CELL_PADDING
+        # The frame pads its contents by 6 points on every side; one row is the header.
+        self.rows_per_page = max(1, int((doc.height - 12) // row_height) - 1)
+
+    def table(self, rows):
+        from manual_tables import FixedTable
+
+        return FixedTable(rows, self.col_widths, header=self.header, font_name=self.font, bold_font=self.bold_font,
+                          font_size=self.font_size, padding=CELL_PADDING)
+
+
+def directory_tables(rows, layout):
+    """Yield one FixedTable per page of directory rows; no rows give one page with just the header."""
+    rows = iter(rows)
+    chunk = list(itertools.islice(rows, layout.rows_per_page))
+    while True:
+        yield layout.table(chunk)
+        chunk = list(itertools.islice(rows, layout.rows_per_page))
+        if not chunk:
+            return
+
+
+class DirectoryReport:
+    """Rows, pages, size, time and peak memory of one export."""
+
+    def __init__(self, output, rows, pages, seconds, output_bytes, peak_rss):
+        self.output = Path(output)
+        self.rows = rows
+        self.pages = pages
+        self.seconds = seconds
+        self.output_bytes = output_bytes
+        self.peak_rss = peak_rss
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else None
+
+    def as_dict(self):
+        return {
+            "output": str(self.output),
+            "rows": self.rows,
+            "pages": self.pages,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second or 0, 1),
+            "output_bytes": self.output_bytes,
+            "peak_rss": self.peak_rss,
+        }
+
+    def format(self):
+        rss = "-" if self.peak_rss is None else f"{self.peak_rss / (1024 * 1024):.0f} MB"
+        return (
+            f"{self.rows:,} contacts, {self.pages:,} pages in {self.seconds:.2f}s "
+            f"({self.rows_per_second or 0:,.0f} rows/s), {self.output_bytes / 1024:,.0f} KB, peak RSS {rss}"
+        )
+
+
+def export_directory(contacts, output_pdf=OUTPUT_PDF, title=TITLE, font="Helvetica", all_columns=False):
+    """Write the directory of an iterable of contact dicts to output_pdf and return a DirectoryReport.
+
+    ``font`` is a built-in font or a manual_fonts.FONT_FAMILIES family (for
+    names outside Latin-1); its bold face is used for the header row, and
+    any other font raises ValueError.  With
+    ``all_columns`` every CSV column is listed, sized from the first
+    SAMPLE_ROWS contacts.
+    """
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.units import cm
+
+    from manual_definitions import source_date
+    from manual_fonts import bold_font_name
+    from manual_memory import peak_rss
+    from manual_streaming import StreamingDocTemplate
+    from manual_tables import widths_from_sample, widths_from_schema
+
+    start = time.perf_counter()
+    bold_font = bold_font_name(font)
+    generated = source_date().strftime("%Y-%m-%d %H:%M:%S")
+    doc = StreamingDocTemplate(
+        str(output_pdf), pagesize=landscape(A4), title=title,
+        leftMargin=1 * cm, rightMargin=1 * cm, topMargin=2 * cm + TITLE_SIZE, bottomMargin=2 * cm,
+    )
+    # The frame pads its contents by 6 points on every side.
+    width = doc.width - 12
+    contacts = iter(contacts)
+    if all_columns:
+        to_row = csv_row
+        sample = [to_row(contact) for contact in itertools.islice(contacts, SAMPLE_ROWS)]
+        header = list(CSV_COLUMNS)
+        col_widths = widths_from_sample(sample, width, font, ALL_COLUMNS_FONT_SIZE, CELL_PADDING, header=header)
+        layout = DirectoryLayout(doc, col_widths, header, font, bold_font, ALL_COLUMNS_FONT_SIZE)
+    else:
+        to_row = directory_row
+        sample = []
+        header = [heading for heading, _ in DIRECTORY_COLUMNS]
+        col_widths = widths_from_schema([weight for _, weight in DIRECTORY_COLUMNS], width)
+        layout = DirectoryLayout(doc, col_widths, header, font, bold_font)
+    page_width, page_height = doc.pagesize
+
+    def decorate(canvas, doc):
+        canvas.saveState()
+        canvas.setFont(bold_font, TITLE_SIZE)
+        canvas.setFillColor("#2196f3")
+        canvas.drawString(doc.leftMargin, page_height - 1 * cm - TITLE_SIZE, title)
+        canvas.setFont(font, FONT_SIZE)
+        canvas.setFillColor("black")
+        canvas.drawCentredString(page_width / 2, 1 * cm, f"Page {doc.page} | Generated on {generated}")
+        canvas.restoreState()
+
+    counted = [len(sample)]
+
+    def rows():
+        yield from sample
+        for contact in contacts:
+            counted[0] += 1
+            yield to_row(contact)
+
+    doc.build(directory_tables(rows(), layout), onFirstPage=decorate, onLaterPages=decorate)
+    return DirectoryReport(output_pdf, counted[0], doc.page, time.perf_counter() - start,
+                           Path(output_pdf).stat().st_size, peak_rss())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a contact directory PDF from a contacts CSV export.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("csv", nargs="?", type=Path, help="contacts CSV in the Sample_Contacts.csv layout")
+    source.add_argument("--synthetic", type=int, metavar="N", help="use N made-up contacts instead of a CSV")
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT_PDF, help=f"output PDF (default: {OUTPUT_PDF.name})")
+    parser.add_argument("--title", default=TITLE, help=f"page header (default: {TITLE!r})")
+    parser.add_argument("--font", default="Helvetica",
+                        help="a built-in font such as Helvetica, Times-Roman or Courier, or an embedded family "
+                             "such as Lato for non-Latin names")
+    parser.add_argument("--all-columns", action="store_true",
+                        help=f"list all {len(CSV_COLUMNS)} CSV columns instead of the app's six")
+    args = parser.parse_args(argv)
+
+    contacts = synthetic_contacts(args.synthetic) if args.synthetic is not None else read_contacts(args.csv)
+    try:
+        report = export_directory(contacts, args.output, title=args.title, font=args.font,
+                                  all_columns=args.all_columns)
+    except (OSError, ValueError, LookupError, csv.Error) as exc:
+        print(f"✗ {exc}", file=sys.stderr)
+        return 2
+    print(f"✓ Directory written: {report.output}")
+    print(f"✓ {report.format()}")
+    if not report.rows:
+        print("  There are no contacts; the directory only has its header.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
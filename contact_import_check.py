@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Pre-import check for contacts CSV files.
+
+HomeController.ImportFile uploads the whole file, parses it into memory
+with ImportExportService.ImportFromCsv and only then finds out which rows
+it rejects.  This script streams a CSV in the Sample_Contacts.csv layout
+through the same rules first, so a bad file is turned back before it is
+uploaded:
+
+- Columns are matched the way ImportFromCsv matches them: by exact header
+  name, and, for a field missing from the header, by that field's position
+  in SERVER_FIELDS.  Sample_Contacts.csv has no AadharNumber column, for
+  instance, so the server reads its 13th column (Country) as the
+  AadharNumber.  Every field read by position is reported once.
+- A row with neither FirstName nor LastName is dropped by the server
+  (a warning); a row without a FirstName is imported with the field the
+  Contact model requires left empty (an error).
+- Email must match the rule of the app's contact form (isValidEmail in
+  wwwroot/js/main.js).  Mobile1-3 and WhatsAppNumber must be a dialable
+  number: digits with optional spaces, tabs, dashes, dots, brackets and a
+  leading "+".  The server compares phone numbers by their digits only, so
+  a value without digits would also slip past its duplicate check.
+- Duplicates are rejected as FilterDuplicateImportedContacts rejects
+  them: the same Mobile1 digits, the same AadharNumber digits, or, with
+  neither, the same FirstName + LastName + NickName, against earlier rows
+  of the file and, with --existing, the contacts of an ExportCsv export.
+
+Rows are read with the csv module CHUNK_SIZE at a time and checked column
+by column.  A column of a chunk is joined into one string and each rule
+is a single regular expression search over it that only stops at the
+values breaking the rule, so valid rows cost no Python-level work per
+value.  The duplicate check is a plain loop over the rows that follows
+FilterDuplicateImportedContacts step by step, on digits normalized a
+column at a time.  Problems are written to a row-level CSV report (row,
+column, severity, rule, value, message) as they are found; row numbers
+count the header as row 1, like the server's messages.
+
+    python contact_import_check.py contacts.csv --report problems.csv
+    python contact_import_check.py contacts.csv --existing Contacts_export.csv
+    python contact_import_check.py --synthetic 1000000
+
+The exit status is 1 when any row has an error.
+"""
+
+import argparse
+import csv
+import itertools
+import re
+import sys
+import time
+from collections import Counter
+from itertools import compress, zip_longest
+from operator import itemgetter, not_
+from pathlib import Path
+
+
+# The fields ImportFromCsv reads, in the order of its positional fallbacks.
+SERVER_FIELDS = (
+    "FirstName", "LastName", "NickName", "Gender", "DateOfBirth", "Email", "Mobile1", "Mobile2", "Mobile3",
+    "WhatsAppNumber", "PassportNumber", "PanNumber", "AadharNumber", "DrivingLicenseNumber", "VotersId",
+    "BankAccountNumber", "BankName", "BranchName", "IfscCode", "Address", "City", "State", "PostalCode", "Country",
+    "OtherDetails",
+)
+PHONE_FIELDS = ("Mobile1", "Mobile2", "Mobile3", "WhatsAppNumber")
+SEVERITIES = ("error", "warning")
+REPORT_COLUMNS = ("row", "column", "severity", "rule", "value", "message")
+
+CHUNK_SIZE = 50000
+# Problems listed by CheckReport.format(); --report writes them all.
+MAX_LISTED = 20
+MAX_VALUE_LENGTH = 100
+
+EMAIL_PATTERN = r"[^\s@]+@[^\s@]+\.[^\s@]+"
+# Patterns must not match a newline: columns are checked joined by newlines.
+PHONE_PATTERN = r"\+?[ \t().\-]*\d[\d \t().\-]*"
+
+_NON_DIGITS = re.compile(r"\D+")
+_NON_DIGIT_LINES = re.compile(r"[^\d\n]+")
+
+
+class _Rule:
+    """A pattern every value (or every non-empty value) must match, checked a whole column at a time.
+
+    ``pattern`` must not match a newline.  ``value_pattern`` checks values
+    one at a time, when a quoted value holds a newline of its own; it
+    defaults to ``pattern``.
+    """
+
+    def __init__(self, pattern, allow_empty=True, value_pattern=None):
+        value_pattern = value_pattern or pattern
+        if allow_empty:
+            pattern = f"(?:{pattern})?"
+            value_pattern = f"(?:{value_pattern})?"
+        self.value = re.compile(value_pattern, re.DOTALL)
+        # A run of lines that follow the rule, each ending in a newline.
+        self.lines = re.compile(f"(?:(?:{pattern})\\n)*")
+
+    def invalid(self, values):
+        """Return the indexes of the values that break the rule."""
+        text = _joined(values)
+        if text is None:
+            return list(compress(range(len(values)), map(not_, map(self.value.fullmatch, values))))
+        # Each match() consumes every valid value up to the next invalid one.
+        text += "\n"
+        invalid, position, line = [], 0, 0
+        while True:
+            end = self.lines.match(text, position).end()
+            line += text.count("\n", position, end)
+            if end == len(text):
+                return invalid
+            invalid.append(line)
+            position = text.index("\n", end) + 1
+            line += 1
+
+
+_EMAIL = _Rule(EMAIL_PATTERN)
+_PHONE = _Rule(PHONE_PATTERN)
+# Not null or white space, as string.IsNullOrWhiteSpace tests it.
+_PRESENT = _Rule(r"[^\S\n]*\S[^\n]*", allow_empty=False, value_pattern=r"\s*\S.*")
+
+
+def column_map(header):
+    """Return ({field: column index or None}, [(field, message)]) for a CSV header, as ImportFromCsv reads it."""
+    positions = {}
+    for index, name in enumerate(header):
+        positions.setdefault(name, index)
+    indexes, notes = {}, []
+    for position, field in enumerate(SERVER_FIELDS):
+        if field in positions:
+            indexes[field] = positions[field]
+        elif position < len(header):
+            indexes[field] = position
+            notes.append((field, f"{field} is not in the header; the server reads column {position + 1} "
+                                  f"({header[position]}) into it"))
+        else:
+            indexes[field] = None
+    for name in header:
+        if name not in SERVER_FIELDS:
+            notes.append((name, f"{name} is not a contact field; the server ignores it"))
+    return indexes, notes
+
+
+def _joined(values):
+    """Return values joined by newlines, or None when a value holds a newline of its own."""
+    text = "\n".join(values)
+    return text if text.count("\n") == len(values) - 1 else None
+
+
+def normalize_digits(value):
+    """Return the digits of value, as HomeController.NormalizeDigits does."""
+    return _NON_DIGITS.sub("", value) if value else ""
+
+
+def _digit_column(values):
+    """Return the digits of every value, as NormalizeDigits does."""
+    text = _joined(values)
+    if text is None:
+        return list(map(normalize_digits, values))
+    return _NON_DIGIT_LINES.sub("", text).split("\n")
+
+
+def name_key(first, last, nick):
+    """Return the FirstName + LastName + NickName key duplicates are matched on."""
+    return f"{first.strip().upper()}|{last.strip().upper()}|{nick.strip().upper()}"
+
+
+class CheckReport:
+    """Counts and the first few problems of one check; every problem goes to ``writer`` when one is given."""
+
+    def __init__(self, writer=None):
+        self.writer = writer
+        self.rows = 0
+        self.imported = 0
+        self.skipped = 0
+        self.counts = Counter()
+        self.listed = []
+        self.seconds = 0.0
+
+    def add(self, problems):
+        """Record a list of (row, column, severity, rule, value, message) tuples."""
+        for problem in problems:
+            self.counts[problem[2], problem[3]] += 1
+            if len(self.listed) < MAX_LISTED:
+                self.listed.append(problem)
+        if self.writer is not None:
+            self.writer.writerows(problems)
+
+    def total(self, severity):
+        return sum(count for (kind, _), count in self.counts.items() if kind == severity)
+
+    @property
+    def errors(self):
+        return self.total("error")
+
+    @property
+    def warnings(self):
+        return self.total("warning")
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else None
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "by_rule": {f"{severity}:{rule}": count for (severity, rule), count in sorted(self.counts.items())},
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second or 0, 1),
+        }
+
+    def format(self):
+        lines = [
+            f"{self.rows:,} rows in {self.seconds:.2f}s ({self.rows_per_second or 0:,.0f} rows/s): "
+            f"{self.imported:,} would be imported, {self.skipped:,} skipped; "
+            f"{self.errors:,} errors, {self.warnings:,} warnings"
+        ]
+        for (severity, rule), count in sorted(self.counts.items()):
+            lines.append(f"  {severity:<8} {rule:<12} {count:>10,}")
+        for row, column, severity, _, value, message in self.listed:
+            shown = f" [{value}]" if value else ""
+            lines.append(f"  row {row} {column}: {severity}: {message}{shown}")
+        listed_total = sum(self.counts.values())
+        if listed_total > len(self.listed):
+            lines.append(f"  ... and {listed_total - len(self.listed):,} more")
+        return "\n".join(lines)
+
+
+class ImportChecker:
+    """Applies the import rules to chunks of rows, keeping the duplicate state between chunks."""
+
+    def __init__(self, header, report):
+        self.indexes, notes = column_map(header)
+        self.last_index = max((index for index in self.indexes.values() if index is not None), default=-1)
+        self.report = report
+        self.mobiles = set()
+        self.aadhars = set()
+        self.names = set()
+        report.add([(1, column, "warning", "header", "", message) for column, message in notes])
+
+    def seed(self, rows, header):
+        """Count the contacts of an ExportCsv export (by column name) as already in the database."""
+        positions = {name: index for index, name in enumerate(header)}
+
+        def value(row, field):
+            index = positions.get(field)
+            return row[index] if index is not None and index < len(row) else ""
+
+        for row in rows:
+            mobile, aadhar = normalize_digits(value(row, "Mobile1")), normalize_digits(value(row, "AadharNumber"))
+            if mobile:
+                self.mobiles.add(mobile)
+            if aadhar:
+                self.aadhars.add(aadhar)
+            if not mobile and not aadhar:
+                self.names.add(name_key(value(row, "FirstName"), value(row, "LastName"), value(row, "NickName")))
+
+    def _check_duplicates(self, kept, first, last, nicks, mobiles, aadhars, add):
+        """Apply FilterDuplicateImportedContacts to the kept row indexes of a chunk, in order."""
+        mobile_digits, aadhar_digits = _digit_column(mobiles), _digit_column(aadhars)
+        imported = 0
+        for index in kept:
+            mobile, aadhar = mobile_digits[index], aadhar_digits[index]
+            # Only rows with neither number are matched by name.
+            name = "" if mobile or aadhar else name_key(first[index], last[index], nicks[index])
+
+            duplicate = False
+            if mobile and mobile in self.mobiles:
+                add((index,), "Mobile1", "error", "duplicate", mobiles, "Mobile1 already exists.")
+                duplicate = True
+            if aadhar and aadhar in self.aadhars:
+                add((index,), "AadharNumber", "error", "duplicate", aadhars, "AadharNumber already exists.")
+                duplicate = True
+            if name and name in self.names:
+                add((index,), "FirstName", "error", "duplicate", first,
+                    "Same First Name + Last Name + Nick Name already exists.")
+                duplicate = True
+            if duplicate:
+                continue
+
+            imported += 1
+            if mobile:
+                self.mobiles.add(mobile)
+            if aadhar:
+                self.aadhars.add(aadhar)
+            if name:
+                self.names.add(name)
+        self.report.imported += imported
+
+    def check(self, rows, first_row):
+        """Check rows numbered from first_row and report their problems in row order."""
+        count = len(rows)
+        empty = ("",) * count
+        if min(map(len, rows)) > self.last_index:
+            def values(field):
+                index = self.indexes[field]
+                return empty if index is None else list(map(itemgetter(index), rows))
+        else:
+            # Some rows are short; the server reads their missing fields as empty.
+            columns = list(zip_longest(*rows, fillvalue=""))
+
+            def values(field):
+                index = self.indexes[field]
+                return columns[index] if index is not None and index < len(columns) else empty
+
+        problems = []
+
+        def add(indexes, column, severity, rule, column_values, message):
+            problems.extend((first_row + index, column, severity, rule, column_values[index][:MAX_VALUE_LENGTH], message)
+                            for index in indexes)
+
+        first, last = values("FirstName"), values("LastName")
+        first_blank = _PRESENT.invalid(first)
+        last_blank = set(_PRESENT.invalid(last)) if first_blank else set()
+        dropped = [index for index in first_blank if index in last_blank]
+        kept = [True] * count
+        for index in dropped:
+            kept[index] = False
+        add(dropped, "FirstName", "warning", "skipped", first, "no FirstName or LastName; the server skips this row")
+        add((index for index in first_blank if index not in last_blank), "FirstName", "error", "required", first,
+            "FirstName is required")
+
+        # Rows the server skips are not checked any further.
+        for field, rule, name, message in [("Email", _EMAIL, "email", "not a valid email address")] + [
+                (field, _PHONE, "phone", "not a valid phone number") for field in PHONE_FIELDS]:
+            column_values = values(field)
+            add((index for index in rule.invalid(column_values) if kept[index]), field, "error", name,
+                column_values, message)
+
+        self._check_duplicates(list(compress(range(count), kept)), first, last, values("NickName"),
+                               values("Mobile1"), values("AadharNumber"), add)
+        self.report.rows += count
+        self.report.skipped += len(dropped)
+        problems.sort(key=lambda problem: problem[0])
+        self.report.add(problems)
+
+
+def check_rows(lines, report=None, existing=None, chunk_size=CHUNK_SIZE):
+    """Check an iterable of CSV lines (header first) and return the CheckReport.
+
+    ``existing`` is an iterable of lines of an ExportCsv export whose
+    contacts count as already imported.
+    """
+    start = time.perf_counter()
+    report = report or CheckReport()
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("the file is empty")
+    checker = ImportChecker(header, report)
+    if existing is not None:
+        existing = csv.reader(existing)
+        checker.seed(existing, next(existing, []))
+    row = 2
+    while True:
+        rows = list(itertools.islice(reader, chunk_size))
+        if not rows:
+            break
+        checker.check(rows, row)
+        row += len(rows)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def check_file(path, report_path=None, existing_path=None, chunk_size=CHUNK_SIZE, lines=None):
+    """Check a contacts CSV (or ``lines``) and return the CheckReport; problems are written to report_path."""
+    handles = []
+    try:
+        if lines is None:
+            lines = open(path, newline="", encoding="utf-8-sig")
+            handles.append(lines)
+        existing = None
+        if existing_path is not None:
+            existing = open(existing_path, newline="", encoding="utf-8-sig")
+            handles.append(existing)
+        writer = None
+        if report_path is not None:
+            output = open(report_path, "w", newline="", encoding="utf-8")
+            handles.append(output)
+            writer = csv.writer(output)
+            writer.writerow(REPORT_COLUMNS)
+        return check_rows(lines, CheckReport(writer), existing, chunk_size)
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+def synthetic_lines(count):
+    """Yield a Sample_Contacts.csv-style file of ``count`` rows with a few bad ones, for benchmarks.
+
+    Every 1000th row has a bad email, every 1500th a bad phone number and
+    every 2500th no FirstName; every 5000th repeats an earlier Mobile1.
+    """
+    from contact_directory import CSV_COLUMNS
+
+    yield ",".join(CSV_COLUMNS) + "\r\n"
+    for number in range(1, count + 1):
+        email = f"contact{number}example.com" if number % 1000 == 0 else f"contact{number}@example.com"
+        mobile = f"+1-{number - 1:010d}" if number % 5000 == 0 else f"+1-{number:010d}"
+        mobile2 = "555-CALL-NOW" if number % 1500 == 0 else f"+1 ({number % 1000:03d}) 555-{number % 10000:04d}"
+        first = "" if number % 2500 == 0 else f"Contact{number}"
+        yield (f"{first},Surname{number % 9973},C{number},{email},{mobile},{mobile2},,{mobile},"
+               f"\"{number % 900 + 100} Main St, Apt {number % 40}\",Chicago,IL,{number:07d},USA,Imported contact\r\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check a contacts CSV against the import rules before uploading it.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("csv", nargs="?", type=Path, help="contacts CSV in the Sample_Contacts.csv layout")
+    source.add_argument("--synthetic", type=int, metavar="N", help="check N made-up rows instead")
+    parser.add_argument("--report", type=Path, default=None, help="write every problem to this CSV")
+    parser.add_argument("--existing", type=Path, default=None,
+                        help="an ExportCsv export of the contacts already in the app, for the duplicate check")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help=f"rows per chunk (default: {CHUNK_SIZE:,})")
+    args = parser.parse_args(argv)
+
+    lines = synthetic_lines(args.synthetic) if args.synthetic is not None else None
+    try:
+        report = check_file(args.csv, args.report, args.existing, args.chunk_size, lines=lines)
+    except (OSError, ValueError, csv.Error) as exc:
+        print(f"✗ {exc}", file=sys.stderr)
+        return 2
+    print(f"{'✗' if report.errors else '✓'} {report.format()}")
+    if args.report:
+        print(f"Problems written: {args.report}")
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
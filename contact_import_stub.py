@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+A local stand-in for the app's CSV import, for testing contact_import_upload.
+
+ImportStub is a small asyncio HTTP/1.1 server that answers the requests the
+uploader makes the way the ASP.NET Core app does:
+
+- GET /Account/Login and GET /Home/Import serve a form with an antiforgery
+  token (``__RequestVerificationToken``) and set its cookie;
+- POST /Account/Login checks UserName and Password, starts a session and
+  redirects to "/", or shows the form again with "Invalid username or
+  password.";
+- POST /Home/ImportFile redirects to the login page without a session,
+  answers 400 to a missing or wrong token, and otherwise reads the ``file``
+  part of the multipart form as ImportFromCsv does (contact_import_check's
+  column_map()), drops rows with neither FirstName nor LastName, rejects
+  duplicates as FilterDuplicateImportedContacts does (against the contacts
+  imported so far and earlier rows of the same file) and redirects to "/"
+  or /Home/Import with the outcome in a TempData cookie.  Like the app it
+  looks duplicates up before the import's wait and saves after it, so two
+  imports in flight at once can both save the same contact; such saves
+  are counted in ``stats["duplicates"]``;
+- GET "/" and GET /Home/Import show that TempData message in the same
+  alerts as Views/Home/Index.cshtml (HTML-encoded) and Import.cshtml (raw
+  HTML), and clear the cookie.  A request whose headers are over
+  MAX_HEADERS gets a 431 as from Kestrel, which is what the follow-up
+  request of a batch with a few hundred rejected rows gets, its TempData
+  cookie being too large.
+
+Faults are injected at random, from ``seed``: ``failure_rate`` of the
+imports fail, half with a 500 and half with the app's own "Error importing
+file: ..." message (the controller catches the exception and redirects);
+``drop_rate`` of them close the connection without an answer, half before
+and half after the contacts are saved, as a proxy timing out would; with
+``max_in_flight``, imports beyond it get a 503 with Retry-After; and with
+``session_limit`` a session ends after that many imports, so the client has
+to log in again.  Every import waits ``latency`` seconds (+/- 50%) plus
+``row_latency`` seconds per row.
+
+    python contact_import_stub.py --port 5080 --failure-rate 0.05 --latency 0.02
+    python contact_import_upload.py contacts.csv --url http://127.0.0.1:5080 --user admin
+"""
+
+import argparse
+import base64
+import csv
+import html
+import io
+import json
+import random
+import secrets
+import sys
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+
+SESSION_COOKIE = ".AspNetCore.Session"
+ANTIFORGERY_COOKIE = ".AspNetCore.Antiforgery.Stub"
+TEMPDATA_COOKIE = ".AspNetCore.Mvc.CookieTempDataProvider"
+TOKEN_FIELD = "__RequestVerificationToken"
+# Kestrel's default MaxRequestBodySize and MaxRequestHeadersTotalSize.
+MAX_BODY = 30_000_000
+MAX_HEADERS = 32 * 1024
+
+_REASONS = {200: "OK", 302: "Found", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+            431: "Request Header Fields Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class _Drop(Exception):
+    """Close the connection without answering."""
+
+
+def _cookies(headers):
+    cookies = {}
+    for part in headers.get("cookie", "").split(";"):
+        name, _, value = part.strip().partition("=")
+        if name:
+            cookies[name] = value
+    return cookies
+
+
+def _form_parts(body, content_type):
+    """Return {name: bytes} for a multipart/form-data or urlencoded body."""
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        return {name: values[0].encode() for name, values in parse_qs(body.decode("utf-8")).items()}
+    boundary = None
+    for parameter in content_type.split(";")[1:]:
+        key, _, value = parameter.strip().partition("=")
+        if key.lower() == "boundary":
+            boundary = value.strip('"')
+    if not content_type.startswith("multipart/form-data") or not boundary:
+        return {}
+    parts = {}
+    for part in body.split(b"--" + boundary.encode())[1:]:
+        if part.startswith(b"--"):
+            break
+        head, _, data = part.partition(b"\r\n\r\n")
+        name = None
+        for line in head.decode("utf-8", "replace").split("\r\n"):
+            if line.lower().startswith("content-disposition:"):
+                for item in line.split(";")[1:]:
+                    key, _, value = item.strip().partition("=")
+                    if key == "name":
+                        name = value.strip('"')
+        if name is not None:
+            parts[name] = data[:-2] if data.endswith(b"\r\n") else data
+    return parts
+
+
+class ImportStub:
+    """An in-memory stand-in for the login, import form and ImportFile endpoint of the app."""
+
+    def __init__(self, latency=0.0, row_latency=0.0, failure_rate=0.0, drop_rate=0.0, max_in_flight=None,
+                 session_limit=None, seed=0, username="admin", password="admin"):
+        self.latency = latency
+        self.row_latency = row_latency
+        self.failure_rate = failure_rate
+        self.drop_rate = drop_rate
+        self.max_in_flight = max_in_flight
+        self.session_limit = session_limit
+        self.username = username
+        self.password = password
+        self.random = random.Random(seed)
+        self.sessions = {}
+        self.tokens = set()
+        self.mobiles = set()
+        self.aadhars = set()
+        self.names = set()
+        self.contacts = 0
+        self.in_flight = 0
+        self.stats = {"imports": 0, "failed": 0, "dropped": 0, "throttled": 0, "logins": 0, "duplicates": 0}
+        self._server = None
+        self._connections = {}
+
+    @property
+    def url(self):
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self, host="127.0.0.1", port=0):
+        import asyncio
+
+        self._server = await asyncio.start_server(self._serve, host, port, limit=4 * MAX_HEADERS)
+        return self
+
+    async def close(self):
+        import asyncio
+
+        self._server.close()
+        # Idle keep-alive connections are closed too, so their handlers end before the loop does.
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _serve(self, reader, writer):
+        import asyncio
+
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                header_size = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    header_size += len(line)
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if header_size > MAX_HEADERS:
+                    # A long "Import completed with errors" message makes a TempData cookie too large to send back.
+                    writer.write(self._response(431, close=True))
+                    await writer.drain()
+                    break
+                if length > MAX_BODY:
+                    writer.write(self._response(413, "Request body too large.", close=True))
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    response = await self.handle(method, target, headers, body)
+                except _Drop:
+                    break
+                writer.write(response)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    def _response(self, status, text="", cookies=(), location=None, extra=(), close=False):
+        body = text.encode("utf-8")
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Status')}", f"Content-Length: {len(body)}",
+                 "Content-Type: text/html; charset=utf-8"]
+        if location:
+            lines.append(f"Location: {location}")
+        lines.extend(f"Set-Cookie: {cookie}; path=/; httponly" for cookie in cookies)
+        lines.extend(extra)
+        if close:
+            lines.append("Connection: close")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    def _form(self, action, cookies, message=""):
+        token = secrets.token_urlsafe(24)
+        self.tokens.add(token)
+        page = (f'<form method="post" action="{action}">{message}'
+                f'<input name="{TOKEN_FIELD}" type="hidden" value="{token}" /></form>')
+        return page, [f"{ANTIFORGERY_COOKIE}={token}"] if ANTIFORGERY_COOKIE not in cookies else []
+
+    def _token_ok(self, cookies, fields):
+        token = fields.get(TOKEN_FIELD, b"").decode("utf-8", "replace")
+        return token in self.tokens and cookies.get(ANTIFORGERY_COOKIE) in self.tokens
+
+    def _temp_data(self, cookies):
+        try:
+            return json.loads(base64.urlsafe_b64decode(unquote(cookies.get(TEMPDATA_COOKIE, "")).encode()) or b"{}")
+        except ValueError:
+            return {}
+
+    def _redirect(self, location, temp_data=None):
+        cookies = []
+        if temp_data:
+            value = base64.urlsafe_b64encode(json.dumps(temp_data).encode()).decode()
+            cookies.append(f"{TEMPDATA_COOKIE}={quote(value)}")
+        return self._response(302, cookies=cookies, location=location)
+
+    async def handle(self, method, target, headers, body):
+        """Return the raw response to one request; raises _Drop to close the connection instead."""
+        path = urlsplit(target).path.rstrip("/") or "/"
+        cookies = _cookies(headers)
+        session = cookies.get(SESSION_COOKIE)
+        if session not in self.sessions:
+            session = None
+
+        if path == "/Account/Login":
+            if method == "GET":
+                page, set_cookies = self._form("/Account/Login", cookies)
+                return self._response(200, page, set_cookies)
+            fields = _form_parts(body, headers.get("content-type", ""))
+            if not self._token_ok(cookies, fields):
+                return self._response(400, "Bad Request")
+            if (fields.get("UserName", b"").decode(), fields.get("Password", b"").decode()) != (
+                    self.username, self.password):
+                page, set_cookies = self._form("/Account/Login", cookies, "Invalid username or password.")
+                return self._response(200, page, set_cookies)
+            session = secrets.token_urlsafe(16)
+            self.sessions[session] = 0
+            self.stats["logins"] += 1
+            return self._response(302, cookies=[f"{SESSION_COOKIE}={session}"], location="/")
+
+        if session is None:
+            return self._redirect(f"/Account/Login?ReturnUrl={quote(path, safe='')}")
+
+        if method == "GET" and path in ("/", "/Home/Index", "/Home/Import"):
+            temp_data = self._temp_data(cookies)
+            alerts = []
+            if path == "/Home/Import":
+                page, set_cookies = self._form("/Home/ImportFile", cookies)
+                if temp_data.get("SuccessMessage"):
+                    alerts.append(f"<div>{temp_data['SuccessMessage']}</div>")
+                if temp_data.get("ErrorMessage"):
+                    alerts.append('<div class="alert alert-danger alert-dismissible fade show" role="alert">'
+                                  f'{temp_data["ErrorMessage"]}<button type="button" class="btn-close"></button></div>')
+            else:
+                page, set_cookies = "<table></table>", []
+                for key, kind, icon in (("SuccessMessage", "success", "check-circle"),
+                                        ("ErrorMessage", "danger", "exclamation-circle")):
+                    if temp_data.get(key):
+                        alerts.append(f'<div class="alert alert-{kind}" style="padding: 15px;">'
+                                      f'<i class="fas fa-{icon}"></i> {html.escape(temp_data[key])}</div>')
+            if TEMPDATA_COOKIE in cookies:
+                set_cookies.append(f"{TEMPDATA_COOKIE}=; expires=Thu, 01 Jan 1970 00:00:00 GMT")
+            return self._response(200, "".join(alerts) + page, set_cookies)
+
+        if method == "POST" and path == "/Home/ImportFile":
+            fields = _form_parts(body, headers.get("content-type", ""))
+            if not self._token_ok(cookies, fields):
+                return self._response(400, "Bad Request")
+            return await self._import(session, fields)
+
+        return self._response(404, "Not Found")
+
+    async def _import(self, session, fields):
+        import asyncio
+
+        self.sessions[session] += 1
+        if self.session_limit and self.sessions[session] > self.session_limit:
+            del self.sessions[session]
+            return self._redirect("/Account/Login?ReturnUrl=%2FHome%2FImportFile")
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            self.stats["throttled"] += 1
+            return self._response(503, "Service Unavailable", extra=["Retry-After: 1"])
+        self.stats["imports"] += 1
+        self.in_flight += 1
+        try:
+            data = fields.get("file", b"")
+            if not data:
+                return self._redirect("/Home/Import", {"ErrorMessage": "Please select a file to import."})
+            if fields.get("fileType", b"").decode() != "csv":
+                return self._redirect("/Home/Import", {"ErrorMessage": "Invalid file type selected."})
+            rows = self._read_csv(data)
+            # As in the app, duplicates are looked up before the wait and saved after it.
+            checked = self._check(rows)
+            await asyncio.sleep(self.latency * self.random.uniform(0.5, 1.5) + self.row_latency * len(rows))
+            fault = self.random.random()
+            if fault < self.drop_rate / 2:
+                self.stats["dropped"] += 1
+                raise _Drop()
+            if fault < self.drop_rate / 2 + self.failure_rate:
+                self.stats["failed"] += 1
+                if self.random.random() < 0.5:
+                    return self._response(500, "An unhandled exception occurred while processing the request.")
+                return self._redirect("/", {"ErrorMessage": "Error importing file: database is locked"})
+            result = self._save(*checked)
+            if fault < self.drop_rate + self.failure_rate:
+                self.stats["dropped"] += 1
+                raise _Drop()
+            return result
+        finally:
+            self.in_flight -= 1
+
+    def _read_csv(self, data):
+        """Return the contacts of a CSV upload as {field: value} dicts, as ImportFromCsv reads them."""
+        from contact_import_check import SERVER_FIELDS, column_map
+
+        reader = csv.reader(io.StringIO(data.decode("utf-8-sig", "replace"), newline=""))
+        header = next(reader, [])
+        indexes, _ = column_map(header)
+        contacts = []
+        for row in reader:
+            contact = {}
+            for field in SERVER_FIELDS:
+                index = indexes[field]
+                contact[field] = row[index] if index is not None and index < len(row) else ""
+            if contact["FirstName"].strip() or contact["LastName"].strip():
+                contacts.append(contact)
+        return contacts
+
+    def _check(self, contacts):
+        """Return (errors, valid contacts, their keys) of a batch, checked against the contacts saved so far."""
+        from contact_import_check import name_key, normalize_digits
+
+        errors, valid = [], []
+        mobiles, aadhars, names, saved = set(), set(), set(), set()
+        for index, contact in enumerate(contacts, 1):
+            label = f"Row {index} ({contact['FirstName']} {contact['LastName']})"
+            mobile = normalize_digits(contact["Mobile1"])
+            aadhar = normalize_digits(contact["AadharNumber"])
+            name = name_key(contact["FirstName"], contact["LastName"], contact["NickName"])
+            failed = False
+            if mobile and (mobile in self.mobiles or mobile in mobiles):
+                errors.append(f"{label}: Mobile1 already exists.")
+                failed = True
+            if aadhar and (aadhar in self.aadhars or aadhar in aadhars):
+                errors.append(f"{label}: AadharNumber already exists.")
+                failed = True
+            if not mobile and not aadhar and (name in self.names or name in names):
+                errors.append(f"{label}: Same First Name + Last Name + Nick Name already exists.")
+                failed = True
+            if failed:
+                continue
+            if mobile:
+                mobiles.add(mobile)
+            if aadhar:
+                aadhars.add(aadhar)
+            if not mobile and not aadhar:
+                names.add(name)
+            saved.add(name)
+            valid.append(contact)
+        return errors, valid, (mobiles, aadhars, names, saved)
+
+    def _save(self, errors, valid, keys):
+        if not valid and not errors:
+            return self._redirect("/", {"ErrorMessage": "No valid contacts found in the file."})
+        mobiles, aadhars, names, saved = keys
+        temp_data = {}
+        if errors:
+            temp_data["ErrorMessage"] = "Import completed with errors:<br/>" + "<br/>".join(errors)
+        if not valid:
+            return self._redirect("/Home/Import", temp_data)
+        # Keys another batch saved while this one waited: the database now holds both.
+        self.stats["duplicates"] += len(mobiles & self.mobiles) + len(aadhars & self.aadhars) + len(names & self.names)
+        self.mobiles |= mobiles
+        self.aadhars |= aadhars
+        # The database check compares the names of every saved contact.
+        self.names |= saved
+        self.contacts += len(valid)
+        temp_data["SuccessMessage"] = f"Successfully imported {len(valid)} contact(s)!"
+        return self._redirect("/", temp_data)
+
+
+def main(argv=None):
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the app's CSV import endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5080)
+    parser.add_argument("--user", default="admin", help="user name to accept (default: admin)")
+    parser.add_argument("--password", default="admin", help="password to accept (default: admin)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every import waits (+/- 50%%)")
+    parser.add_argument("--row-latency", type=float, default=0.0, help="extra seconds per imported row")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of imports answered with an error")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of imports whose connection is dropped")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="answer 503 to imports beyond this many")
+    parser.add_argument("--session-limit", type=int, default=None, help="end a session after this many imports")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    async def serve():
+        stub = ImportStub(args.latency, args.row_latency, args.failure_rate, args.drop_rate, args.max_in_flight,
+                          args.session_limit, args.seed, args.user, args.password)
+        await stub.start(args.host, args.port)
+        print(f"✓ Import stub listening on {stub.url} (Ctrl+C to stop)")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            print(f"✓ {stub.contacts:,} contacts imported; {stub.stats}")
+            await stub.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
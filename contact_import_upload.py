@@ -0,0 +1,881 @@
+#!/usr/bin/env python3
+"""
+Bulk upload of a large contacts CSV to the app's import, in batches.
+
+HomeController.ImportFile takes one file per request and holds all of its
+contacts in memory while it checks and saves them, so a large file times
+out.  This script splits a CSV in the Sample_Contacts.csv layout into
+batches of --batch-size rows (each a CSV of its own, with the header) and
+posts them to /Home/ImportFile as the Import page does, --concurrency at
+a time:
+
+- It logs in through /Account/Login, takes the antiforgery token from the
+  Import page and keeps one keep-alive connection per worker.  A batch
+  redirected to the login page logs in again (once, for all workers) and
+  is sent again; a rejected token is fetched again.
+- The outcome of a batch is the TempData message of the page ImportFile
+  redirects to ("Successfully imported N contact(s)!", "Import completed
+  with errors: ...").  The TempData cookie a batch gets back is only sent
+  with that batch's own follow-up request, so concurrent batches do not
+  read each other's messages.  When a batch has so many rejected rows
+  that the server refuses the cookie back (Kestrel answers 431), the batch
+  is done but its outcome is reported as unknown.
+- Batches are read lazily into a queue of --concurrency batches, so a slow
+  server holds the reader back instead of the whole file piling up in
+  memory.
+- Connection errors, timeouts, 429 and 5xx answers and the app's own
+  "Error importing file: ..." message are retried up to --retries times,
+  waiting a random time between 0 and BACKOFF_BASE * 2**attempt seconds
+  (at most BACKOFF_CAP, and at least the server's Retry-After).  Rows the
+  app rejects (duplicates, rows without a name) are not retried; with
+  --rejections every message is written to a CSV.  Retrying is safe:
+  the app rejects rows it already has, so a batch whose answer was lost
+  but which was saved comes back as duplicates, which are reported as
+  most likely saved by the earlier attempt rather than as rejected.
+- Concurrent batches would defeat the server's duplicate filtering
+  across batches.  FilterDuplicateImportedContacts checks a batch against
+  the contacts already saved and against its own earlier rows, so two
+  batches in flight at once that share a Mobile1, an AadharNumber or a
+  name would both be saved.  With --concurrency above 1 the whole file is
+  therefore run through contact_import_check's duplicate pass first, and a
+  file that repeats a contact is turned back (exit status 1); with
+  --concurrency 1 each batch is saved before the next is sent and the
+  server filters as usual.  Uploader itself does not check: a caller that
+  runs it with concurrency above 1 must check the file first.
+- Every finished batch is appended to a checkpoint file (by default the CSV
+  path plus ".upload.jsonl").  Run the same command again after an
+  interruption and the batches already done are skipped; the checkpoint
+  is refused if the file, batch size or URL have changed (--restart
+  starts over).  Batches that failed are not recorded, so they are sent
+  on the next run.
+
+    CONTACTS_PASSWORD=... python contact_import_upload.py contacts.csv --url https://contacts.example.com --user admin
+    python contact_import_upload.py --synthetic 4999 --stub --batch-size 100 --concurrency 8
+
+(--synthetic files repeat a Mobile1 every 5000 rows, so larger ones need
+--concurrency 1.)
+
+--stub runs the upload against an in-process contact_import_stub.ImportStub
+with a few injected faults.  The report gives rows per second and the
+latency percentiles of the batches; the exit status is 1 when a batch
+failed and 2 when the upload could not run at all.
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import time
+from html import unescape
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+
+BATCH_SIZE = 1000
+CONCURRENCY = 4
+RETRIES = 5
+TIMEOUT = 120.0
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+PASSWORD_ENV = "CONTACTS_PASSWORD"
+PERCENTILES = (50, 90, 99)
+# Longest response line read; a TempData cookie listing many rejected rows is long.
+READ_LIMIT = 1024 * 1024
+
+LOGIN_PATH = "/Account/Login"
+IMPORT_PATH = "/Home/Import"
+IMPORT_FILE_PATH = "/Home/ImportFile"
+ACCESS_DENIED_PATH = "/Account/AccessDenied"
+TOKEN_FIELD = "__RequestVerificationToken"
+
+# TempData messages of ImportFile that retrying the same batch cannot change.
+FATAL_MESSAGES = (
+    "Your account is not assigned to a contact group.",
+    "Invalid file type selected.",
+    "Please select a file to import.",
+)
+TRANSIENT_PREFIX = "Error importing file:"
+ERRORS_HEADING = "Import completed with errors:"
+
+_TOKEN_INPUT = re.compile(r"<input\b[^>]*\bname=\"__RequestVerificationToken\"[^>]*>", re.IGNORECASE)
+_VALUE = re.compile(r"\bvalue=\"([^\"]*)\"", re.IGNORECASE)
+_ALERT = re.compile(r"<div class=\"alert alert-(success|danger)\b[^>]*>(.*?)</div>", re.IGNORECASE | re.DOTALL)
+_BREAK = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_TAG = re.compile(r"<[^>]+>")
+_IMPORTED = re.compile(r"Successfully imported (\d+) contact\(s\)!")
+_ROW = re.compile(r"^(Row \d+) \(")
+
+
+class UploadError(Exception):
+    """A failure that sending the batch again cannot fix: a bad login, a missing right, a wrong URL."""
+
+
+class _Retry(Exception):
+    """A batch attempt that failed in a way worth trying again."""
+
+    def __init__(self, reason, delay=0.0, login=False, token=False, unanswered=False):
+        super().__init__(reason)
+        self.delay = delay
+        self.login = login
+        self.token = token
+        self.unanswered = unanswered
+
+
+class Batch:
+    """Rows of the CSV sent as one file; ``first_row`` counts the header as row 1."""
+
+    def __init__(self, number, first_row, rows, data):
+        self.number = number
+        self.first_row = first_row
+        self.rows = rows
+        self.data = data
+
+
+def read_batches(lines, batch_size=BATCH_SIZE, skip=()):
+    """Yield the rows of a contacts CSV as Batches of batch_size rows, each a CSV with the header.
+
+    Batches whose number is in ``skip`` are counted but not written out
+    (their ``data`` is None).
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    first_row = 2
+    for number in itertools.count(1):
+        rows = list(itertools.islice(reader, batch_size))
+        if not rows:
+            return
+        data = None
+        if number not in skip:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\r\n")
+            writer.writerow(header)
+            writer.writerows(rows)
+            data = buffer.getvalue().encode("utf-8")
+        yield Batch(number, first_row, len(rows), data)
+        first_row += len(rows)
+
+
+def backoff(attempt, retry_after=0.0, base=BACKOFF_BASE, cap=BACKOFF_CAP, rng=random):
+    """Return the seconds to wait before retry number ``attempt`` (from 0): full jitter, at least retry_after."""
+    return max(retry_after, rng.uniform(0, min(cap, base * 2 ** attempt)))
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of sorted values, or None when there are none."""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[min(len(values), rank) - 1]
+
+
+def parse_outcome(page):
+    """Return (imported, [error lines]) from the TempData alerts of the page ImportFile redirected to.
+
+    Index.cshtml HTML-encodes the messages and Import.cshtml writes them
+    raw, so "<br/>" separates the lines of an error either way.
+    """
+    errors = []
+    for kind, inner in _ALERT.findall(page):
+        if kind.lower() == "danger":
+            text = unescape(_TAG.sub("", _BREAK.sub("\n", inner)))
+            errors.extend(line.strip() for line in _BREAK.sub("\n", text).split("\n")
+                          if line.strip() and line.strip() != ERRORS_HEADING)
+    match = _IMPORTED.search(unescape(page))
+    return (int(match.group(1)) if match else None), errors
+
+
+def rejected_rows(errors):
+    """Return how many rows the lines of an "Import completed with errors" message name (a row may have two)."""
+    return len({match.group(1) for match in map(_ROW.match, errors) if match})
+
+
+class _Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def header(self, name, default=None):
+        for key, value in self.headers:
+            if key == name:
+                return value
+        return default
+
+    @property
+    def location(self):
+        """The path and query of a redirect, wherever it points."""
+        parts = urlsplit(self.header("location", ""))
+        return parts.path + (f"?{parts.query}" if parts.query else "")
+
+    @property
+    def retry_after(self):
+        try:
+            return max(0.0, float(self.header("retry-after", "0")))
+        except ValueError:  # an HTTP date; the backoff is used instead
+            return 0.0
+
+    def text(self):
+        return self.body.decode("utf-8", "replace")
+
+    def update_cookies(self, cookies):
+        """Apply the Set-Cookie headers of the response to a {name: value} dict."""
+        for key, value in self.headers:
+            if key != "set-cookie":
+                continue
+            pair, _, attributes = value.partition(";")
+            name, _, cookie = pair.strip().partition("=")
+            expired = "expires=thu, 01 jan 1970" in attributes.lower() or "max-age=0" in attributes.lower()
+            if expired or not cookie:
+                cookies.pop(name, None)
+            else:
+                cookies[name] = cookie
+        return cookies
+
+
+class HttpConnection:
+    """One keep-alive HTTP/1.1 connection to the app; redirects are returned, not followed."""
+
+    def __init__(self, url, timeout=TIMEOUT):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise UploadError(f"not an http(s) URL: {url}")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.tls = parts.scheme == "https"
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def request(self, method, path, body=b"", content_type=None, cookies=None):
+        """Send one request and return its _Response; any failure closes the connection and is raised."""
+        import asyncio
+
+        try:
+            return await asyncio.wait_for(self._exchange(method, path, body, content_type, cookies), self.timeout)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _exchange(self, method, path, body, content_type, cookies):
+        import asyncio
+
+        if self._writer is None:
+            ssl = None
+            if self.tls:
+                import ssl as ssl_module
+
+                ssl = ssl_module.create_default_context()
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port, ssl=ssl,
+                                                                       limit=READ_LIMIT)
+        host = self.host if self.port in (80, 443) else f"{self.host}:{self.port}"
+        lines = [f"{method} {self.base_path}{path} HTTP/1.1", f"Host: {host}", f"Content-Length: {len(body)}",
+                 "User-Agent: contact-import-upload"]
+        if content_type:
+            lines.append(f"Content-Type: {content_type}")
+        if cookies:
+            lines.append("Cookie: " + "; ".join(f"{name}={value}" for name, value in cookies.items()))
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self._writer.drain()
+
+        reader = self._reader
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("the server closed the connection without answering")
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise ConnectionError(f"not an HTTP response: {status_line[:80]!r}") from None
+        headers = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers.append((name.strip().lower(), value.strip()))
+        response = _Response(status, headers, b"")
+        if method == "HEAD" or status in (204, 304) or status < 200:
+            pass
+        elif "chunked" in response.header("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            response.body = b"".join(chunks)
+        elif response.header("content-length") is not None:
+            response.body = await reader.readexactly(int(response.header("content-length")))
+        else:
+            response.body = await reader.read()
+            self.close()
+        if response.header("connection", "").lower() == "close":
+            self.close()
+        return response
+
+
+def _multipart(fields, file_field, file_name, data):
+    """Return (body, content type) of a multipart/form-data form with one CSV file."""
+    boundary = f"----contact-import-{os.urandom(12).hex()}"
+    parts = []
+    for name, value in fields.items():
+        parts.append(f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n".encode())
+    parts.append(f"--{boundary}\r\nContent-Disposition: form-data; name=\"{file_field}\"; "
+                 f"filename=\"{file_name}\"\r\nContent-Type: text/csv\r\n\r\n".encode())
+    parts.append(data)
+    parts.append(f"\r\n--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class AppSession:
+    """The login cookies and antiforgery token shared by the workers of one upload."""
+
+    def __init__(self, user, password):
+        self.user = user
+        self.password = password
+        self.cookies = {}
+        self.token = None
+        self.generation = 0
+        self._lock = None
+
+    async def refresh(self, connection, generation, login=True):
+        """Log in again (or only fetch a new token), unless another worker already did since ``generation``."""
+        import asyncio
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.generation != generation:
+                return
+            if login or not await self._fetch_token(connection):
+                await self._login(connection)
+                if not await self._fetch_token(connection):
+                    raise UploadError(f"logged in as {self.user}, but the Import page still asks for a login")
+            self.generation += 1
+
+    async def _login(self, connection):
+        self.cookies.clear()
+        page = await connection.request("GET", LOGIN_PATH)
+        page.update_cookies(self.cookies)
+        form = {"UserName": self.user, "Password": self.password, TOKEN_FIELD: _token(page)}
+        response = await connection.request("POST", LOGIN_PATH, urlencode(form).encode(),
+                                            "application/x-www-form-urlencoded", self.cookies)
+        response.update_cookies(self.cookies)
+        if response.status != 302 or response.location.startswith(LOGIN_PATH):
+            reason = "Invalid username or password." if "Invalid username or password" in response.text() else (
+                f"HTTP {response.status}")
+            raise UploadError(f"could not log in as {self.user}: {reason}")
+
+    async def _fetch_token(self, connection):
+        """Take the token from the Import page; return False when it redirects to the login page."""
+        page = await connection.request("GET", IMPORT_PATH, cookies=self.cookies)
+        page.update_cookies(self.cookies)
+        if page.status == 302 and page.location.startswith(LOGIN_PATH):
+            return False
+        if page.status == 302 and page.location.startswith(ACCESS_DENIED_PATH):
+            raise UploadError(f"{self.user} does not have the right to import contacts")
+        if page.status != 200:
+            raise UploadError(f"the Import page answered HTTP {page.status}; is the URL right?")
+        self.token = _token(page)
+        return True
+
+
+def _token(page):
+    match = _TOKEN_INPUT.search(page.text())
+    value = _VALUE.search(match.group(0)) if match else None
+    if value is None:
+        raise UploadError("no antiforgery token on the page; is the URL right?")
+    return unescape(value.group(1))
+
+
+class Checkpoint:
+    """Sent and finished batches of one upload, appended to a JSON-lines file as they happen.
+
+    The first line identifies the upload (source file, size, modification
+    time, batch size, URL); each further line is a batch being sent or a
+    finished batch.  A batch sent but not finished may have been saved by
+    the server before the upload stopped; ``sent`` lists them.  A line cut
+    short by a crash is ignored.
+    """
+
+    def __init__(self, path, identity, restart=False):
+        self.path = Path(path) if path is not None else None
+        self.identity = identity
+        self.done = {}
+        self.sent = set()
+        self._handle = None
+        if self.path is None:
+            return
+        if self.path.exists() and not restart:
+            with open(self.path, encoding="utf-8") as handle:
+                text = handle.read()
+            lines = text.splitlines()
+            stored = json.loads(lines[0]) if lines else None
+            if stored is not None and stored != identity:
+                raise ValueError(f"{self.path} is the checkpoint of a different upload "
+                                 f"({stored.get('source')}, batch size {stored.get('batch_size')}, "
+                                 f"{stored.get('url')}); use --restart to start over")
+            for line in lines[1:]:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if "rows" in entry:
+                    self.done[entry["batch"]] = entry
+                else:
+                    self.sent.add(entry["batch"])
+            self.sent.difference_update(self.done)
+            self._handle = open(self.path, "a", encoding="utf-8")
+            if text and not text.endswith("\n"):
+                self._handle.write("\n")
+        else:
+            self._handle = open(self.path, "w", encoding="utf-8")
+            self._write(identity)
+
+    def _write(self, entry):
+        self._handle.write(json.dumps(entry, sort_keys=True) + "\n")
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def send(self, batch):
+        """Note that a batch is about to be sent, before it can be saved."""
+        if self._handle is not None and batch.number not in self.sent:
+            self.sent.add(batch.number)
+            self._write({"batch": batch.number, "sent": True})
+
+    def record(self, batch, imported, rejected, replayed):
+        entry = {"batch": batch.number, "rows": batch.rows, "imported": imported, "rejected": rejected,
+                 "replayed": replayed}
+        self.done[batch.number] = entry
+        if self._handle is not None:
+            self._write(entry)
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class UploadReport:
+    """Rows, outcomes, retries and batch latencies of one upload run."""
+
+    def __init__(self, writer=None):
+        self.writer = writer
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.replayed = 0
+        self.unknown = 0
+        self.retries = 0
+        self.batches = 0
+        self.resumed = 0
+        self.resumed_rows = 0
+        self.failures = []
+        self.latencies = []
+        self.seconds = 0.0
+        self.error = None
+
+    def resume(self, entry):
+        self.resumed += 1
+        self.resumed_rows += entry["rows"]
+
+    def finish(self, batch, imported, rejected, replayed, errors, latency):
+        self.batches += 1
+        self.rows += batch.rows
+        if imported is None:
+            self.unknown += batch.rows
+        else:
+            self.imported += imported
+        self.rejected += rejected
+        self.replayed += replayed
+        self.latencies.append(latency)
+        if self.writer is not None:
+            self.writer.writerows([batch.number, batch.first_row, message] for message in errors)
+
+    def fail(self, batch, reason):
+        self.failures.append((batch.number, batch.first_row, batch.rows, reason))
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else None
+
+    def latency(self):
+        ordered = sorted(self.latencies)
+        latency = {f"p{percent}": percentile(ordered, percent) for percent in PERCENTILES}
+        latency["max"] = ordered[-1] if ordered else None
+        return latency
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "replayed": self.replayed,
+            "unknown": self.unknown,
+            "batches": self.batches,
+            "failed_batches": len(self.failures),
+            "failed_rows": sum(rows for _, _, rows, _ in self.failures),
+            "resumed_batches": self.resumed,
+            "resumed_rows": self.resumed_rows,
+            "retries": self.retries,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second or 0, 1),
+            "latency": {key: None if value is None else round(value, 4) for key, value in self.latency().items()},
+            "error": self.error,
+        }
+
+    def format(self):
+        latency = self.latency()
+        timings = ", ".join(f"{key} {value * 1000:,.0f} ms" for key, value in latency.items() if value is not None)
+        lines = [
+            f"{self.rows:,} rows in {self.batches:,} batches in {self.seconds:.2f}s "
+            f"({self.rows_per_second or 0:,.0f} rows/s): {self.imported:,} imported, {self.rejected:,} rejected"
+            + (f", {self.replayed:,} already saved by an unanswered attempt" if self.replayed else "")
+            + (f", {self.unknown:,} in batches whose result was too long to read back" if self.unknown else ""),
+            f"Batch latency: {timings or '-'}; {self.retries:,} retries",
+        ]
+        if self.resumed:
+            lines.append(f"Resumed: {self.resumed:,} batches ({self.resumed_rows:,} rows) were already done")
+        if self.failures:
+            failed_rows = sum(rows for _, _, rows, _ in self.failures)
+            lines.append(f"Failed: {len(self.failures):,} batches ({failed_rows:,} rows); run again to retry them")
+            lines.extend(f"  batch {number} (rows {first:,}-{first + rows - 1:,}): {reason}"
+                         for number, first, rows, reason in self.failures[:10])
+        return "\n".join(lines)
+
+
+class Uploader:
+    """Sends the batches of a contacts CSV to ImportFile with bounded concurrency, retries and a checkpoint.
+
+    With ``concurrency`` above 1 the file must not repeat a contact across
+    batches (see the module docstring); main() checks that first.
+    """
+
+    def __init__(self, url, user, password, batch_size=BATCH_SIZE, concurrency=CONCURRENCY, retries=RETRIES,
+                 timeout=TIMEOUT, checkpoint=None, report=None, rng=None):
+        self.url = url
+        self.session = AppSession(user, password)
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.checkpoint = checkpoint or Checkpoint(None, None)
+        self.report = report or UploadReport()
+        self.rng = rng or random.Random()
+
+    async def run(self, lines):
+        """Upload every batch of ``lines`` not yet in the checkpoint and return the UploadReport."""
+        import asyncio
+
+        start = time.perf_counter()
+        connection = HttpConnection(self.url, self.timeout)
+        try:
+            await self.session.refresh(connection, 0)
+        finally:
+            connection.close()
+
+        queue = asyncio.Queue(maxsize=self.concurrency)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        try:
+            for batch in read_batches(lines, self.batch_size, skip=self.checkpoint.done):
+                if self.report.error is not None:
+                    break
+                if batch.data is None:
+                    self.report.resume(self.checkpoint.done[batch.number])
+                    continue
+                await queue.put(batch)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self.report.seconds = time.perf_counter() - start
+        return self.report
+
+    async def _worker(self, queue):
+        connection = HttpConnection(self.url, self.timeout)
+        try:
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    return
+                if self.report.error is None:
+                    try:
+                        await self._upload(connection, batch)
+                    except UploadError as exc:
+                        self.report.error = str(exc)
+                        self.report.fail(batch, str(exc))
+                    except Exception as exc:  # stop the upload, not just this worker, or the reader waits forever
+                        self.report.error = f"{type(exc).__name__}: {exc}"
+                        self.report.fail(batch, self.report.error)
+        finally:
+            connection.close()
+
+    async def _upload(self, connection, batch):
+        import asyncio
+
+        # A batch sent by an earlier run that stopped before its answer may be saved already.
+        unanswered = batch.number in self.checkpoint.sent
+        self.checkpoint.send(batch)
+        reason = None
+        login = None
+        generation = self.session.generation
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.report.retries += 1
+            sending = False
+            try:
+                if login is not None:
+                    await self.session.refresh(connection, generation, login=login)
+                    login = None
+                generation = self.session.generation
+                started = time.perf_counter()
+                sending = True
+                imported, errors = await self._send(connection, batch)
+            except _Retry as retry:
+                reason, delay = str(retry), retry.delay
+                unanswered = unanswered or retry.unanswered
+                if retry.login or retry.token:
+                    login = retry.login
+                    continue
+            except (OSError, EOFError, asyncio.TimeoutError) as exc:
+                reason, delay = f"{type(exc).__name__}: {exc}".rstrip(": "), 0.0
+                unanswered = unanswered or sending
+            else:
+                latency = time.perf_counter() - started
+                rejected = 0 if imported is None else batch.rows - imported
+                replayed = 0
+                if unanswered and imported is not None:
+                    replayed = rejected_rows([line for line in errors if line.endswith("already exists.")])
+                    rejected -= replayed
+                self.report.finish(batch, imported, rejected, replayed, errors, latency)
+                self.checkpoint.record(batch, imported, rejected, replayed)
+                return
+            if attempt < self.retries:
+                await asyncio.sleep(backoff(attempt, delay, rng=self.rng))
+        self.report.fail(batch, f"gave up after {self.retries + 1} attempts: {reason}")
+
+    async def _send(self, connection, batch):
+        """Post one batch and return (imported, error lines), or raise _Retry or UploadError.
+
+        ``imported`` is None when the batch was imported but its result
+        could not be read back.
+        """
+        session = self.session
+        body, content_type = _multipart({TOKEN_FIELD: session.token, "fileType": "csv"}, "file",
+                                        f"contacts-batch-{batch.number}.csv", batch.data)
+        response = await connection.request("POST", IMPORT_FILE_PATH, body, content_type, session.cookies)
+        status = response.status
+        if status in (301, 302, 303, 307, 308):
+            location = response.location
+            if location.startswith(LOGIN_PATH):
+                raise _Retry("the session expired", login=True)
+            if location.startswith(ACCESS_DENIED_PATH):
+                raise UploadError(f"{session.user} does not have the right to import contacts")
+            # The TempData cookie belongs to this batch alone.
+            cookies = response.update_cookies(dict(session.cookies))
+            page = await connection.request("GET", location, cookies=cookies)
+            if page.status == 302 and page.location.startswith(LOGIN_PATH):
+                # The batch was answered, so it may be saved already.
+                raise _Retry("the session expired before the result was read", login=True, unanswered=True)
+            if page.status == 431:
+                # Imported, but the TempData cookie listing the rejected rows is too large to send back.
+                return None, []
+            imported, errors = parse_outcome(page.text())
+            if any(line.startswith(TRANSIENT_PREFIX) for line in errors):
+                raise _Retry(next(line for line in errors if line.startswith(TRANSIENT_PREFIX)))
+            for line in errors:
+                if line in FATAL_MESSAGES:
+                    raise UploadError(line)
+            if imported is None and not errors:
+                raise _Retry(f"no import result on {location}", unanswered=True)
+            return imported or 0, errors
+        if status == 400:
+            raise _Retry("the antiforgery token was rejected", token=True)
+        if status == 413:
+            raise UploadError(f"batch {batch.number} ({len(body):,} bytes) is larger than the server accepts; "
+                              f"lower --batch-size")
+        if status == 429 or status >= 500:
+            raise _Retry(f"HTTP {status}", delay=response.retry_after, unanswered=status in (502, 504))
+        raise UploadError(f"ImportFile answered HTTP {status}; is the URL right?")
+
+
+def checkpoint_identity(path, batch_size, url, synthetic=None):
+    """Return what a checkpoint must match to be resumed: the source file, its size and mtime, batch size and URL."""
+    if synthetic is not None:
+        return {"source": f"synthetic:{synthetic}", "batch_size": batch_size, "url": url}
+    stat = Path(path).stat()
+    return {"source": str(Path(path).resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "batch_size": batch_size, "url": url}
+
+
+def upload(lines, url, user, password, checkpoint=None, rejections_path=None, stub=None, **options):
+    """Upload a contacts CSV (an iterable of lines) and return the UploadReport.
+
+    With ``stub`` (a dict of contact_import_stub.ImportStub options) the
+    upload goes to an in-process stub instead of ``url``, and the report's
+    ``stub`` attribute holds it afterwards.
+    """
+    import asyncio
+
+    handle = writer = None
+    if rejections_path is not None:
+        handle = open(rejections_path, "w", newline="", encoding="utf-8")
+        writer = csv.writer(handle)
+        writer.writerow(("batch", "first_row", "message"))
+    report = UploadReport(writer)
+
+    async def run():
+        if stub is None:
+            return await Uploader(url, user, password, checkpoint=checkpoint, report=report, **options).run(lines)
+        from contact_import_stub import ImportStub
+
+        async with ImportStub(username=user, password=password, **stub) as server:
+            report.stub = server
+            return await Uploader(server.url, user, password, checkpoint=checkpoint, report=report,
+                                  **options).run(lines)
+
+    try:
+        return asyncio.run(run())
+    except UploadError as exc:
+        report.error = str(exc)
+        return report
+    finally:
+        if handle is not None:
+            handle.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Upload a large contacts CSV to the app's import in batches.",
+        epilog="The server only filters duplicates against saved contacts and within one batch, so with "
+               "--concurrency above 1 duplicate rows in batches in flight at the same time would all be saved. "
+               "Before such an upload the file is checked for duplicates and turned back if it has any; "
+               "remove them (contact_import_check.py --report lists them) or use --concurrency 1.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("csv", nargs="?", type=Path, help="contacts CSV in the Sample_Contacts.csv layout")
+    source.add_argument("--synthetic", type=int, metavar="N", help="upload N made-up rows instead")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="base URL of the app, e.g. https://contacts.example.com")
+    target.add_argument("--stub", action="store_true",
+                        help="upload to an in-process stand-in with injected faults instead")
+    parser.add_argument("--user", default="admin", help="user name to log in with (default: admin)")
+    parser.add_argument("--password-env", default=PASSWORD_ENV,
+                        help=f"environment variable holding the password (default: {PASSWORD_ENV}); "
+                             f"asked for when it is not set")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help=f"rows per request (default: {BATCH_SIZE})")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help=f"requests in flight (default: {CONCURRENCY}); above 1 the file must not "
+                             f"repeat a contact")
+    parser.add_argument("--retries", type=int, default=RETRIES, help=f"retries per batch (default: {RETRIES})")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help=f"seconds per request (default: {TIMEOUT:g})")
+    parser.add_argument("--checkpoint", type=Path, default=None,
+                        help="checkpoint file (default: the CSV path plus .upload.jsonl; none for --synthetic)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint and start over")
+    parser.add_argument("--rejections", type=Path, default=None, help="write every rejected row message to this CSV")
+    parser.add_argument("--check", action="store_true", help="run contact_import_check first and stop on errors")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    if args.batch_size < 1 or args.concurrency < 1 or args.retries < 0:
+        parser.error("--batch-size and --concurrency must be at least 1 and --retries at least 0")
+
+    if args.check or args.concurrency > 1:
+        from contact_import_check import check_file, synthetic_lines
+
+        lines = synthetic_lines(args.synthetic) if args.synthetic is not None else None
+        try:
+            check = check_file(args.csv, lines=lines)
+        except (OSError, ValueError, csv.Error) as exc:
+            print(f"✗ {exc}", file=sys.stderr)
+            return 2
+        duplicates = check.counts[("error", "duplicate")]
+        if args.check:
+            print(f"{'✗' if check.errors else '✓'} Check: {check.format()}",
+                  file=sys.stderr if args.json else sys.stdout)
+            if check.errors:
+                return 1
+        elif duplicates:
+            print(f"✗ {duplicates:,} row(s) repeat a contact of an earlier row. Batches sent at the same time "
+                  f"would save both; remove the duplicates (contact_import_check.py --report lists them) "
+                  f"or use --concurrency 1", file=sys.stderr)
+            return 1
+
+    password = os.environ.get(args.password_env)
+    if password is None:
+        if args.stub:
+            password = "admin"
+        else:
+            import getpass
+
+            password = getpass.getpass(f"Password for {args.user}: ")
+    url = args.url.rstrip("/") if args.url else "stub"
+    stub = dict(latency=0.02, failure_rate=0.05, drop_rate=0.01, session_limit=200, seed=1) if args.stub else None
+
+    handle = None
+    checkpoint = None
+    try:
+        if args.synthetic is not None:
+            from contact_import_check import synthetic_lines
+
+            lines = synthetic_lines(args.synthetic)
+        else:
+            lines = handle = open(args.csv, newline="", encoding="utf-8-sig")
+        checkpoint_path = args.checkpoint
+        if checkpoint_path is None and args.synthetic is None:
+            checkpoint_path = args.csv.with_name(args.csv.name + ".upload.jsonl")
+        identity = checkpoint_identity(args.csv, args.batch_size, url, args.synthetic)
+        checkpoint = Checkpoint(checkpoint_path, identity, restart=args.restart)
+        report = upload(lines, url, args.user, password, checkpoint, args.rejections, stub,
+                        batch_size=args.batch_size, concurrency=args.concurrency, retries=args.retries,
+                        timeout=args.timeout)
+    except (OSError, ValueError, csv.Error, UploadError) as exc:
+        print(f"✗ {exc}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        if checkpoint is None or checkpoint.path is None:
+            print("✗ Interrupted", file=sys.stderr)
+        else:
+            print(f"✗ Interrupted; {len(checkpoint.done):,} batches are done. Run the same command again to resume "
+                  f"from {checkpoint.path}", file=sys.stderr)
+        return 130
+    finally:
+        if handle is not None:
+            handle.close()
+        if checkpoint is not None:
+            checkpoint.close()
+
+    if report.error is not None and not report.batches and not report.failures:
+        print(f"✗ {report.error}", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps(report.as_dict(), indent=2))
+    else:
+        print(f"{'✗' if report.failures or report.error else '✓'} {report.format()}")
+        if args.stub:
+            print(f"Stub: {report.stub.contacts:,} contacts saved; {report.stub.stats}")
+        if checkpoint.path is not None:
+            print(f"Checkpoint: {checkpoint.path}")
+    if report.error is not None:
+        print(f"✗ Stopped: {report.error}", file=sys.stderr)
+        return 2
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,659 @@
+#!/usr/bin/env python3
+"""
+Per-section layout cache shared by the manual generators.
+
+Every manual separates its sections with explicit PageBreak() flowables, so
+each run of flowables between two breaks lays out on its own pages and does
+not depend on the sections around it.  build_cached() splits the flowable
+list at those breaks, fingerprints each section (text, styles, table data,
+image file hashes and page geometry), lays out only the sections whose
+fingerprint is not already cached, and stitches the cached per-section PDFs
+into the final document.
+
+Generators that describe their sections as data (see manual_definitions)
+pass CachedSection objects to build_sections() instead: their key is
+computed from the section definition, so a cached section does not even
+have its flowables constructed.  build_sections(stream=True) skips the
+cache and streams every section's flowables straight through layout (see
+manual_streaming).
+
+Sections that carry a picklable ``shard`` description can be laid out in
+parallel worker processes (``workers``); the per-section PDFs are merged
+as-is.
+
+Flowables marked with mark_toc_entry() are recorded with the page they land
+on, relative to their section, and kept next to the cached section PDF.
+Those entries become the merged document's outline, and a PaginatedSection
+(a table of contents) is resolved last, once the page numbers of every
+other section are known.  Its own page count is taken from the previous
+build, so the usual build lays it out once; only when that count changes
+is it laid out a second time.
+
+The merged file contains no timestamps, and its /ID is a checksum of its
+contents, so the same sections always produce the same bytes.  A digest of
+the build's inputs passed as ``inputs`` is recorded in the document info
+(INPUTS_KEY), where recorded_inputs() reads it back.
+"""
+
+import hashlib
+import html
+import io
+import json
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import reportlab
+from reportlab import rl_config
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, Image
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus.flowables import Flowable
+
+from manual_profile import NullProfiler
+from manual_streaming import stream_build
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.errors import PdfReadError
+    from pypdf.generic import NameObject
+except ImportError:  # pypdf is optional; without it every build is a full build
+    PdfReader = PdfWriter = None
+
+
+BASE_DIR = Path(__file__).resolve().parent
+CACHE_DIR = BASE_DIR / ".manual_cache"
+
+# Bump when the fingerprint format or section rendering changes.
+CACHE_VERSION = "3"
+
+# A table of contents is laid out again while its page count keeps changing.
+MAX_PAGINATION_PASSES = 3
+
+# Document info key holding the inputs digest of a merged build.
+INPUTS_KEY = "/BuildInputs"
+
+_file_hashes = {}
+
+
+def file_digest(path):
+    """Return the sha256 of a file, memoised on (path, size, mtime)."""
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    digest = _file_hashes.get(key)
+    if digest is None:
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        _file_hashes[key] = digest
+    return digest
+
+
+def _style_fingerprint(style):
+    if style is None:
+        return None
+    return sorted(
+        (name, repr(value)) for name, value in vars(style).items() if name != "parent"
+    )
+
+
+def _value_fingerprint(value):
+    if isinstance(value, Flowable):
+        return fingerprint_flowable(value)
+    if isinstance(value, (list, tuple)):
+        return [_value_fingerprint(item) for item in value]
+    return repr(value)
+
+
+def fingerprint_flowable(flowable):
+    """Return a repr-able description of everything that affects layout.
+
+    Returns None for flowable types the cache does not understand, which
+    marks the whole section as uncacheable.
+    """
+    if isinstance(flowable, Paragraph):
+        return (
+            "Paragraph",
+            flowable.text,
+            getattr(flowable, "bulletText", None),
+            _style_fingerprint(flowable.style),
+        )
+    if isinstance(flowable, Image):
+        filename = flowable.filename
+        source = file_digest(filename) if isinstance(filename, (str, Path)) else None
+        if source is None:
+            return None
+        return ("Image", source, flowable.drawWidth, flowable.drawHeight, flowable.hAlign)
+    if isinstance(flowable, Table):
+        return (
+            "Table",
+            _value_fingerprint(flowable._cellvalues),
+            repr(flowable._argW),
+            repr(flowable._argH),
+            repr(flowable._bkgrndcmds),
+            repr(flowable._linecmds),
+            repr(flowable._spanCmds),
+            [[_style_fingerprint(cell) for cell in row] for row in flowable._cellStyles],
+            flowable.hAlign,
+        )
+    if isinstance(flowable, Spacer):
+        return ("Spacer", flowable.width, flowable.height)
+    return None
+
+
+def split_sections(flowables):
+    """Split a flowable list into sections at each PageBreak.
+
+    The breaks themselves are dropped: every section is rendered starting on
+    a fresh page, which is exactly what the break asked for.
+    """
+    sections = [[]]
+    for flowable in flowables:
+        if isinstance(flowable, PageBreak):
+            sections.append([])
+        else:
+            sections[-1].append(flowable)
+    return [section for section in sections if section]
+
+
+def section_key(section):
+    """Return the content key for a list of flowables, or None if it cannot be cached."""
+    parts = []
+    for flowable in section:
+        fingerprint = fingerprint_flowable(flowable)
+        if fingerprint is None:
+            return None
+        parts.append(fingerprint)
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+class CachedSection:
+    """One page-break-delimited section of a manual.
+
+    ``key`` identifies the section's content (None disables caching for it)
+    and ``make_flowables`` is only called when the section must be laid out;
+    it may return any iterable of flowables, including a generator.
+
+    ``shard`` is an optional ``(function, args)`` pair of picklable values
+    such that ``function(*args)`` returns the same flowables in another
+    process; only sections with a shard are rendered in parallel.
+    """
+
+    def __init__(self, key, make_flowables, title=None, shard=None):
+        self.key = key
+        self.make_flowables = make_flowables
+        self.title = title
+        self.shard = shard
+
+    @classmethod
+    def from_flowables(cls, flowables):
+        return cls(section_key(flowables), lambda: flowables)
+
+
+class PaginatedSection:
+    """A section whose content depends on the page numbers of the others.
+
+    ``resolve(entries)`` receives every other section's table of contents
+    entries as ``(level, text, page)`` tuples, with absolute page numbers,
+    and returns the CachedSection to lay out; its key must cover the
+    entries.
+    """
+
+    def __init__(self, resolve, title=None):
+        self.resolve = resolve
+        self.title = title
+
+
+_MARKUP = re.compile(r"<[^>]+>")
+
+
+def plain_text(markup):
+    """Return paragraph markup as plain text (tags stripped, entities decoded)."""
+    return " ".join(html.unescape(_MARKUP.sub("", markup)).split())
+
+
+def mark_toc_entry(flowable, level=0, text=None):
+    """Record flowable in its section's table of contents entries and outline."""
+    flowable._toc_entry = (level, text if text is not None else plain_text(flowable.text))
+    return flowable
+
+
+class SectionResult:
+    """A laid-out section: PDF bytes, page count and its (level, text, page) entries."""
+
+    def __init__(self, data, pages, entries):
+        self.data = data
+        self.pages = pages
+        self.entries = entries
+
+
+class _SectionDocTemplate(SimpleDocTemplate):
+    """Records the page every marked flowable is drawn on.
+
+    ``font_subset`` characters are put first in the subset of every
+    embedded TrueType font, so sections seeded with the same characters
+    embed identical font programs (see dedupe_fonts()).
+    """
+
+    def __init__(self, *args, font_subset="", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.toc_entries = []
+        self.font_subset = font_subset
+
+    def beforeDocument(self):
+        if not self.font_subset:
+            return
+        for name in pdfmetrics.getRegisteredFontNames():
+            font = pdfmetrics.getFont(name)
+            # A font is only embedded if the section uses it.
+            if isinstance(font, TTFont):
+                font.splitString(self.font_subset, self.canv._doc)
+
+    def afterFlowable(self, flowable):
+        entry = getattr(flowable, "_toc_entry", None)
+        if entry is not None:
+            self.toc_entries.append((entry[0], entry[1], self.page))
+
+
+def page_geometry(doc):
+    """Return the SimpleDocTemplate keyword arguments that fix doc's page layout."""
+    return {
+        "pagesize": tuple(doc.pagesize),
+        "leftMargin": doc.leftMargin,
+        "rightMargin": doc.rightMargin,
+        "topMargin": doc.topMargin,
+        "bottomMargin": doc.bottomMargin,
+        "showBoundary": doc.showBoundary,
+    }
+
+
+@contextmanager
+def binary_streams():
+    """Write page and image streams without ASCII85 while the block runs.
+
+    The manuals are binary files; ASCII85-wrapping every image and page
+    stream (reportlab's default) only makes them 25% larger.  reportlab
+    reads rl_config.useA85 as it writes each stream, so the setting is
+    changed for the manual builds only and other documents built in the
+    same process (the contact directory and cards) keep the default.
+    """
+    saved = rl_config.useA85
+    rl_config.useA85 = 0
+    try:
+        yield
+    finally:
+        rl_config.useA85 = saved
+
+
+def _render(geometry, flowables, font_subset=""):
+    buffer = io.BytesIO()
+    section_doc = _SectionDocTemplate(buffer, font_subset=font_subset, **geometry)
+    with binary_streams():
+        section_doc.build(list(flowables))
+    return SectionResult(buffer.getvalue(), section_doc.page, section_doc.toc_entries)
+
+
+def render_section(doc, section):
+    """Lay out one section on its own pages and return the PDF bytes."""
+    return _render(page_geometry(doc), section).data
+
+
+def render_shard(geometry, shard, font_subset=""):
+    """Worker entry point: lay out a section from its shard description.
+
+    Returns the SectionResult and the seconds spent.
+    """
+    start = time.perf_counter()
+    function, args = shard
+    data = _render(geometry, function(*args), font_subset)
+    return data, time.perf_counter() - start
+
+
+def _render_parallel(doc, sections, workers, font_subset=""):
+    """Render sections (index -> CachedSection) in worker processes."""
+    geometry = page_geometry(doc)
+    with ProcessPoolExecutor(max_workers=min(workers, len(sections))) as pool:
+        futures = {
+            index: pool.submit(render_shard, geometry, section.shard, font_subset)
+            for index, section in sections.items()
+        }
+        return {index: future.result() for index, future in futures.items()}
+
+
+def _image_digest(image):
+    smask = image.get("/SMask")
+    header = repr(sorted((key, repr(value)) for key, value in image.items() if key not in ("/SMask", "/Length")))
+    digest = hashlib.sha256(header.encode("utf-8"))
+    digest.update(image._data)
+    if smask is not None:
+        digest.update(smask.get_object()._data)
+    return digest.hexdigest()
+
+
+def dedupe_images(writer):
+    """Point every use of an identical image XObject at its first copy.
+
+    Sections are laid out separately, so a screenshot used in two sections
+    arrives in the merged file twice.  Only image streams are compared (by
+    their encoded bytes), which keeps this cheap compared to pypdf's
+    compress_identical_objects() over the whole document.
+    """
+    first = {}
+    replaced = {}
+    for page in writer.pages:
+        resources = page.get("/Resources")
+        xobjects = resources.get_object().get("/XObject") if resources is not None else None
+        if xobjects is None:
+            continue
+        xobjects = xobjects.get_object()
+        for name, ref in list(xobjects.items()):
+            if ref.idnum in replaced:
+                xobjects[NameObject(name)] = replaced[ref.idnum]
+                continue
+            image = ref.get_object()
+            if image.get("/Subtype") != "/Image":
+                continue
+            canonical = first.setdefault(_image_digest(image), ref)
+            if canonical.idnum == ref.idnum:
+                continue
+            xobjects[NameObject(name)] = canonical
+            replaced[ref.idnum] = canonical
+            writer._objects[ref.idnum - 1] = None
+            smask = image.get("/SMask")
+            if smask is not None:
+                writer._objects[smask.idnum - 1] = None
+
+
+def _font_digest(font):
+    """Digest a font dictionary with its descriptor, embedded font file and ToUnicode map."""
+    digest = hashlib.sha256()
+    parts = [font]
+    descriptor = font.get("/FontDescriptor")
+    if descriptor is not None:
+        parts.append(descriptor.get_object())
+    # /Name is the font's resource name in its own section (F1, F2, ...),
+    # which depends on the order the section happened to use its fonts.
+    skip = ("/Name", "/FontDescriptor", "/FontFile2", "/ToUnicode")
+    for part in parts:
+        digest.update(repr(sorted((key, repr(value)) for key, value in part.items() if key not in skip)).encode("utf-8"))
+    for owner, key in ((parts[-1], "/FontFile2"), (font, "/ToUnicode")):
+        stream = owner.get(key)
+        if stream is not None:
+            digest.update(stream.get_object()._data)
+    return digest.hexdigest()
+
+
+def _font_objects(ref):
+    """Return the references of a font dictionary and the objects only it uses."""
+    font = ref.get_object()
+    refs = [ref] + [font.raw_get(key) for key in ("/ToUnicode", "/FontDescriptor") if key in font]
+    descriptor = font.get("/FontDescriptor")
+    if descriptor is not None and "/FontFile2" in descriptor.get_object():
+        refs.append(descriptor.get_object().raw_get("/FontFile2"))
+    return [item for item in refs if hasattr(item, "idnum")]
+
+
+def dedupe_fonts(writer):
+    """Point every use of an identical font (dictionary, widths, font file) at its first copy.
+
+    Each section embeds the fonts it uses.  Sections seeded with the same
+    ``font_subset`` embed byte-identical TrueType subsets, so the merged
+    file keeps one copy of each face.
+    """
+    first = {}
+    replaced = {}
+    for page in writer.pages:
+        resources = page.get("/Resources")
+        fonts = resources.get_object().get("/Font") if resources is not None else None
+        if fonts is None:
+            continue
+        fonts = fonts.get_object()
+        for name, ref in list(fonts.items()):
+            if ref.idnum in replaced:
+                fonts[NameObject(name)] = replaced[ref.idnum]
+                continue
+            canonical = first.setdefault(_font_digest(ref.get_object()), ref)
+            if canonical.idnum == ref.idnum:
+                continue
+            fonts[NameObject(name)] = canonical
+            replaced[ref.idnum] = canonical
+            for duplicate in _font_objects(ref):
+                writer._objects[duplicate.idnum - 1] = None
+
+
+def build_cached(doc, flowables, cache_name, cache_dir=CACHE_DIR, profiler=None):
+    """Build ``doc`` from ``flowables``, reusing cached sections.
+
+    Falls back to a plain ``doc.build`` when pypdf is not installed.  Returns
+    a dict with the number of sections and cache hits/misses.
+    """
+    sections = [CachedSection.from_flowables(section) for section in split_sections(flowables)]
+    return build_sections(doc, sections, cache_name, cache_dir, profiler=profiler)
+
+
+def _stream_flowables(sections, record):
+    for index, section in enumerate(sections):
+        if index:
+            yield PageBreak()
+        if isinstance(section, PaginatedSection):
+            # Page numbers are not known ahead of a single streaming pass.
+            section = section.resolve([])
+        for flowable in section.make_flowables():
+            record.instrument([flowable])
+            yield flowable
+
+
+def _build_streaming(doc, sections, profiler):
+    profiler.start()
+    with profiler.section("(whole document, streamed)") as record:
+        # Flowables are created while layout runs, so "build" includes creation.
+        with record.phase("build"):
+            with binary_streams():
+                stream_build(doc, _stream_flowables(sections, record))
+        record.pages = doc.page
+    profiler.finish(Path(doc.filename).stat().st_size)
+    return {"sections": len(sections), "hits": 0, "misses": 0}
+
+
+def _embeds_fonts():
+    return any(isinstance(pdfmetrics.getFont(name), TTFont) for name in pdfmetrics.getRegisteredFontNames())
+
+
+class _SectionCache:
+    """The cached section PDFs of one manual, with their page/entry sidecars."""
+
+    PAGINATION = "pagination.json"
+    # The sections the previous build used, kept for one more build so that
+    # reverting an edit finds the section as it was.
+    PREVIOUS = "previous.json"
+
+    def __init__(self, doc, directory, font_subset=""):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.page_geometry = page_geometry(doc)
+        self.font_subset = font_subset
+        # The seed decides which subset every glyph lands in, so a section
+        # laid out with an older seed would not share its fonts with the rest.
+        seed = font_subset if _embeds_fonts() else ""
+        self.key_prefix = repr((CACHE_VERSION, reportlab.Version, sorted(self.page_geometry.items()), seed))
+        self.used = set()
+        pagination = self.directory / self.PAGINATION
+        self.pagination = json.loads(pagination.read_text(encoding="utf-8")) if pagination.exists() else {}
+        previous = self.directory / self.PREVIOUS
+        self.previous = set(json.loads(previous.read_text(encoding="utf-8"))) if previous.exists() else set()
+
+    def path(self, section):
+        if section.key is None:
+            return None
+        key = hashlib.sha256((self.key_prefix + section.key).encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.pdf"
+
+    def has(self, path):
+        return path is not None and path.exists() and path.with_suffix(".json").exists()
+
+    def load(self, path):
+        self.used.add(path.stem)
+        info = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+        return SectionResult(path.read_bytes(), info["pages"], [tuple(entry) for entry in info["entries"]])
+
+    def store(self, path, result):
+        if path is None:
+            return
+        self.used.add(path.stem)
+        info = json.dumps({"pages": result.pages, "entries": result.entries})
+        for target, write in ((path, result.data), (path.with_suffix(".json"), info.encode("utf-8"))):
+            tmp = target.with_suffix(".tmp")
+            tmp.write_bytes(write)
+            tmp.replace(target)
+
+    def finish(self):
+        """Save the pagination and drop sections used by neither this build nor the previous one."""
+        (self.directory / self.PAGINATION).write_text(json.dumps(self.pagination), encoding="utf-8")
+        (self.directory / self.PREVIOUS).write_text(json.dumps(sorted(self.used)), encoding="utf-8")
+        keep = self.used | self.previous
+        for stale in list(self.directory.glob("*.pdf")) + list(self.directory.glob("*.json")):
+            if stale.name not in (self.PAGINATION, self.PREVIOUS) and stale.stem not in keep:
+                stale.unlink()
+
+
+def _obtain(section, index, cache, profiler, stats, rendered=None):
+    """Return the SectionResult for a section: from a worker, the cache, or laid out here."""
+    path = cache.path(section)
+    hit = rendered is None and cache.has(path)
+    with profiler.section(section.title, cached=hit, index=index) as record:
+        if hit:
+            with record.phase("load"):
+                result = cache.load(path)
+            stats["hits"] += 1
+        else:
+            if rendered is not None:
+                # Laid out in a worker: only its total time is known.
+                result, record.seconds["build"] = rendered
+            else:
+                with record.phase("create"):
+                    flowables = list(section.make_flowables())
+                record.instrument(flowables)
+                with record.phase("build"):
+                    result = _render(cache.page_geometry, flowables, cache.font_subset)
+            stats["misses"] += 1
+            cache.store(path, result)
+        record.pages = result.pages
+        record.bytes = len(result.data)
+    return result
+
+
+def recorded_inputs(path):
+    """Return the inputs digest build_sections() recorded in the PDF at path, or None."""
+    if PdfReader is None or not Path(path).exists():
+        return None
+    try:
+        metadata = PdfReader(path).metadata
+    except (OSError, PdfReadError):  # a truncated or foreign file is simply rebuilt
+        return None
+    return metadata.get(INPUTS_KEY) if metadata else None
+
+
+def _start_pages(pages):
+    starts, page = [], 1
+    for count in pages:
+        starts.append(page)
+        page += count
+    return starts
+
+
+def _absolute_entries(results, starts, skip=None):
+    return [
+        (level, text, starts[index] + offset - 1)
+        for index, result in enumerate(results)
+        if result is not None and index != skip
+        for level, text, offset in result.entries
+    ]
+
+
+def _paginate(sections, results, cache, profiler, stats):
+    """Resolve every PaginatedSection once the other sections are laid out."""
+    paginated = [index for index, section in enumerate(sections) if isinstance(section, PaginatedSection)]
+    estimates = {index: cache.pagination.get(str(index), 1) for index in paginated}
+    for index in paginated:
+        for _ in range(MAX_PAGINATION_PASSES):
+            pages = [estimates.get(i) if result is None else result.pages for i, result in enumerate(results)]
+            entries = _absolute_entries(results, _start_pages(pages), skip=index)
+            result = _obtain(sections[index].resolve(entries), index, cache, profiler, stats)
+            if result.pages == estimates[index]:
+                break
+            estimates[index] = result.pages
+        results[index] = result
+        cache.pagination[str(index)] = result.pages
+
+
+def _add_outline(writer, sections, results):
+    starts = _start_pages([result.pages for result in results])
+    parents = {}
+    for index, (section, result) in enumerate(zip(sections, results)):
+        entries = result.entries or ([(0, section.title, 1)] if section.title else [])
+        for level, text, offset in entries:
+            parent = parents.get(level - 1) if level else None
+            parents[level] = writer.add_outline_item(text, starts[index] + offset - 2, parent=parent)
+            for deeper in [key for key in parents if key > level]:
+                del parents[deeper]
+
+
+def build_sections(doc, sections, cache_name, cache_dir=CACHE_DIR, profiler=None, stream=False, workers=1,
+                   font_subset="", inputs=None):
+    """Build ``doc`` from CachedSection (and PaginatedSection) objects.
+
+    ``profiler`` is an optional manual_profile.BuildProfiler.  With
+    ``stream`` (or without pypdf) the cache is bypassed and the sections are
+    laid out in one streaming pass.  With ``workers`` > 1, uncached sections
+    that have a shard are laid out in that many processes.  ``font_subset``
+    (the characters of the whole document) seeds every section's embedded
+    font subsets so the merged file needs one copy of each.  ``inputs`` is
+    recorded under INPUTS_KEY in the merged file (streamed builds cannot
+    record it).  Returns a dict
+    with the number of sections and cache hits/misses (a table of contents
+    laid out twice counts two misses).
+    """
+    profiler = profiler or NullProfiler()
+    if stream or PdfWriter is None:
+        return _build_streaming(doc, sections, profiler)
+    profiler.start(cache_name)
+
+    cache = _SectionCache(doc, Path(cache_dir) / cache_name, font_subset)
+    stats = {"sections": len(sections), "hits": 0, "misses": 0}
+    results = [None] * len(sections)
+    fixed = {index: section for index, section in enumerate(sections) if not isinstance(section, PaginatedSection)}
+
+    rendered = {}
+    if workers > 1:
+        shards = {
+            index: section for index, section in fixed.items()
+            if section.shard is not None and not cache.has(cache.path(section))
+        }
+        if len(shards) > 1:
+            with profiler.phase("parallel"):
+                rendered = _render_parallel(doc, shards, workers, font_subset)
+
+    for index, section in fixed.items():
+        results[index] = _obtain(section, index, cache, profiler, stats, rendered.pop(index, None))
+    _paginate(sections, results, cache, profiler, stats)
+    cache.finish()
+
+    writer = PdfWriter()
+    with profiler.phase("merge"):
+        for result in results:
+            writer.append(PdfReader(io.BytesIO(result.data)), import_outline=False)
+        _add_outline(writer, sections, results)
+        dedupe_images(writer)
+        dedupe_fonts(writer)
+
+    if doc.title or doc.author:
+        writer.add_metadata({"/Title": doc.title or "", "/Author": doc.author or ""})
+    if inputs:
+        writer.add_metadata({INPUTS_KEY: inputs})
+    with profiler.phase("write"):
+        writer.generate_file_identifiers()
+        with open(doc.filename, "wb") as handle:
+            writer.write(handle)
+    profiler.finish(Path(doc.filename).stat().st_size)
+    return stats
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Long-running manual builder for edit-and-preview work.
+
+Running a generator script pays for importing reportlab, building the
+stylesheet and loading fonts before any content is laid out.  The daemon
+pays for that once: it imports the pipeline, builds every manual to warm
+the section cache, and then watches manuals/*.yaml and the screenshot
+directories.  When a definition or a screenshot is saved, only the manuals
+that use it are rebuilt, and the section cache lays out only the sections
+whose content changed, so a one-paragraph edit is a single-section layout
+plus a merge.  Every rebuild prints its latency and how many sections were
+laid out.
+
+    python manual_daemon.py                  # watch all manuals
+    python manual_daemon.py user_manual.yaml --html
+
+Changes to the pipeline modules (manual_definitions.PIPELINE_MODULES, and
+manual_html with --html) restart the daemon, since already imported
+modules are not reloaded.  Stop it with Ctrl+C.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from manual_definitions import (
+    BASE_DIR, MANUALS_DIR, PIPELINE_MODULES, ManualDefinitionError, build_from_definition, load_manual,
+)
+from manual_images import ImageStore
+from manual_profile import BuildProfiler
+from manual_styles import stylesheet
+
+
+POLL_INTERVAL = 0.1
+# Editors often save in several writes; wait until files stop changing.
+SETTLE_TIME = 0.05
+
+
+def _snapshot(paths):
+    state = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        state[path] = (stat.st_size, stat.st_mtime_ns)
+    return state
+
+
+class WatchedManual:
+    """A definition file and the screenshots its sections use."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.definition = None
+        self.images = set()
+
+    def load(self):
+        self.definition = load_manual(self.path)
+        image_dir = BASE_DIR / self.definition.get("image_dir", "screenshots")
+        self.images = {
+            image_dir / name
+            for section in self.definition["sections"]
+            for block in section["blocks"]
+            for name in block.get("images", [])
+        }
+
+    def affected_by(self, changed):
+        return self.path in changed or bool(self.images & changed)
+
+
+class ManualDaemon:
+    """Rebuilds watched manuals when their definitions or screenshots change."""
+
+    def __init__(self, paths, html=False, poll_interval=POLL_INTERVAL, output=sys.stdout):
+        self.manuals = [WatchedManual(path) for path in paths]
+        self.html = html
+        self.poll_interval = poll_interval
+        self.output = output
+        # The modules a build runs (manual_html too with --html); other
+        # scripts in the directory do not affect the output.
+        modules = PIPELINE_MODULES + (("manual_html",) if html else ())
+        self.code = sorted(BASE_DIR / f"{name}.py" for name in modules)
+
+    def log(self, message):
+        print(f"[{datetime.now():%H:%M:%S}] {message}", file=self.output, flush=True)
+
+    def watched_paths(self):
+        paths = set(self.code)
+        for manual in self.manuals:
+            paths.add(manual.path)
+            paths |= manual.images
+        return paths
+
+    def build(self, manual):
+        """Rebuild one manual and log its latency; definition errors are logged, not raised."""
+        start = time.perf_counter()
+        try:
+            manual.load()
+            profiler = BuildProfiler(manual.definition["cache_name"], trace_memory=False)
+            output_pdf = build_from_definition(manual.definition, images=ImageStore(), profiler=profiler)
+            if self.html:
+                from manual_html import build_html
+
+                build_html(manual.definition)
+        except (ManualDefinitionError, OSError, ValueError) as exc:
+            self.log(f"✗ {manual.path.name}: {exc}")
+            return None
+        seconds = time.perf_counter() - start
+        if not profiler.sections:
+            self.log(f"✓ {output_pdf.name} unchanged ({seconds * 1000:.0f} ms)")
+            return seconds
+        laid_out = len({record.index for record in profiler.sections if not record.cached})
+        total = len({record.index for record in profiler.sections})
+        self.log(
+            f"✓ {output_pdf.name} in {seconds * 1000:.0f} ms "
+            f"({laid_out} of {total} sections laid out, {profiler.pages()} pages)"
+        )
+        return seconds
+
+    def warm_up(self):
+        start = time.perf_counter()
+        stylesheet()
+        for manual in self.manuals:
+            self.build(manual)
+        self.log(f"Warm in {time.perf_counter() - start:.2f}s; watching {len(self.watched_paths())} files")
+
+    def changed_files(self, before):
+        """Return the paths that changed since ``before`` and the new snapshot, once writes have settled."""
+        after = _snapshot(self.watched_paths())
+        if after == before:
+            return set(), before
+        while True:
+            time.sleep(SETTLE_TIME)
+            settled = _snapshot(self.watched_paths())
+            if settled == after:
+                break
+            after = settled
+        changed = {path for path in set(before) | set(after) if before.get(path) != after.get(path)}
+        return changed, after
+
+    def run(self):
+        self.warm_up()
+        state = _snapshot(self.watched_paths())
+        while True:
+            time.sleep(self.poll_interval)
+            changed, state = self.changed_files(state)
+            if not changed:
+                continue
+            if changed & set(self.code):
+                self.log("Generator code changed; restarting")
+                os.execv(sys.executable, [sys.executable, *sys.argv])
+            for manual in self.manuals:
+                if manual.affected_by(changed):
+                    self.build(manual)
+            # A definition may now use different screenshots.
+            state = _snapshot(self.watched_paths())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild manuals as their definitions and screenshots change.")
+    parser.add_argument("definitions", nargs="*", help="definition files in manuals/ (default: all)")
+    parser.add_argument("--html", action="store_true", help="also rebuild the HTML help pages")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL,
+                        help=f"seconds between file checks (default: {POLL_INTERVAL})")
+    args = parser.parse_args(argv)
+
+    paths = [MANUALS_DIR / name for name in args.definitions] or sorted(MANUALS_DIR.glob("*.yaml"))
+    try:
+        ManualDaemon(paths, html=args.html, poll_interval=args.interval).run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Data-driven manual definitions shared by all manual generators.
+
+A manual is described by a YAML (or JSON) file in manuals/: page setup,
+table styles, paragraph style overrides on top of the shared registry in
+manual_styles, and a list of sections, each of which starts on
+a new page and holds a list of blocks:
+
+    paragraph: text             (style defaults to defaults.body)
+    heading: text               (style defaults to defaults.heading)
+    spacer: 0.2                 (height in inches)
+    list: [item, ...]           (one paragraph per item, ``spacing`` inches apart)
+    steps: [step, ...]          ("Steps:" followed by a numbered list)
+    images: [file, ...]         (screenshots from image_dir, scaled to the page width)
+    table: {rows, col_widths, style}
+    toc: {levels, spacing}      (table of contents with page numbers)
+
+Headings, and any paragraph given ``toc_level: N``, become table of
+contents entries and PDF outline bookmarks (level 0 for headings unless
+``toc_level`` says otherwise).
+
+Any text may contain ``{date:FORMAT}``, replaced with the build time
+formatted by strftime.  When SOURCE_DATE_EPOCH is set (seconds since 1970,
+as in reproducible-builds.org) that time is used instead of the clock.
+The expanded text is part of the inputs digest and the section cache
+keys, so a format with the time of day rebuilds the manual every time it
+changes; the manuals print dates only.
+
+load_manual() reads and validates a definition, compile_sections() turns
+it into manual_cache.CachedSection objects keyed by the section data, and
+build_from_definition() does both and writes the PDF.  It records a digest
+of everything the PDF depends on (inputs_manifest()) in the file, and when
+the existing PDF already records the same digest it is left untouched.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+from importlib import metadata
+from xml.sax.saxutils import escape
+from datetime import datetime, timezone
+from pathlib import Path
+
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Spacer, Table, TableStyle
+
+from manual_cache import (
+    CACHE_DIR, CACHE_VERSION, CachedSection, PaginatedSection, build_sections, file_digest, mark_toc_entry,
+    recorded_inputs,
+)
+from manual_fonts import ensure_font, used_characters
+from manual_images import ImageStore, image_flowable
+from manual_paragraphs import paragraph
+from manual_styles import color, derive_style, has_style, registry_fingerprint
+
+try:
+    import yaml
+except ImportError:  # PyYAML is only needed for .yaml definitions
+    yaml = None
+
+
+BASE_DIR = Path(__file__).resolve().parent
+MANUALS_DIR = BASE_DIR / "manuals"
+
+PAGE_SIZES = {"letter": letter, "A4": A4}
+BLOCK_TYPES = ("paragraph", "heading", "spacer", "list", "steps", "images", "table", "toc")
+DEFAULT_MARGIN = 1.0
+
+# Modules and distributions whose changes can change a PDF; part of the inputs manifest.
+PIPELINE_MODULES = (
+    "manual_cache", "manual_definitions", "manual_fonts", "manual_images", "manual_memory", "manual_paragraphs",
+    "manual_streaming", "manual_styles",
+)
+PIPELINE_PACKAGES = ("reportlab", "pypdf", "Pillow")
+
+_DATE_PLACEHOLDER = re.compile(r"\{date:([^}]*)\}")
+
+
+class ManualDefinitionError(ValueError):
+    """Raised when a manual definition file is malformed."""
+
+
+def load_manual(path):
+    """Read and validate a manual definition from a .yaml/.yml or .json file."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        if yaml is None:
+            raise ManualDefinitionError(f"{path.name}: PyYAML is required to read YAML manual definitions")
+        definition = yaml.safe_load(text)
+    else:
+        definition = json.loads(text)
+    validate_manual(definition, path.name)
+    definition.setdefault("cache_name", path.stem)
+    return definition
+
+
+def validate_manual(definition, source="manual"):
+    """Raise ManualDefinitionError if definition does not follow the schema."""
+    if not isinstance(definition, dict):
+        raise ManualDefinitionError(f"{source}: top level must be a mapping")
+    for key in ("output", "sections"):
+        if key not in definition:
+            raise ManualDefinitionError(f"{source}: missing required key '{key}'")
+    styles = definition.get("styles", {})
+    table_styles = definition.get("table_styles", {})
+    for name, spec in styles.items():
+        parent = spec.get("parent")
+        if parent is not None and not has_style(parent):
+            raise ManualDefinitionError(f"{source}: style {name!r} derives from unknown style {parent!r}")
+
+    for index, section in enumerate(definition["sections"], start=1):
+        where = f"{source}: section {section.get('id', index)!r}"
+        if not isinstance(section.get("blocks"), list):
+            raise ManualDefinitionError(f"{where}: 'blocks' must be a list")
+        for block in section["blocks"]:
+            kinds = [kind for kind in BLOCK_TYPES if kind in block]
+            if len(kinds) != 1:
+                raise ManualDefinitionError(f"{where}: each block needs exactly one of {BLOCK_TYPES}, got {block!r}")
+            style = block.get("style")
+            if kinds[0] == "table":
+                table_style = block["table"].get("style")
+                if isinstance(table_style, str) and table_style not in table_styles:
+                    raise ManualDefinitionError(f"{where}: unknown table style {table_style!r}")
+            elif style is not None and style not in styles and not has_style(style):
+                raise ManualDefinitionError(f"{where}: unknown paragraph style {style!r}")
+
+
+def expand_placeholders(value, now):
+    """Return value with every ``{date:FORMAT}`` in its strings filled in."""
+    if isinstance(value, str):
+        return _DATE_PLACEHOLDER.sub(lambda match: now.strftime(match.group(1)), value)
+    if isinstance(value, list):
+        return [expand_placeholders(item, now) for item in value]
+    if isinstance(value, dict):
+        return {key: expand_placeholders(item, now) for key, item in value.items()}
+    return value
+
+
+def source_date():
+    """Return the build time: SOURCE_DATE_EPOCH (in UTC) when it is set, the clock otherwise."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH", "").strip()
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), timezone.utc)
+    return datetime.now()
+
+
+def _package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def inputs_manifest(definition, now, images=None, stream=False):
+    """Return everything a definition's PDF depends on, as a JSON-serialisable dict.
+
+    That is the expanded definition, the style registry and fonts, the
+    screenshot files and how they are prepared, the pipeline code and the
+    library versions.  The worker count is left out: it does not change
+    the output.
+    """
+    images = images or ImageStore()
+    image_dir = BASE_DIR / definition.get("image_dir", "screenshots")
+    names = sorted({name for section in definition["sections"] for block in section["blocks"]
+                    for name in block.get("images", [])})
+    return {
+        "cache_version": CACHE_VERSION,
+        "definition": expand_placeholders(definition, now),
+        "styles": registry_fingerprint(),
+        "images": {name: file_digest(image_dir / name) if (image_dir / name).exists() else None for name in names},
+        "image_settings": [images.dpi, images.image_format, images.near_duplicates, images.threshold],
+        "code": {name: file_digest(BASE_DIR / f"{name}.py") for name in PIPELINE_MODULES},
+        "packages": {name: _package_version(name) for name in PIPELINE_PACKAGES},
+        "stream": stream,
+    }
+
+
+def inputs_digest(definition, now, images=None, stream=False):
+    """Return the sha256 of inputs_manifest()."""
+    material = json.dumps(inputs_manifest(definition, now, images, stream), sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def up_to_date(definition, pdf, now=None, images=None):
+    """Return True when pdf was built from exactly the inputs the definition has now."""
+    if not isinstance(definition, dict):
+        definition = load_manual(definition)
+    recorded = recorded_inputs(pdf)
+    return recorded is not None and recorded == inputs_digest(definition, now or source_date(), images)
+
+
+def paragraph_styles(definition):
+    """Return a name -> ParagraphStyle resolver for a definition.
+
+    Names resolve to the shared registry in manual_styles.  A definition's
+    ``styles`` entry overrides a registered style of the same name, or
+    derives a new one from ``parent``; both are memoised by the registry.
+    """
+    built = {}
+    for name, spec in definition.get("styles", {}).items():
+        spec = dict(spec)
+        parent = spec.pop("parent", None) or (name if has_style(name) else "Normal")
+        built[name] = derive_style(parent, name=name, **spec)
+
+    def resolve(name):
+        return built[name] if name in built else derive_style(name)
+
+    return resolve
+
+
+def table_style(commands):
+    """Turn definition table commands ([OP, [c, r], [c, r], args...]) into a TableStyle."""
+    converted = []
+    for command in commands:
+        op, start, stop, *args = command
+        if op in ("FONTNAME", "FONT"):
+            ensure_font(args[0])
+        elif op not in ("ALIGN", "VALIGN"):
+            args = [[color(item) for item in arg] if isinstance(arg, list) else color(arg) for arg in args]
+        converted.append((op, tuple(start), tuple(stop), *args))
+    return TableStyle(converted)
+
+
+def page_setup(definition):
+    """Return the SimpleDocTemplate keyword arguments for a definition."""
+    page = definition.get("page", {})
+    margins = page.get("margins", {})
+    return {
+        "pagesize": PAGE_SIZES[page.get("size", "letter")],
+        "topMargin": margins.get("top", DEFAULT_MARGIN) * inch,
+        "bottomMargin": margins.get("bottom", DEFAULT_MARGIN) * inch,
+        "leftMargin": margins.get("left", DEFAULT_MARGIN) * inch,
+        "rightMargin": margins.get("right", DEFAULT_MARGIN) * inch,
+    }
+
+
+def section_title(section):
+    """Return a section's title: explicit ``title`` or its first heading."""
+    if section.get("title"):
+        return section["title"]
+    for block in section["blocks"]:
+        if "heading" in block:
+            return block["heading"]
+    return None
+
+
+class SectionCompiler:
+    """Turns the blocks of expanded sections into flowables."""
+
+    def __init__(self, definition, width, images, base_dir=BASE_DIR):
+        self.definition = definition
+        self.width = width
+        self.images = images
+        self.buffers = images.buffers if images is not None else None
+        self.image_dir = base_dir / definition.get("image_dir", "screenshots")
+        self.style = paragraph_styles(definition)
+        defaults = definition.get("defaults", {})
+        self.body = defaults.get("body", "BodyText")
+        self.heading = defaults.get("heading", "Heading2")
+
+    def image_entries(self, section):
+        """Return (name, PreparedImage or None) for every image the section uses."""
+        entries = []
+        for block in section["blocks"]:
+            for name in block.get("images", []):
+                path = self.image_dir / name
+                entries.append((name, self.images.prepare(path, self.width) if path.exists() else None))
+        return entries
+
+    def toc_table(self, spec, entries):
+        """Return the table of contents for (level, text, page) entries."""
+        levels = spec.get("levels", 2)
+        spacing = spec.get("spacing", 0.05) * inch
+        page_style = derive_style(self.body, name=f"{self.body}-TOCPage", alignment="right")
+        rows = []
+        for level, text, page in entries:
+            if level >= levels:
+                continue
+            text = escape(text)
+            if level:
+                style = derive_style(self.body, name=f"{self.body}-TOC{level}", leftIndent=18 * level)
+            else:
+                style, text = self.style(self.body), f"<b>{text}</b>"
+            rows.append([paragraph(text, style), paragraph(str(page), page_style)])
+        if not rows:
+            return Spacer(1, 0)
+        table = Table(rows, colWidths=[self.width - 0.6 * inch, 0.6 * inch])
+        table.setStyle(TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "BOTTOM"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 0),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+            ("TOPPADDING", (0, 0), (-1, -1), 0),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), spacing),
+        ]))
+        return table
+
+    def flowables(self, section, prepared, toc_entries=()):
+        """Yield the flowables of an expanded section, one block at a time."""
+        prepared = iter(prepared)
+        for block in section["blocks"]:
+            style = block.get("style")
+            level = block.get("toc_level", 0 if "heading" in block else None)
+            if "paragraph" in block:
+                flowable = paragraph(block["paragraph"], self.style(style or self.body))
+                yield flowable if level is None else mark_toc_entry(flowable, level)
+            elif "heading" in block:
+                flowable = paragraph(block["heading"], self.style(style or self.heading))
+                yield flowable if level is None else mark_toc_entry(flowable, level)
+            elif "toc" in block:
+                yield self.toc_table(block["toc"] or {}, toc_entries)
+            elif "spacer" in block:
+                yield Spacer(1, block["spacer"] * inch)
+            elif "list" in block:
+                spacing = block.get("spacing", 0)
+                for item in block["list"]:
+                    yield paragraph(item, self.style(style or self.body))
+                    if spacing:
+                        yield Spacer(1, spacing * inch)
+            elif "steps" in block:
+                body = self.style(style or self.body)
+                yield paragraph(block.get("label", "Steps:"), body)
+                for number, step in enumerate(block["steps"], start=1):
+                    yield paragraph(f"{number}. {step}", body)
+            elif "images" in block:
+                for name in block["images"]:
+                    _, image = next(prepared)
+                    if image is None:
+                        yield paragraph(f"[Missing image: {name}]", self.style(self.body))
+                        continue
+                    flowable = image_flowable(image, self.width, self.buffers)
+                    if flowable:
+                        yield flowable
+                        yield Spacer(1, 0.2 * inch)
+            elif "table" in block:
+                spec = block["table"]
+                commands = spec.get("style", [])
+                if isinstance(commands, str):
+                    commands = self.definition["table_styles"][commands]
+                widths = spec.get("col_widths")
+                table = Table(spec["rows"], colWidths=[w * inch for w in widths] if widths else None)
+                table.setStyle(table_style(commands))
+                yield table
+
+
+def section_flowables(definition, width, section, prepared, toc_entries=()):
+    """Return the flowables of one expanded section; used by parallel workers."""
+    return list(SectionCompiler(definition, width, images=None).flowables(section, prepared, toc_entries))
+
+
+def compile_sections(definition, width, images=None, now=None, workers=1):
+    """Return a CachedSection for every section of a loaded definition.
+
+    Each key covers the expanded section data, the style and page setup it
+    is rendered with, and the prepared screenshot files it embeds.  A section
+    with a ``toc`` block becomes a PaginatedSection whose key also covers
+    the entries and page numbers it lists.  With ``workers`` > 1 uncached
+    screenshots are prepared in that many processes.
+    """
+    now = now or source_date()
+    images = images or ImageStore()
+    compiler = SectionCompiler(definition, width, images)
+    if workers > 1:
+        image_dir = compiler.image_dir
+        names = [name for section in definition["sections"] for block in section["blocks"]
+                 for name in block.get("images", [])]
+        images.prefetch([image_dir / name for name in names if (image_dir / name).exists()], width, workers)
+    # What a worker needs to rebuild a section: everything but the other sections.
+    shared_definition = {key: value for key, value in definition.items() if key != "sections"}
+    shared = registry_fingerprint() + json.dumps(
+        {key: definition.get(key) for key in ("styles", "table_styles", "defaults", "image_dir")},
+        sort_keys=True,
+    )
+
+    sections = []
+    for section in definition["sections"]:
+        section = expand_placeholders(copy.deepcopy(section), now)
+        prepared = compiler.image_entries(section)
+        material = json.dumps(
+            {
+                "section": section,
+                "images": [(name, image.path.name if image else None) for name, image in prepared],
+            },
+            sort_keys=True,
+        )
+
+        def make(entries=(), section=section, prepared=prepared, material=shared + material):
+            if entries:
+                material += json.dumps(entries)
+            return CachedSection(
+                hashlib.sha256(material.encode("utf-8")).hexdigest(),
+                lambda: compiler.flowables(section, prepared, entries),
+                title=section_title(section),
+                shard=(section_flowables, (shared_definition, width, section, prepared, entries)),
+            )
+
+        if any("toc" in block for block in section["blocks"]):
+            sections.append(PaginatedSection(make, title=section_title(section)))
+        else:
+            sections.append(make())
+    return sections
+
+
+def build_from_definition(definition, output_pdf=None, images=None, now=None, profiler=None,
+                          cache_dir=CACHE_DIR, stream=False, workers=1, force=False):
+    """Build the PDF described by a definition (a path or a loaded mapping).
+
+    ``profiler`` is an optional manual_profile.BuildProfiler; ``stream``
+    bypasses the section cache and streams the flowables through layout;
+    ``workers`` > 1 prepares screenshots and lays out uncached sections in
+    that many processes.  An existing output_pdf built from the same inputs
+    is left as it is (and nothing is profiled) unless ``force`` is set.
+    """
+    if not isinstance(definition, dict):
+        definition = load_manual(definition)
+    now = now or source_date()
+    images = images or ImageStore()
+    output_pdf = Path(output_pdf or BASE_DIR / definition["output"])
+    inputs = inputs_digest(definition, now, images, stream)
+    if not force and not stream and recorded_inputs(output_pdf) == inputs:
+        return output_pdf
+    doc = SimpleDocTemplate(str(output_pdf), title=definition.get("title"), **page_setup(definition))
+    sections = compile_sections(definition, doc.width, images=images, now=now, workers=workers)
+    build_sections(
+        doc, sections, definition["cache_name"], cache_dir, profiler=profiler, stream=stream, workers=workers,
+        font_subset=used_characters(expand_placeholders(definition["sections"], now)), inputs=inputs,
+    )
+    return output_pdf
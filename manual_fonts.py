@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Embedded TrueType fonts for the manual generators.
+
+The built-in Helvetica and Courier only cover Latin-1, so names in other
+scripts need an embedded font.  A style whose ``fontName`` names a family in
+FONT_FAMILIES (``Lato``, ``Lato-Bold``, ...) registers the whole family on
+first use, so <b> and <i> in paragraph markup pick the matching face.
+
+reportlab embeds only the glyphs a document uses (a subset).  Parsing a
+TrueType file is the expensive part, so load_face() keeps every parsed face
+for the life of the process and also pickles it under .manual_cache/fonts/,
+keyed by the font file's sha256 and the reportlab version.  Worker processes
+and later builds load the pickle instead of parsing the file again.
+
+Sections are laid out as separate documents, so each would embed its own
+subset of the same font.  build_sections() is given used_characters() of
+the whole manual and puts them first in every section's subsets.  Every
+section then embeds an identical font program, and dedupe_fonts() keeps a
+single copy in the merged file.
+"""
+
+import pickle
+from fnmatch import fnmatch
+from weakref import WeakKeyDictionary
+
+import reportlab
+from reportlab.lib.fonts import addMapping, ps2tt, tt2ps
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTEncoding, TTFont, TTFontFace
+from reportlab import rl_config
+
+from manual_cache import BASE_DIR, CACHE_DIR, file_digest
+
+
+FONT_CACHE_DIR = CACHE_DIR / "fonts"
+FONT_DIRS = (
+    BASE_DIR / "Published" / "LatoFont",
+    BASE_DIR / "Deployment" / "ContactManagementSystem-win-x64" / "LatoFont",
+)
+
+# family -> face -> file name; face names are registered as "<family>",
+# "<family>-Bold", "<family>-Italic" and "<family>-BoldItalic".
+FONT_FAMILIES = {
+    "Lato": {
+        "normal": "Lato-Regular.ttf",
+        "bold": "Lato-Bold.ttf",
+        "italic": "Lato-Italic.ttf",
+        "boldItalic": "Lato-BoldItalic.ttf",
+    },
+}
+_FACE_SUFFIXES = {"normal": "", "bold": "-Bold", "italic": "-Italic", "boldItalic": "-BoldItalic"}
+_FLAGS = {"normal": (0, 0), "bold": (1, 0), "italic": (0, 1), "boldItalic": (1, 1)}
+
+_faces = {}
+
+
+class FontNotFound(LookupError):
+    """Raised when a font family's files are not in any of FONT_DIRS."""
+
+
+def find_font_file(file_name):
+    for directory in FONT_DIRS:
+        path = directory / file_name
+        if path.exists():
+            return path
+    raise FontNotFound(f"{file_name} not found in {', '.join(str(directory) for directory in FONT_DIRS)}")
+
+
+def _scale(units_per_em):
+    # TTFontFile keeps this as a lambda, which cannot be pickled.
+    if units_per_em == 1000:
+        return lambda value: value
+    factor = 1000 / units_per_em
+    return lambda value: value * factor
+
+
+def load_face(path, cache_dir=FONT_CACHE_DIR):
+    """Return the parsed TTFontFace for path, from memory, the pickle cache or the file."""
+    digest = file_digest(path)
+    face = _faces.get(digest)
+    if face is not None:
+        return face
+    cached = cache_dir / f"{digest[:24]}-rl{reportlab.Version}.pickle"
+    if cached.exists():
+        face = TTFontFace.__new__(TTFontFace)
+        face.__dict__.update(pickle.loads(cached.read_bytes()))
+    else:
+        face = TTFontFace(str(path))
+        state = {key: value for key, value in vars(face).items() if key != "_pdfScale"}
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_suffix(".tmp")
+        tmp.write_bytes(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+        tmp.replace(cached)
+    face._pdfScale = _scale(face.unitsPerEm)
+    _faces[digest] = face
+    return face
+
+
+class CachedTTFont(TTFont):
+    """TTFont built from a face returned by load_face() instead of parsing the file."""
+
+    def __init__(self, name, path):
+        # Mirrors TTFont.__init__, minus the parse.
+        self.fontName = name
+        self.face = load_face(path)
+        self.encoding = TTEncoding()
+        self.state = WeakKeyDictionary()
+        self._asciiReadable = rl_config.ttfAsciiReadable
+        self.shapable = not any(fnmatch(name, pattern) for pattern in rl_config.unShapedFontGlob)
+
+
+def register_family(family):
+    """Register every face of a FONT_FAMILIES family (once) and map it for <b>/<i> markup."""
+    names = {face: family + suffix for face, suffix in _FACE_SUFFIXES.items()}
+    if names["normal"] in pdfmetrics.getRegisteredFontNames():
+        return names
+    for face, file_name in FONT_FAMILIES[family].items():
+        pdfmetrics.registerFont(CachedTTFont(names[face], find_font_file(file_name)))
+    for face, name in names.items():
+        addMapping(family, *_FLAGS[face], name)
+    return names
+
+
+def ensure_font(font_name):
+    """Register the family of font_name if it is an embedded TTF face; built-in names pass through."""
+    for family in FONT_FAMILIES:
+        if font_name == family or font_name.startswith(family + "-"):
+            register_family(family)
+    return font_name
+
+
+def bold_font_name(font_name):
+    """Return the bold face of font_name's family: Times-Roman -> Times-Bold, Lato -> Lato-Bold.
+
+    font_name must be one of the built-in fonts or a face of a FONT_FAMILIES
+    family; anything else raises ValueError.
+    """
+    ensure_font(font_name)
+    try:
+        pdfmetrics.getFont(font_name)
+        family, _, italic = ps2tt(font_name)
+    except (KeyError, ValueError):
+        known = ", ".join((*pdfmetrics.standardFonts, *FONT_FAMILIES))
+        raise ValueError(f"unknown font {font_name!r}; use one of {known}") from None
+    return tt2ps(family, 1, italic)
+
+
+def fonts_fingerprint():
+    """Return the sha256 of every available FONT_FAMILIES file, for cache keys."""
+    digests = []
+    for family, faces in sorted(FONT_FAMILIES.items()):
+        for face, file_name in sorted(faces.items()):
+            try:
+                digests.append(file_digest(find_font_file(file_name)))
+            except FontNotFound:
+                digests.append(None)
+    return repr(digests)
+
+
+def used_characters(value):
+    """Return the distinct characters of every string in value (nested lists/dicts), sorted."""
+    characters = set()
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            characters.update(item)
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return "".join(sorted(characters))
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Static HTML help pages built from the same manual definitions as the PDFs.
+
+Phones that open a help link should not have to download a multi-megabyte
+PDF to read one section.  build_html() compiles every section of a manual
+definition (see manual_definitions) to its own small HTML page: styles are
+translated from the same paragraph style registry and table styles the PDF
+uses, the CSS a page needs is inlined so each section is a single request,
+and screenshots are served from a shared images/ directory as AVIF and WebP
+variants at several widths (``srcset``) that load lazily.
+
+The site is written to the app's wwwroot, where ASP.NET Core's static file
+middleware serves it at /help/.  The pages are build output and are not
+committed (the directory is in .gitignore); build them before publishing
+the app:
+
+    wwwroot/help/index.html                    list of manuals (manuals.json)
+    wwwroot/help/<manual>/index.html           title page and contents
+    wwwroot/help/<manual>/<section id>.html    one page per section
+    wwwroot/help/images/<name>-<hash>-<w>w.avif/.webp
+
+    python manual_html.py                      # every manual in manuals/
+    python manual_html.py screenshot_manual.yaml --workers 4
+
+A table of contents block becomes a list of links; the HTML pages have no
+page numbers.
+"""
+
+import argparse
+import copy
+import json
+import re
+import sys
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+
+from manual_cache import plain_text
+from manual_definitions import (
+    MANUALS_DIR, expand_placeholders, load_manual, paragraph_styles, section_title, source_date,
+)
+from manual_images import WEB_FORMATS, web_images
+from manual_styles import color
+
+
+BASE_DIR = Path(__file__).resolve().parent
+HELP_DIR = BASE_DIR / "ContactManagementAPI" / "wwwroot" / "help"
+
+# Pages are at most this wide, so no screenshot is shown wider.
+CONTENT_WIDTH = 720
+IMAGE_SIZES = f"(max-width: {CONTENT_WIDTH + 40}px) calc(100vw - 32px), {CONTENT_WIDTH}px"
+
+BASE_CSS = (
+    "body{margin:0;font:100%/1.45 -apple-system,'Segoe UI',Roboto,Helvetica,Arial,sans-serif;color:#222}"
+    f"main{{max-width:{CONTENT_WIDTH}px;margin:0 auto;padding:8px 16px}}"
+    f"nav{{display:flex;justify-content:space-between;gap:8px;max-width:{CONTENT_WIDTH}px;margin:0 auto;"
+    "padding:8px 16px;font-size:.9em}"
+    "nav a{color:#667eea}"
+    "img{max-width:100%;height:auto}"
+    "picture{display:block;margin:.5em 0 1em}"
+    ".table{overflow-x:auto}"
+    "table{border-collapse:collapse;margin:.5em 0}"
+    "td,th{padding:4px 6px;text-align:left;vertical-align:top}"
+    "ul.contents{padding-left:1.2em}"
+)
+
+_FONT_FAMILIES = {"Times": "Georgia,'Times New Roman',serif", "Courier": "Menlo,Consolas,monospace"}
+
+_TAG = re.compile(r"<(/?)([a-zA-Z]+)[^>]*>")
+_INLINE_TAGS = {"b": "b", "strong": "strong", "i": "i", "em": "em", "u": "u", "sup": "sup", "sub": "sub",
+                "strike": "s", "br": "br"}
+_BARE_AMPERSAND = re.compile(r"&(?!#?\w+;)")
+
+
+def _escape_text(text):
+    return _BARE_AMPERSAND.sub("&amp;", text).replace("<", "&lt;").replace(">", "&gt;")
+
+
+def html_markup(markup):
+    """Return reportlab paragraph markup as HTML.
+
+    Inline formatting (<b>, <i>, <u>, <br/>, ...) is kept; other reportlab
+    tags such as <font> are dropped and their text kept.
+    """
+    parts = []
+    position = 0
+    for match in _TAG.finditer(markup):
+        parts.append(_escape_text(markup[position:match.start()]))
+        closing, name = match.groups()
+        tag = _INLINE_TAGS.get(name.lower())
+        if tag == "br":
+            parts.append("<br>")
+        elif tag:
+            parts.append(f"<{closing}{tag}>")
+        position = match.end()
+    parts.append(_escape_text(markup[position:]))
+    return "".join(parts).strip()
+
+
+def slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "section"
+
+
+def _css_color(value):
+    return "#" + color(value).hexval()[2:]
+
+
+def _em(points, body_size):
+    return f"{points / body_size:.3g}em"
+
+
+def style_css(selector, style, body_size):
+    """Return a CSS rule reproducing a ParagraphStyle's typography."""
+    rules = [f"font-size:{_em(style.fontSize, body_size)}", f"line-height:{style.leading / style.fontSize:.3g}"]
+    rules.append(f"margin:{_em(style.spaceBefore, style.fontSize)} 0 {_em(style.spaceAfter, style.fontSize)}")
+    if style.textColor is not None and _css_color(style.textColor) != "#000000":
+        rules.append(f"color:{_css_color(style.textColor)}")
+    # Justified text on a phone-width column leaves wide gaps; only
+    # centred and right alignment are carried over.
+    if style.alignment == TA_CENTER:
+        rules.append("text-align:center")
+    elif style.alignment == TA_RIGHT:
+        rules.append("text-align:right")
+    font = style.fontName
+    rules.append(f"font-weight:{'bold' if 'Bold' in font else 'normal'}")
+    if "Italic" in font or "Oblique" in font:
+        rules.append("font-style:italic")
+    for family, stack in _FONT_FAMILIES.items():
+        if font.startswith(family):
+            rules.append(f"font-family:{stack}")
+    if style.leftIndent:
+        rules.append(f"margin-left:{_em(style.leftIndent, style.fontSize)}")
+    return f"{selector}{{{';'.join(rules)}}}"
+
+
+def _cells(start, stop):
+    """Return the CSS selector for a table style cell range, or None if it has no simple equivalent."""
+    (start_col, start_row), (stop_col, stop_row) = start, stop
+    rows = {(0, 0): "tr:first-child", (0, -1): "tr", (1, -1): "tr:not(:first-child)"}.get((start_row, stop_row))
+    cols = {(0, -1): ">*", (0, 0): ">:first-child"}.get((start_col, stop_col))
+    return None if rows is None or cols is None else rows + cols
+
+
+def table_css(selector, commands, body_size):
+    """Translate the table style commands a definition uses into CSS rules."""
+    rules = []
+    for op, start, stop, *args in commands:
+        op = op.upper()
+        if op == "ROWBACKGROUNDS":
+            first_row, backgrounds = start[1], args[0]
+            for offset, background in enumerate(backgrounds):
+                nth = f"{len(backgrounds)}n+{first_row + 1 + offset}"
+                rules.append(f"{selector} tr:nth-child({nth})>*{{background:{_css_color(background)}}}")
+            continue
+        cells = _cells(start, stop)
+        if cells is None:
+            continue
+        declaration = None
+        if op == "BACKGROUND":
+            declaration = f"background:{_css_color(args[0])}"
+        elif op == "TEXTCOLOR":
+            declaration = f"color:{_css_color(args[0])}"
+        elif op in ("FONTNAME", "FONT"):
+            declaration = f"font-weight:{'bold' if 'Bold' in args[0] else 'normal'}"
+        elif op == "FONTSIZE":
+            declaration = f"font-size:{_em(args[0], body_size)}"
+        elif op == "ALIGN":
+            declaration = f"text-align:{args[0].lower()}"
+        elif op in ("GRID", "BOX", "INNERGRID"):
+            declaration = f"border:{args[0]}px solid {_css_color(args[1])}"
+        elif op in ("TOPPADDING", "BOTTOMPADDING", "LEFTPADDING", "RIGHTPADDING"):
+            declaration = f"padding-{op[:-7].lower()}:{args[0]}px"
+        if declaration:
+            rules.append(f"{selector} {cells}{{{declaration}}}")
+    return "".join(rules)
+
+
+class HtmlPage:
+    """One section of a manual rendered as a page."""
+
+    def __init__(self, section, index, file_name):
+        self.section = section
+        self.index = index
+        self.file_name = file_name
+        self.title = section_title(section)
+        self.anchors = []
+
+    def anchor(self, text):
+        """Return the next page-unique anchor id for a heading."""
+        base = name = slug(text)
+        number = 1
+        while name in self.anchors:
+            number += 1
+            name = f"{base}-{number}"
+        self.anchors.append(name)
+        return name
+
+
+class HtmlCompiler:
+    """Turns the blocks of expanded sections into HTML, like SectionCompiler does flowables."""
+
+    def __init__(self, definition, image_dir, web, images_url="../images/"):
+        self.definition = definition
+        self.image_dir = image_dir
+        self.web = web
+        self.images_url = images_url
+        self.style = paragraph_styles(definition)
+        defaults = definition.get("defaults", {})
+        self.body = defaults.get("body", "BodyText")
+        self.heading = defaults.get("heading", "Heading2")
+        self.body_size = self.style(self.body).fontSize
+        self.used_styles = set()
+        self.used_tables = set()
+
+    def css_class(self, name):
+        self.used_styles.add(name)
+        return f"s-{slug(name)}"
+
+    def css(self):
+        """Return the CSS for the styles used since the last call, and forget them."""
+        rules = [style_css(f".s-{slug(name)}", self.style(name), self.body_size) for name in sorted(self.used_styles)]
+        for name in sorted(self.used_tables):
+            rules.append(table_css(f".t-{slug(name)}", self.definition["table_styles"][name], self.body_size))
+        self.used_styles.clear()
+        self.used_tables.clear()
+        return "".join(rules)
+
+    def toc_entries(self, pages):
+        """Return (level, text, href) for the headings and ``toc_level`` paragraphs of every page."""
+        entries = []
+        for page in pages:
+            for block in page.section["blocks"]:
+                level = block.get("toc_level", 0 if "heading" in block else None)
+                if level is None or not ("heading" in block or "paragraph" in block):
+                    continue
+                text = plain_text(block.get("heading") or block.get("paragraph"))
+                entries.append((level, text, f"{page.file_name}#{page.anchor(text)}"))
+            page.anchors.clear()
+        return entries
+
+    def contents(self, entries, levels=2):
+        """Return a nested list of links for (level, text, href) entries."""
+        html = []
+        depth = -1
+        for level, text, href in entries:
+            if level >= levels:
+                continue
+            while depth < level:
+                html.append('<ul class="contents">' if depth < 0 else "<ul>")
+                depth += 1
+            while depth > level:
+                html.append("</ul>")
+                depth -= 1
+            html.append(f'<li><a href="{escape(href)}">{escape(text)}</a>')
+        html.extend("</ul>" for _ in range(depth + 1))
+        return "".join(html)
+
+    def picture(self, name, eager):
+        image = self.web.get(self.image_dir / name)
+        if image is None:
+            return f'<p class="{self.css_class(self.body)}">[Missing image: {escape(name)}]</p>'
+        alt = escape(Path(name).stem.replace("_", " "), {'"': "&quot;"})
+        width, height = image.size
+        html = ["<picture>"]
+        for image_format, variants in image.variants.items():
+            srcset = ", ".join(f"{self.images_url}{path.name} {pixels}w" for path, pixels in variants)
+            html.append(f'<source type="image/{image_format}" srcset="{srcset}" sizes="{IMAGE_SIZES}">')
+        # The first screenshot on a page is usually in view when it opens.
+        loading = "eager" if eager else "lazy"
+        html.append(
+            f'<img src="{self.images_url}{image.fallback.name}" width="{width}" height="{height}" '
+            f'alt="{alt}" loading="{loading}" decoding="async"></picture>'
+        )
+        return "".join(html)
+
+    def blocks(self, page, entries=()):
+        """Return the HTML of an expanded section's blocks."""
+        html = []
+        first_image = True
+        for block in page.section["blocks"]:
+            style = block.get("style")
+            level = block.get("toc_level", 0 if "heading" in block else None)
+            if "paragraph" in block or "heading" in block:
+                text = block.get("heading") or block.get("paragraph")
+                tag = "h2" if "heading" in block else "p"
+                css_class = self.css_class(style or (self.heading if "heading" in block else self.body))
+                anchor = "" if level is None else f' id="{page.anchor(plain_text(text))}"'
+                html.append(f'<{tag} class="{css_class}"{anchor}>{html_markup(text)}</{tag}>')
+            elif "toc" in block:
+                html.append(self.contents(entries, (block["toc"] or {}).get("levels", 2)))
+            elif "spacer" in block:
+                html.append(f'<div style="height:{_em(block["spacer"] * 72, self.body_size)}"></div>')
+            elif "list" in block:
+                css_class = self.css_class(style or self.body)
+                html.extend(f'<p class="{css_class}">{html_markup(item)}</p>' for item in block["list"])
+            elif "steps" in block:
+                css_class = self.css_class(style or self.body)
+                html.append(f'<p class="{css_class}">{html_markup(block.get("label", "Steps:"))}</p>')
+                html.append(f'<ol class="{css_class}">')
+                html.extend(f"<li>{html_markup(step)}</li>" for step in block["steps"])
+                html.append("</ol>")
+            elif "images" in block:
+                for name in block["images"]:
+                    html.append(self.picture(name, first_image))
+                    first_image = False
+            elif "table" in block:
+                html.append(self.table(block["table"]))
+        return "".join(html)
+
+    def table(self, spec):
+        table_style = spec.get("style")
+        css_class = ""
+        if isinstance(table_style, str):
+            self.used_tables.add(table_style)
+            css_class = f' class="t-{slug(table_style)}"'
+        rows = "".join(
+            "<tr>" + "".join(f"<td>{escape(str(cell))}</td>" for cell in row) + "</tr>" for row in spec["rows"]
+        )
+        return f'<div class="table"><table{css_class}>{rows}</table></div>'
+
+
+def _page_html(title, manual_title, css, body, nav):
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f"<title>{escape(title)} - {escape(manual_title)}</title>"
+        f"<style>{BASE_CSS}{css}</style></head><body>{nav}<main>{body}</main>{nav}</body></html>"
+    )
+
+
+def _nav(pages, index):
+    # The first page is the manual's contents page.
+    links = ['<a href="../index.html">All manuals</a>' if index == 0 else '<a href="index.html">Contents</a>']
+    if index > 1:
+        previous = pages[index - 1]
+        links.append(f'<a href="{previous.file_name}" rel="prev">&larr; {escape(previous.title or "Previous")}</a>')
+    if index + 1 < len(pages):
+        following = pages[index + 1]
+        links.append(f'<a href="{following.file_name}" rel="next">{escape(following.title or "Next")} &rarr;</a>')
+    return f"<nav>{''.join(links)}</nav>"
+
+
+def build_html(definition, help_dir=HELP_DIR, now=None, workers=1):
+    """Write the HTML pages for a definition (a path or a loaded mapping).
+
+    Pages go to ``help_dir/<cache_name>/`` and screenshots to
+    ``help_dir/images/``.  The first section becomes index.html, followed
+    by a list of every section.  ``workers`` > 1 encodes new screenshot
+    variants in that many processes.  Returns {file name: bytes} for the
+    pages written.
+    """
+    if not isinstance(definition, dict):
+        definition = load_manual(definition)
+    now = now or source_date()
+    help_dir = Path(help_dir)
+    output_dir = help_dir / definition["cache_name"]
+    image_dir = BASE_DIR / definition.get("image_dir", "screenshots")
+
+    sections = [expand_placeholders(copy.deepcopy(section), now) for section in definition["sections"]]
+    pages = [
+        HtmlPage(section, index, "index.html" if index == 0 else f"{slug(section.get('id') or f'section-{index}')}.html")
+        for index, section in enumerate(sections)
+    ]
+    sources = [image_dir / name for section in sections for block in section["blocks"]
+               for name in block.get("images", []) if (image_dir / name).exists()]
+    compiler = HtmlCompiler(definition, image_dir, web_images(sources, help_dir / "images", workers=workers))
+    entries = compiler.toc_entries(pages)
+    manual_title = definition.get("title") or pages[0].title or definition["cache_name"]
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = {}
+    for page in pages:
+        body = compiler.blocks(page, entries)
+        if page.index == 0:
+            section_links = [(0, other.title, other.file_name) for other in pages[1:] if other.title]
+            body += f'<h2 class="{compiler.css_class(compiler.heading)}">Contents</h2>' + compiler.contents(section_links)
+        html = _page_html(page.title or manual_title, manual_title, compiler.css(), body, _nav(pages, page.index))
+        data = html.encode("utf-8")
+        target = output_dir / page.file_name
+        # Unchanged pages keep their modification time, so syncing the help
+        # directory to a CDN uploads only what changed.
+        if not target.exists() or target.read_bytes() != data:
+            tmp = output_dir / (page.file_name + ".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(target)
+        written[page.file_name] = len(data)
+
+    for stale in output_dir.glob("*.html"):
+        if stale.name not in written:
+            stale.unlink()
+    return written
+
+
+def build_help_index(manuals, help_dir=HELP_DIR):
+    """Write help_dir/index.html linking to every manual built into help_dir.
+
+    ``manuals`` maps cache_name -> title for the manuals just built; they
+    are merged into help_dir/manuals.json, so building one manual keeps the
+    others listed.
+    """
+    help_dir = Path(help_dir)
+    listing = help_dir / "manuals.json"
+    known = json.loads(listing.read_text(encoding="utf-8")) if listing.exists() else {}
+    known.update(manuals)
+    known = {name: title for name, title in known.items() if (help_dir / name / "index.html").exists()}
+    listing.write_text(json.dumps(known, indent=2, sort_keys=True), encoding="utf-8")
+
+    links = "".join(
+        f'<li><a href="{escape(name)}/index.html">{escape(title)}</a>' for name, title in sorted(known.items())
+    )
+    body = f'<h1>Help</h1><ul class="contents">{links}</ul>'
+    path = help_dir / "index.html"
+    path.write_text(_page_html("Help", "Contact Management System", "", body, ""), encoding="utf-8")
+    return path
+
+
+def build_help_site(definitions, help_dir=HELP_DIR, workers=1):
+    """Build the HTML pages of every definition plus the help index.
+
+    Returns {cache_name: {file name: bytes}}.
+    """
+    manuals = {}
+    results = {}
+    for definition in definitions:
+        if not isinstance(definition, dict):
+            definition = load_manual(definition)
+        results[definition["cache_name"]] = build_html(definition, help_dir, workers=workers)
+        manuals[definition["cache_name"]] = definition.get("title") or definition["cache_name"]
+    build_help_index(manuals, help_dir)
+    return results
+
+
+def format_site_report(results, help_dir=HELP_DIR):
+    lines = []
+    for name, written in results.items():
+        largest = max(written, key=written.get)
+        lines.append(
+            f"{name:<18} {len(written):>3} pages, {sum(written.values()) / 1024:.0f} KB "
+            f"(largest {largest}, {written[largest] / 1024:.1f} KB)"
+        )
+    extensions = tuple(extension for _, extension, _ in WEB_FORMATS.values())
+    images = [path for path in (Path(help_dir) / "images").glob("*") if path.suffix in extensions]
+    lines.append(f"{len(images)} screenshot variants, {sum(path.stat().st_size for path in images) / 1024:.0f} KB")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the HTML help pages from the manual definitions.")
+    parser.add_argument("definitions", nargs="*", help="definition files in manuals/ (default: all)")
+    parser.add_argument("--output", type=Path, default=HELP_DIR, help=f"help site directory (default: {HELP_DIR})")
+    parser.add_argument("--workers", type=int, default=1, help="processes used to encode screenshots (default: 1)")
+    args = parser.parse_args(argv)
+
+    paths = [MANUALS_DIR / name for name in args.definitions] or sorted(MANUALS_DIR.glob("*.yaml"))
+    results = build_help_site(paths, args.output, workers=args.workers)
+    print(format_site_report(results, args.output))
+    print(f"✓ Help site written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
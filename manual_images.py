@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+Screenshot pre-processing for the manual generators.
+
+reportlab embeds image files at their full resolution no matter how small
+they are drawn, so a 1900px screenshot shown 7 inches wide still costs its
+full size in the PDF.  prepare_screenshot() resamples each screenshot to the
+pixel width it actually needs at the target DPI, optionally re-encodes it as
+JPEG or a palette (quantised) PNG, and caches the result under
+.manual_cache/images/ keyed by the source file's sha256.
+
+ImageStore sits in front of prepare_screenshot() for a whole build: every
+distinct image file is prepared once and later uses get the same embedded
+file (and therefore the same PDF XObject).  With a perceptual hash it can
+also flag or merge near-identical captures.
+
+LazyImage is the flowable the generators embed: it learns the image size
+from the PNG/JPEG header alone and leaves decoding to the moment its page
+is drawn, so building the flowable list holds no pixel data at all.  An
+ImageStore with a ``memory_ceiling`` also hands its LazyImages a
+manual_memory.ImageBufferCache, so a screenshot is decoded once per build
+rather than once per section, within a bounded amount of memory.
+"""
+
+import math
+import os
+import shutil
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from reportlab.pdfbase.pdfdoc import PDFImageXObject, PDFObjectReference
+from reportlab.pdfbase.pdfutils import readJPEGInfo
+from reportlab.lib.utils import ImageReader, _digester
+from reportlab.platypus import Image
+
+from manual_cache import CACHE_DIR, file_digest
+from manual_memory import ImageBufferCache
+
+try:
+    from PIL import Image as PILImage
+except ImportError:  # Pillow is optional; without it screenshots are embedded as-is
+    PILImage = None
+
+
+IMAGE_CACHE_DIR = CACHE_DIR / "images"
+
+DEFAULT_DPI = 150
+IMAGE_FORMATS = ("original", "png", "jpeg", "quantized")
+DEFAULT_FORMAT = "png"
+JPEG_QUALITY = 85
+
+NEAR_DUPLICATE_MODES = ("off", "flag", "merge")
+# Difference hash of HASH_SIZE x HASH_SIZE bits; captures within
+# NEAR_DUPLICATE_THRESHOLD differing bits are treated as the same screen.
+HASH_SIZE = 16
+NEAR_DUPLICATE_THRESHOLD = 10
+
+_EXTENSIONS = {"png": ".png", "jpeg": ".jpg", "quantized": ".png"}
+
+# Responsive variants for the HTML help pages: format -> (Pillow format,
+# extension, quality), in the order browsers should prefer them.
+WEB_FORMATS = {"avif": ("AVIF", ".avif", 55), "webp": ("WEBP", ".webp", 80)}
+WEB_WIDTHS = (480, 960, 1440)
+
+
+class PreparedImage:
+    """A screenshot ready to embed, plus the sizes needed for the report."""
+
+    def __init__(self, source, path, source_bytes, output_bytes, size):
+        self.source = Path(source)
+        self.path = Path(path)
+        self.source_bytes = source_bytes
+        self.output_bytes = output_bytes
+        self.size = size
+        self.references = 1
+
+    @property
+    def bytes_saved(self):
+        return self.source_bytes - self.output_bytes
+
+
+class ImageReport:
+    """Collects PreparedImage records and formats the bytes-saved report."""
+
+    def __init__(self):
+        self.images = []
+        self.near_duplicates = []
+
+    def add(self, prepared):
+        self.images.append(prepared)
+
+    @property
+    def source_bytes(self):
+        return sum(image.source_bytes for image in self.images)
+
+    @property
+    def output_bytes(self):
+        return sum(image.output_bytes for image in self.images)
+
+    def format(self):
+        lines = [f"{'Image':<32} {'Uses':>5} {'Source':>10} {'Embedded':>10} {'Saved':>10}"]
+        for image in self.images:
+            lines.append(
+                f"{image.source.name:<32} {image.references:>5} {_kb(image.source_bytes):>10} "
+                f"{_kb(image.output_bytes):>10} {_percent(image.bytes_saved, image.source_bytes):>10}"
+            )
+        saved = self.source_bytes - self.output_bytes
+        uses = sum(image.references for image in self.images)
+        lines.append(
+            f"{'Total (' + str(len(self.images)) + ' distinct images)':<32} {uses:>5} "
+            f"{_kb(self.source_bytes):>10} {_kb(self.output_bytes):>10} {_percent(saved, self.source_bytes):>10}"
+        )
+        for source, canonical, distance, merged in self.near_duplicates:
+            action = "merged into" if merged else "looks like"
+            lines.append(f"Near-duplicate: {source.name} {action} {canonical.name} ({distance} bits differ)")
+        return "\n".join(lines)
+
+
+def _kb(size):
+    return f"{size / 1024:.0f} KB"
+
+
+def _percent(part, whole):
+    return f"{100.0 * part / whole:.0f}%" if whole else "-"
+
+
+def target_pixel_width(display_width, dpi=DEFAULT_DPI):
+    """Pixels needed to show an image display_width points wide at dpi."""
+    return int(math.ceil(display_width / 72.0 * dpi))
+
+
+def _flatten(image, background=(255, 255, 255)):
+    """Return an RGB copy of image, compositing any transparency onto white."""
+    if image.mode == "RGB":
+        return image
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        alpha = image.getchannel("A")
+        if alpha.getextrema() != (255, 255):
+            flat = PILImage.new("RGB", image.size, background)
+            flat.paste(image, mask=alpha)
+            return flat
+    return image.convert("RGB")
+
+
+def _encode(source, destination, width, image_format, quality):
+    # Processes preparing the same file each write their own temporary file;
+    # the last rename wins, and both wrote the same bytes.
+    with PILImage.open(source) as image:
+        image = _flatten(image)
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), PILImage.LANCZOS)
+
+        tmp = destination.with_name(f"{destination.name}.{os.getpid()}.tmp")
+        if image_format == "jpeg":
+            image.save(tmp, "JPEG", quality=quality, optimize=True, progressive=True)
+        elif image_format == "quantized":
+            image.quantize(colors=256, method=PILImage.Quantize.MEDIANCUT).save(tmp, "PNG", optimize=True)
+        else:
+            image.save(tmp, "PNG", optimize=True)
+        tmp.replace(destination)
+
+
+def prepared_path(source, display_width, dpi=DEFAULT_DPI, image_format=DEFAULT_FORMAT,
+                  quality=JPEG_QUALITY, cache_dir=IMAGE_CACHE_DIR):
+    """Return the cache file prepare_screenshot() uses for source, or None for "original"."""
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"image_format must be one of {IMAGE_FORMATS}, not {image_format!r}")
+    if image_format == "original" or PILImage is None:
+        return None
+    width = target_pixel_width(display_width, dpi)
+    suffix = f"-q{quality}" if image_format == "jpeg" else ""
+    name = f"{file_digest(source)[:24]}-{width}w-{image_format}{suffix}{_EXTENSIONS[image_format]}"
+    return Path(cache_dir) / name
+
+
+def _encode_into_cache(source, destination, width, image_format, quality):
+    destination = Path(destination)
+    if not destination.exists():
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        _encode(source, destination, width, image_format, quality)
+
+
+def prepare_screenshot(source, display_width, dpi=DEFAULT_DPI, image_format=DEFAULT_FORMAT,
+                       quality=JPEG_QUALITY, cache_dir=IMAGE_CACHE_DIR):
+    """Return a PreparedImage for source, resampled for display_width points.
+
+    ``image_format`` is one of IMAGE_FORMATS; "original" (or a missing
+    Pillow) embeds the source file untouched.
+    """
+    source = Path(source)
+    source_bytes = source.stat().st_size
+    destination = prepared_path(source, display_width, dpi, image_format, quality, cache_dir)
+    if destination is None:
+        return PreparedImage(source, source, source_bytes, source_bytes, read_image_size(source))
+
+    _encode_into_cache(source, destination, target_pixel_width(display_width, dpi), image_format, quality)
+    return PreparedImage(source, destination, source_bytes, destination.stat().st_size, read_image_size(destination))
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def read_image_size(path):
+    """Return (width, height) in pixels, reading only the file header.
+
+    PNG and JPEG headers are parsed directly; other formats are left to
+    Pillow (or reportlab's ImageReader), which also stop at the header.
+    """
+    with open(path, "rb") as handle:
+        head = handle.read(24)
+        if head[:8] == _PNG_SIGNATURE and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:2] == b"\xff\xd8":
+            handle.seek(0)
+            width, height = readJPEGInfo(handle)[:2]
+            return width, height
+    if PILImage is not None:
+        with PILImage.open(path) as image:
+            return image.size
+    return ImageReader(str(path)).getSize()
+
+
+class _ContentNamedPath(str):
+    """A file name whose str() is the file's sha256.
+
+    canvas.drawImage() names an image XObject after str() of its file name,
+    which would put the location of the checkout into the PDF; open() still
+    sees the real path.
+    """
+
+    def __new__(cls, path):
+        name = super().__new__(cls, path)
+        name.path = str(path)
+        name.digest = file_digest(path)
+        return name
+
+    def __str__(self):
+        return self.digest
+
+
+def _xobject_state(xobject):
+    """Split a PDFImageXObject into (attributes, [stream, soft mask stream])."""
+    state = {key: value for key, value in vars(xobject).items() if key not in ("streamContent", "_smask")}
+    smask = getattr(xobject, "_smask", None)
+    if smask is None:
+        return (state, None), [xobject.streamContent]
+    smask_state = {key: value for key, value in vars(smask).items() if key != "streamContent"}
+    return (state, smask_state), [xobject.streamContent, smask.streamContent]
+
+
+def _xobject_from_state(meta, chunks):
+    state, smask_state = meta
+    xobject = PDFImageXObject(state["name"])
+    vars(xobject).update(state)
+    xobject.streamContent = chunks[0]
+    if smask_state is not None:
+        smask = PDFImageXObject(smask_state["name"])
+        vars(smask).update(smask_state)
+        smask.streamContent = chunks[1]
+        xobject._smask = smask
+    return xobject
+
+
+def _register_buffered(canv, filename, mask, buffers):
+    """Put the XObject canv.drawImage(filename, mask=mask) would create into the document.
+
+    ``filename`` is the _ContentNamedPath drawImage() is given.
+
+    The decoded stream comes from ``buffers`` when an earlier section has
+    decoded the same file; drawImage() then finds the XObject and uses it.
+    Registration mirrors drawImage(), so the output is the same bytes.
+    """
+    name = _digester(f"{filename}{mask}".encode("utf-8"))
+    doc = canv._doc
+    reg_name = doc.getXObjectName(name)
+    if doc.idToObject.get(reg_name) is not None:
+        return
+    key = f"{filename}{mask}"
+    cached = buffers.get(key)
+    if cached is None:
+        xobject = PDFImageXObject(name, filename.path, mask=mask)
+        buffers.put(key, *_xobject_state(xobject))
+    else:
+        xobject = _xobject_from_state(*cached)
+    xobject.name = name
+    canv._setXObjects(xobject)
+    doc.Reference(xobject, reg_name)
+    doc.addForm(name, xobject)
+    smask = getattr(xobject, "_smask", None)
+    if smask:
+        mask_reg_name = doc.getXObjectName(smask.name)
+        if doc.idToObject.get(mask_reg_name) is None:
+            canv._setXObjects(smask)
+            xobject.smask = doc.Reference(smask, mask_reg_name)
+        else:
+            xobject.smask = PDFObjectReference(mask_reg_name)
+        del xobject._smask
+
+
+class LazyImage(Image):
+    """Image flowable that touches only the file header until it is drawn.
+
+    The stock Image flowable draws through an ImageReader, which decodes the
+    whole bitmap (and hashes it) on every draw and keeps it alive with the
+    flowable.  LazyImage hands canvas.drawImage the file name instead, so the
+    bitmap is decoded once when its page is drawn, compressed into the PDF
+    and released; repeated uses of the same file reuse the XObject without
+    decoding again.  The XObject is named after the file's contents, not
+    its path.  With ``buffers`` (an ImageBufferCache) the decoded stream is
+    also shared with the other sections of the build.
+    """
+
+    def __init__(self, filename, width=None, height=None, mask="auto", hAlign="CENTER", buffers=None):
+        self.hAlign = hAlign
+        self._buffers = buffers
+        self._mask = mask
+        self._drawing = None
+        self._file = self.filename = str(filename)
+        self._img = None
+        self._dpi = False
+        self._lazy = 2
+        self._width = width
+        self._height = height
+        self._kind = "direct"
+        self.imageWidth, self.imageHeight = read_image_size(self.filename)
+        self.drawWidth = width or self.imageWidth
+        self.drawHeight = height or self.imageHeight
+
+    def draw(self):
+        filename = _ContentNamedPath(self.filename)
+        if self._buffers is not None:
+            _register_buffered(self.canv, filename, self._mask, self._buffers)
+        self.canv.drawImage(
+            filename,
+            getattr(self, "_offs_x", 0),
+            getattr(self, "_offs_y", 0),
+            self.drawWidth,
+            self.drawHeight,
+            mask=self._mask,
+        )
+
+
+class WebImage:
+    """The responsive variants of one screenshot.
+
+    ``variants`` maps each WEB_FORMATS name to a list of (path, pixel width),
+    narrowest first; ``fallback`` is the file for browsers that support
+    none of them (a mid-sized WebP where possible) and ``size`` its pixel
+    size.
+    """
+
+    def __init__(self, source, size, variants, fallback):
+        self.source = Path(source)
+        self.size = size
+        self.variants = variants
+        self.fallback = Path(fallback)
+
+    @property
+    def output_bytes(self):
+        paths = {path for entries in self.variants.values() for path, _ in entries} | {self.fallback}
+        return sum(Path(path).stat().st_size for path in paths)
+
+
+def _web_widths(source_width, widths):
+    chosen = sorted({min(width, source_width) for width in widths})
+    return chosen or [source_width]
+
+
+def web_variant_paths(source, output_dir, widths=WEB_WIDTHS, formats=tuple(WEB_FORMATS)):
+    """Return {(format, width): path} for the variants web_image() writes for source."""
+    source = Path(source)
+    stem = f"{source.stem}-{file_digest(source)[:12]}"
+    source_width = read_image_size(source)[0]
+    return {
+        (name, width): Path(output_dir) / f"{stem}-{width}w{WEB_FORMATS[name][1]}"
+        for name in formats
+        for width in _web_widths(source_width, widths)
+    }
+
+
+def _encode_web(source, destination, width, image_format):
+    destination = Path(destination)
+    if destination.exists():
+        return
+    pil_format, _, quality = WEB_FORMATS[image_format]
+    with PILImage.open(source) as image:
+        image = _flatten(image)
+        if image.width > width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), PILImage.LANCZOS)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        tmp = destination.with_name(f"{destination.name}.{os.getpid()}.tmp")
+        image.save(tmp, pil_format, quality=quality)
+        tmp.replace(destination)
+
+
+def web_images(sources, output_dir, widths=WEB_WIDTHS, workers=1):
+    """Return {source: WebImage} for screenshots served by the HTML help pages.
+
+    Each screenshot is written to output_dir as AVIF and WebP at every
+    width in ``widths`` it is large enough for; files already there (the
+    names include the source's sha256) are not encoded again.  Without
+    Pillow, or with a format Pillow cannot write, the source file is
+    copied and served as it is.
+    """
+    sources = list(dict.fromkeys(Path(source) for source in sources))
+    output_dir = Path(output_dir)
+    formats = tuple(name for name in WEB_FORMATS if PILImage is not None and _can_write(WEB_FORMATS[name][0]))
+    jobs = {}
+    for source in sources:
+        for (name, width), path in web_variant_paths(source, output_dir, widths, formats).items():
+            if not path.exists():
+                jobs[path] = (source, width, name)
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = [pool.submit(_encode_web, str(source), str(path), width, name)
+                       for path, (source, width, name) in jobs.items()]
+            for future in futures:
+                future.result()
+    else:
+        for path, (source, width, name) in jobs.items():
+            _encode_web(source, path, width, name)
+
+    result = {}
+    for source in sources:
+        paths = web_variant_paths(source, output_dir, widths, formats)
+        variants = {name: [] for name in formats}
+        for (name, width), path in paths.items():
+            variants[name].append((path, width))
+        if "webp" in variants:
+            webp = variants["webp"]
+            fallback = webp[len(webp) // 2][0]
+        else:
+            fallback = output_dir / f"{source.stem}-{file_digest(source)[:12]}{source.suffix}"
+            if not fallback.exists():
+                output_dir.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(source, fallback)
+        result[source] = WebImage(source, read_image_size(fallback), variants, fallback)
+    return result
+
+
+def _can_write(pil_format):
+    PILImage.init()
+    return pil_format in PILImage.SAVE
+
+
+_perceptual_hashes = {}
+
+
+def perceptual_hash(source, hash_size=HASH_SIZE):
+    """Return a difference hash of source as an int of hash_size**2 bits."""
+    key = (file_digest(source), hash_size)
+    value = _perceptual_hashes.get(key)
+    if value is None:
+        with PILImage.open(source) as image:
+            small = _flatten(image).convert("L").resize((hash_size + 1, hash_size), PILImage.LANCZOS)
+        pixels = small.tobytes()
+        value = 0
+        for row in range(hash_size):
+            offset = row * (hash_size + 1)
+            for col in range(hash_size):
+                value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+        _perceptual_hashes[key] = value
+    return value
+
+
+def image_flowable(prepared, max_width, buffers=None):
+    """Return a LazyImage for a PreparedImage scaled to max_width, keeping aspect ratio."""
+    width, height = prepared.size
+    if width == 0 or height == 0:
+        return None
+    scale = max_width / float(width)
+    return LazyImage(prepared.path, width=width * scale, height=height * scale, buffers=buffers)
+
+
+def scale_image(image_path, max_width, images=None):
+    """Return an Image flowable scaled to max width while keeping aspect ratio.
+
+    The embedded file comes from ``images`` (an ImageStore), so it is
+    resampled for that width and shared with every other use of the same
+    screenshot.  Only the image header is read here; pixels are decoded
+    when the page is drawn.
+    """
+    images = images or ImageStore()
+    return image_flowable(images.prepare(image_path, max_width), max_width, images.buffers)
+
+
+class ImageStore:
+    """Content-addressed screenshot registry for one build.
+
+    Each distinct file (by sha256) is prepared once; repeated uses return the
+    same PreparedImage so reportlab embeds a single XObject for it.  With
+    ``near_duplicates`` set to "flag" or "merge", captures whose perceptual
+    hash is within ``threshold`` bits of an earlier one are reported, and in
+    "merge" mode replaced by that earlier image.
+
+    ``memory_ceiling`` (bytes) gives the build an ImageBufferCache
+    (``buffers``) bounded by that resident size; it only applies to
+    sections laid out in this process.  close() removes its spill file.
+    """
+
+    def __init__(self, dpi=DEFAULT_DPI, image_format=DEFAULT_FORMAT, near_duplicates="off",
+                 threshold=NEAR_DUPLICATE_THRESHOLD, cache_dir=IMAGE_CACHE_DIR, memory_ceiling=None):
+        if near_duplicates not in NEAR_DUPLICATE_MODES:
+            raise ValueError(f"near_duplicates must be one of {NEAR_DUPLICATE_MODES}, not {near_duplicates!r}")
+        self.dpi = dpi
+        self.image_format = image_format
+        self.near_duplicates = near_duplicates
+        self.threshold = threshold
+        self.cache_dir = cache_dir
+        self.report = ImageReport()
+        self.buffers = ImageBufferCache(memory_ceiling) if memory_ceiling else None
+        self._prepared = {}
+        self._hashes = []
+
+    def close(self):
+        if self.buffers is not None:
+            self.buffers.close()
+
+    def _closest(self, value):
+        """Return (distance, PreparedImage) of the nearest earlier capture within threshold."""
+        best = None
+        for other_value, prepared in self._hashes:
+            distance = bin(value ^ other_value).count("1")
+            if distance <= self.threshold and (best is None or distance < best[0]):
+                best = (distance, prepared)
+        return best
+
+    def prefetch(self, sources, display_width, workers):
+        """Encode the not-yet-cached files among sources in ``workers`` processes.
+
+        prepare() then finds them in the image cache.  Near-duplicate merging
+        still happens in prepare(), so a merged capture may be encoded for
+        nothing.
+        """
+        jobs = {}
+        for source in sources:
+            destination = prepared_path(source, display_width, self.dpi, self.image_format, cache_dir=self.cache_dir)
+            if destination is not None and not destination.exists():
+                jobs[destination] = source
+        if len(jobs) < 2 or workers < 2:
+            return
+        width = target_pixel_width(display_width, self.dpi)
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = [
+                pool.submit(_encode_into_cache, str(source), str(destination), width, self.image_format, JPEG_QUALITY)
+                for destination, source in jobs.items()
+            ]
+            for future in futures:
+                future.result()
+
+    def prepare(self, source, display_width):
+        """Return the PreparedImage to embed for source at display_width points."""
+        source = Path(source)
+        key = (file_digest(source), display_width)
+        prepared = self._prepared.get(key)
+        if prepared is not None:
+            prepared.references += 1
+            return prepared
+
+        value = None
+        if self.near_duplicates != "off" and PILImage is not None:
+            value = perceptual_hash(source)
+            match = self._closest(value)
+            if match is not None:
+                distance, canonical = match
+                merged = self.near_duplicates == "merge"
+                self.report.near_duplicates.append((source, canonical.source, distance, merged))
+                if merged:
+                    canonical.references += 1
+                    self._prepared[key] = canonical
+                    return canonical
+
+        prepared = prepare_screenshot(
+            source, display_width, dpi=self.dpi, image_format=self.image_format, cache_dir=self.cache_dir
+        )
+        self._prepared[key] = prepared
+        if value is not None:
+            self._hashes.append((value, prepared))
+        self.report.add(prepared)
+        return prepared
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Linearized ("fast web view") output for the PDF manuals.
+
+reportlab and pypdf write the cross-reference table at the end of the file,
+so a phone has to download the whole manual before it can show page 1.
+linearize_pdf() rewrites a finished PDF with qpdf, through pikepdf when it
+is installed or the ``qpdf`` command otherwise: linearized, so the first
+page and the objects it needs come first, and with objects packed into
+compressed object streams.  Page content is already Flate-compressed by
+reportlab.
+
+    python manual_linearize.py Contact_Management_System_User_Manual.pdf
+    python build_all_manuals.py --linearize
+
+Both print the bytes a reader needs before page 1 can be shown and the
+total size, before and after.
+"""
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+try:
+    import pikepdf
+except ImportError:  # pikepdf is optional; the qpdf command line tool works too
+    pikepdf = None
+
+
+class LinearizationUnavailable(RuntimeError):
+    """Raised when neither pikepdf nor the qpdf command is available."""
+
+
+_LINEARIZED = re.compile(rb"/Linearized\s+[\d.]+.*?/E\s+(\d+)", re.S)
+
+
+def first_page_bytes(path):
+    """Return how many bytes of path a viewer needs before it can draw page 1.
+
+    For a linearized file that is the end of the first-page section (/E in
+    the linearization dictionary); otherwise the whole file, because the
+    cross-reference table is at the end.
+    """
+    path = Path(path)
+    with open(path, "rb") as handle:
+        match = _LINEARIZED.search(handle.read(2048))
+    return int(match.group(1)) if match else path.stat().st_size
+
+
+def is_linearized(path):
+    """Return True when path is a linearized PDF."""
+    return first_page_bytes(path) < Path(path).stat().st_size
+
+
+def _rewrite(source, destination):
+    if pikepdf is not None:
+        with pikepdf.open(source) as pdf:
+            pdf.save(
+                destination,
+                linearize=True,
+                object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                compress_streams=True,
+            )
+        return
+    qpdf = shutil.which("qpdf")
+    if qpdf is None:
+        raise LinearizationUnavailable("linearized output needs pikepdf (pip install pikepdf) or the qpdf command")
+    subprocess.run(
+        [qpdf, "--linearize", "--object-streams=generate", "--compress-streams=y", str(source), str(destination)],
+        check=True,
+    )
+
+
+def linearize_pdf(path, output=None):
+    """Linearize path (in place unless ``output`` is given) and return a size report.
+
+    The report is a dict with ``before_bytes``/``after_bytes`` (file size)
+    and ``before_first_page``/``after_first_page`` (bytes needed to show
+    page 1).
+    """
+    path = Path(path)
+    output = Path(output or path)
+    report = {"before_bytes": path.stat().st_size, "before_first_page": first_page_bytes(path)}
+
+    tmp = output.with_name(output.name + ".linearized.tmp")
+    try:
+        _rewrite(path, tmp)
+        os.replace(tmp, output)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    report["after_bytes"] = output.stat().st_size
+    report["after_first_page"] = first_page_bytes(output)
+    return report
+
+
+def format_report(name, report):
+    return (
+        f"{name}: first page {_kb(report['before_first_page'])} -> {_kb(report['after_first_page'])}, "
+        f"total {_kb(report['before_bytes'])} -> {_kb(report['after_bytes'])}"
+    )
+
+
+def _kb(size):
+    return f"{size / 1024:.0f} KB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Linearize PDF manuals for fast web view.")
+    parser.add_argument("pdfs", nargs="+", type=Path, help="PDF files to linearize in place")
+    args = parser.parse_args(argv)
+    try:
+        for path in args.pdfs:
+            print(format_report(path.name, linearize_pdf(path)))
+    except LinearizationUnavailable as exc:
+        print(f"✗ {exc}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
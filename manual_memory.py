@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Memory-ceiling builds for the manual generators.
+
+The docs are built in the same small containers as the app (see
+OOM_FIX_AND_MOBILE_SUMMARY.md), where a screenshot-heavy manual can run
+out of memory.  Every section is laid out as its own document, so a
+screenshot used in several sections is decoded and compressed again for
+each of them, and each copy stays alive until its section is written.
+
+ImageBufferCache keeps the decoded, ready-to-embed image streams of one
+build in a least-recently-used cache bounded in bytes, so each screenshot
+is decoded once.  Entries evicted from memory are spilled to a temporary
+file, where they cost page cache the kernel can drop under pressure rather
+than heap the process could be killed for.  A spilled entry that is used
+again is copied back onto the heap as bytes (reportlab writes a stream
+only from bytes; a memoryview would be formatted as its repr), counts
+against the in-memory budget again and is the first to be dropped, without
+being written again, when room is needed.  The in-memory budget is a
+share of the ceiling, and when the process's resident size reaches the
+ceiling everything still held is spilled.  A
+manual_images.ImageStore created with ``memory_ceiling`` owns one.
+
+current_rss() and peak_rss() read the resident set size of this process;
+report() and format() include the peak so a build can be checked against
+its ceiling.
+"""
+
+import mmap
+import os
+import re
+import sys
+import tempfile
+from collections import OrderedDict
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is then not reported
+    resource = None
+
+
+# Share of the ceiling the in-memory part of the cache may use.
+BUFFER_SHARE = 0.25
+
+_SIZE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?)i?B?\s*$", re.IGNORECASE)
+_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(text):
+    """Return a size such as "512M", "1.5G" or "600000000" in bytes."""
+    match = _SIZE.match(str(text))
+    if match is None:
+        raise ValueError(f"not a size: {text!r} (expected e.g. 512M or 1G)")
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+
+def current_rss():
+    """Return this process's resident set size in bytes, or None where it cannot be read."""
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            return int(handle.read().split()[1]) * mmap.PAGESIZE
+    except (OSError, IndexError, ValueError):  # no procfs (macOS); the peak is the best we have
+        return peak_rss()
+
+
+def peak_rss():
+    """Return this process's peak resident set size in bytes, or None on Windows."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _Entry:
+    """A cached value: ``meta`` plus byte ``chunks``, held in memory or as (offset, length) spans."""
+
+    def __init__(self, meta, chunks):
+        self.meta = meta
+        self.chunks = chunks
+        self.spans = None
+        self.size = sum(len(chunk) for chunk in chunks)
+
+
+class ImageBufferCache:
+    """Decoded image buffers by key, least recently used first, spilling to disk.
+
+    At most ``max_bytes`` of chunks are held in memory (by default
+    BUFFER_SHARE of ``ceiling``).  Older entries are written once to a
+    temporary file in ``spill_dir`` and copied back out of a memory map of
+    it when they are used again.  With a ``ceiling``, a put() that finds the
+    resident size at or above it spills everything held in memory.
+    """
+
+    def __init__(self, ceiling=None, max_bytes=None, spill_dir=None):
+        if ceiling is None and max_bytes is None:
+            raise ValueError("ImageBufferCache needs a ceiling or max_bytes")
+        self.ceiling = ceiling
+        self.max_bytes = max_bytes if max_bytes is not None else int(ceiling * BUFFER_SHARE)
+        self.spill_dir = spill_dir
+        self.memory_bytes = 0
+        self.stats = {"decoded": 0, "hits": 0, "spill_hits": 0, "spilled": 0, "spilled_bytes": 0,
+                      "pressure_spills": 0}
+        self.peak_seen = current_rss()
+        self._entries = OrderedDict()
+        self._file = None
+        self._map = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return (meta, chunks) for key, or None; a spilled entry is copied back into memory as bytes."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        chunks = entry.chunks
+        if chunks is None:
+            chunks = entry.chunks = [self._read(offset, length) for offset, length in entry.spans]
+            self.memory_bytes += entry.size
+            self.stats["spill_hits"] += 1
+            self._make_room()
+        else:
+            self.stats["hits"] += 1
+        return entry.meta, chunks
+
+    def put(self, key, meta, chunks):
+        """Cache a decoded value under key; its chunks are kept as they are (no copies)."""
+        entry = _Entry(meta, list(chunks))
+        self._entries[key] = entry
+        self.memory_bytes += entry.size
+        self.stats["decoded"] += 1
+        self._make_room()
+
+    def _under_pressure(self):
+        rss = current_rss()
+        if rss is not None and (self.peak_seen is None or rss > self.peak_seen):
+            self.peak_seen = rss
+        return self.ceiling is not None and rss is not None and rss >= self.ceiling
+
+    def _make_room(self):
+        if self._under_pressure():
+            keep = 0
+            self.stats["pressure_spills"] += 1
+        else:
+            keep = self.max_bytes
+        # Oldest first; an entry larger than the whole budget is spilled as well.
+        for key in list(self._entries):
+            if self.memory_bytes <= keep:
+                break
+            entry = self._entries[key]
+            if entry.chunks is not None:
+                self._spill(entry)
+
+    def _spill(self, entry):
+        if entry.spans is None:
+            if self._file is None:
+                self._file = tempfile.TemporaryFile(prefix="manual-images-", dir=self.spill_dir)
+            self._file.seek(0, os.SEEK_END)
+            spans = []
+            for chunk in entry.chunks:
+                spans.append((self._file.tell(), len(chunk)))
+                self._file.write(chunk)
+            entry.spans = spans
+            self.stats["spilled"] += 1
+            self.stats["spilled_bytes"] += entry.size
+        entry.chunks = None
+        self.memory_bytes -= entry.size
+
+    def _read(self, offset, length):
+        # Slicing the map copies; PDFStream.format() needs bytes, not a view.
+        if length == 0:
+            return b""
+        if self._map is None or offset + length > len(self._map):
+            self._file.flush()
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map[offset:offset + length]
+
+    def close(self):
+        """Drop every entry and remove the spill file."""
+        self._entries.clear()
+        self.memory_bytes = 0
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def report(self):
+        self._under_pressure()
+        peak = max(value for value in (peak_rss(), self.peak_seen, 0) if value is not None) or None
+        return dict(
+            self.stats,
+            ceiling=self.ceiling,
+            max_bytes=self.max_bytes,
+            memory_bytes=self.memory_bytes,
+            peak_rss=peak,
+            over_ceiling=bool(self.ceiling and peak and peak > self.ceiling),
+        )
+
+    def format(self):
+        report = self.report()
+        ceiling = "-" if report["ceiling"] is None else _mb(report["ceiling"])
+        peak = "-" if report["peak_rss"] is None else _mb(report["peak_rss"])
+        warning = "  OVER CEILING" if report["over_ceiling"] else ""
+        return "\n".join([
+            f"Peak RSS: {peak} (ceiling {ceiling}){warning}",
+            f"Image buffers: {report['decoded']} decoded, {report['hits']} reused from memory, "
+            f"{report['spill_hits']} from disk; {report['spilled']} spilled ({_mb(report['spilled_bytes'])}), "
+            f"in-memory limit {_mb(report['max_bytes'])}",
+        ])
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.0f} MB"
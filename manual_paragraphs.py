@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Memoised Paragraph construction for the manual generators.
+
+reportlab parses a Paragraph's markup (<b>, <i>, <br/>, entities, bullets)
+every time one is constructed, and the manuals repeat the same fragments
+over and over: step labels, "[Missing image: ...]", table of contents
+rows, and in templated per-contact documents every field label.
+paragraph() parses each (text, style, bulletText) once per process and
+builds later Paragraphs from copies of the parsed fragments.  Layout writes
+to fragment attributes, so every Paragraph gets its own shallow copies;
+copying costs about a tenth of a parse.
+
+Styles are matched by identity.  manual_styles memoises every style, so the
+same style name always hits; a style that is created per call simply
+misses.  The cache keeps the MAX_ENTRIES most recently used texts, so
+documents with a unique text per contact do not grow it without bound.
+
+cache_stats() returns the hit and miss counts of this process;
+BuildProfiler reports them per section and per build.
+"""
+
+from collections import OrderedDict
+
+from reportlab.platypus import Paragraph
+
+
+MAX_ENTRIES = 20000
+
+
+def _copy(frags):
+    return [frag.clone() for frag in frags]
+
+
+class ParagraphCache:
+    """Parsed Paragraph fragments by (text, style, bulletText), least recently used first."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+
+    def paragraph(self, text, style, bulletText=None):
+        key = (text, id(style), bulletText)
+        entry = self._entries.get(key)
+        # The key holds id(style); the entry holds the style, so an id reused
+        # by a new style object cannot match.
+        if entry is not None and entry[0] is style:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        else:
+            parsed = Paragraph(text, style, bulletText)
+            entry = (style, parsed.text, parsed.style, parsed.frags, parsed.bulletText)
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.misses += 1
+        _, text, style, frags, bullet = entry
+        if isinstance(bullet, list):
+            bullet = _copy(bullet)
+        return Paragraph(text, style, bullet, frags=_copy(frags))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+_cache = ParagraphCache()
+
+
+def paragraph(text, style, bulletText=None):
+    """Return a new Paragraph, reusing the parsed markup of an earlier identical one."""
+    return _cache.paragraph(text, style, bulletText)
+
+
+def cache_stats():
+    """Return {"hits", "misses", "entries"} for this process's paragraph cache."""
+    return _cache.stats()
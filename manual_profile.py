@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Opt-in build profiling for the manual generators.
+
+Pass a BuildProfiler to build_sections() (build_from_definition() and the
+generators' build_manual() forward a ``profiler`` argument, and
+``build_all_manuals.py --profile DIR`` does it for every manual) to record,
+for every section:
+
+    create   building the section's flowables (Paragraph markup parsing,
+             screenshot preparation, Table construction)
+    layout   wrap/split of the section's flowables
+    draw     drawOn of the flowables; LazyImage decodes its bitmap here
+    build    the whole section layout pass, including page setup and
+             writing the section PDF
+    load     reading a cached section instead of building it
+
+together with the section's pages, bytes and peak traced memory.  Layout
+and draw time is also totalled per flowable type, so a slow build shows
+whether Tables, Paragraphs or images are to blame, and the paragraph cache
+(manual_paragraphs) hits and misses are counted; sections laid out in
+worker processes are not included in those counts.  report() returns the
+data as a dict, format() as text and write() saves both.
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from manual_paragraphs import cache_stats
+
+
+SECTION_PHASES = ("create", "layout", "draw", "build", "load", "merge")
+
+
+def _paragraph_counts():
+    stats = cache_stats()
+    return stats["hits"], stats["misses"]
+
+
+def _paragraph_report(counts):
+    built = counts["reused"] + counts["parsed"]
+    return dict(counts, hit_rate=round(counts["reused"] / built, 4) if built else None)
+
+
+class SectionProfile:
+    """Timings and sizes recorded for one section."""
+
+    def __init__(self, index, title, cached):
+        self.index = index
+        self.title = title
+        self.cached = cached
+        self.seconds = dict.fromkeys(SECTION_PHASES, 0.0)
+        self.pages = 0
+        self.bytes = 0
+        self.peak_memory = None
+        self.by_type = {}
+        self.paragraphs = {"parsed": 0, "reused": 0}
+        self._depth = 0
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+    def add(self, kind, phase, seconds):
+        totals = self.by_type.setdefault(kind, {"count": 0, "layout": 0.0, "draw": 0.0})
+        totals[phase] += seconds
+        self.seconds[phase] += seconds
+
+    def instrument(self, flowables):
+        """Time wrap/split/drawOn of flowables (and of the pieces they split into)."""
+        for flowable in flowables:
+            _instrument(flowable, self)
+
+    def as_dict(self):
+        return {
+            "index": self.index,
+            "title": self.title,
+            "cached": self.cached,
+            "seconds": {name: round(value, 6) for name, value in self.seconds.items()},
+            "pages": self.pages,
+            "bytes": self.bytes,
+            "peak_memory": self.peak_memory,
+            "flowable_types": self.by_type,
+            "paragraphs": self.paragraphs,
+        }
+
+
+def _instrument(flowable, record):
+    if getattr(flowable, "_profiled", False):
+        return
+    kind = type(flowable).__name__
+    record.by_type.setdefault(kind, {"count": 0, "layout": 0.0, "draw": 0.0})["count"] += 1
+
+    def timed(method, phase):
+        original = getattr(flowable, method)
+
+        def wrapper(*args, **kwargs):
+            # Only the outermost call counts: split() may wrap() internally.
+            record._depth += 1
+            start = time.perf_counter()
+            try:
+                result = original(*args, **kwargs)
+            finally:
+                record._depth -= 1
+                if record._depth == 0:
+                    record.add(kind, phase, time.perf_counter() - start)
+            if method == "split":
+                record.instrument(result)
+            return result
+
+        setattr(flowable, method, wrapper)
+
+    # Frames call wrap() and split() directly, and drawOn() to draw.
+    timed("wrap", "layout")
+    timed("split", "layout")
+    timed("drawOn", "draw")
+    flowable._profiled = True
+
+
+class BuildProfiler:
+    """Collects SectionProfiles for one manual build.
+
+    ``trace_memory`` records each section's peak Python allocation with
+    tracemalloc, which makes the build itself noticeably slower; turn it off
+    when only the timings matter.
+    """
+
+    def __init__(self, name=None, trace_memory=True):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.sections = []
+        self.seconds = {"parallel": 0.0, "merge": 0.0, "write": 0.0, "total": 0.0}
+        self.output_bytes = None
+        self.paragraphs = {"parsed": 0, "reused": 0}
+        self._start = None
+        self._paragraph_start = (0, 0)
+        self._started_tracing = False
+
+    def start(self, name=None):
+        self.name = self.name or name
+        self._start = time.perf_counter()
+        self._paragraph_start = _paragraph_counts()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def finish(self, output_bytes=None):
+        self.seconds["total"] = time.perf_counter() - self._start
+        self.output_bytes = output_bytes
+        hits, misses = _paragraph_counts()
+        self.paragraphs = {"parsed": misses - self._paragraph_start[1], "reused": hits - self._paragraph_start[0]}
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def section(self, title=None, cached=False, index=None):
+        """Record one section; ``index`` is its 0-based position in the manual."""
+        record = SectionProfile(len(self.sections) + 1 if index is None else index + 1, title, cached)
+        self.sections.append(record)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        hits, misses = _paragraph_counts()
+        yield record
+        if tracing:
+            record.peak_memory = tracemalloc.get_traced_memory()[1] - baseline
+        now_hits, now_misses = _paragraph_counts()
+        record.paragraphs = {"parsed": now_misses - misses, "reused": now_hits - hits}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+    def pages(self):
+        # A section laid out twice (a table of contents) is counted once.
+        return sum({record.index: record.pages for record in self.sections}.values())
+
+    def ordered_sections(self):
+        """Sections in document order; a table of contents is laid out last but listed in place."""
+        return sorted(self.sections, key=lambda record: record.index)
+
+    def flowable_types(self):
+        totals = {}
+        for record in self.sections:
+            for kind, values in record.by_type.items():
+                total = totals.setdefault(kind, {"count": 0, "layout": 0.0, "draw": 0.0})
+                for key, value in values.items():
+                    total[key] += value
+        return totals
+
+    def report(self):
+        return {
+            "name": self.name,
+            "seconds": {name: round(value, 6) for name, value in self.seconds.items()},
+            "pages": self.pages(),
+            "output_bytes": self.output_bytes,
+            "sections": [record.as_dict() for record in self.ordered_sections()],
+            "flowable_types": self.flowable_types(),
+            "paragraphs": _paragraph_report(self.paragraphs),
+        }
+
+    def format(self):
+        pages = self.pages()
+        size = "" if self.output_bytes is None else f", {_kb(self.output_bytes)}"
+        lines = [
+            f"Build profile: {self.name}  ({self.seconds['total']:.2f}s, {pages} pages{size})",
+            f"{'#':>3}  {'Section':<34} {'Cache':<5} {'Create':>7} {'Layout':>7} {'Draw':>7} "
+            f"{'Build/Load':>10} {'Pages':>5} {'Bytes':>8} {'Peak mem':>9}",
+        ]
+        for record in self.ordered_sections():
+            seconds = record.seconds
+            build = seconds["load"] if record.cached else seconds["build"]
+            lines.append(
+                f"{record.index:>3}  {(record.title or '-')[:34]:<34} {'hit' if record.cached else 'miss':<5} "
+                f"{seconds['create']:7.3f} {seconds['layout']:7.3f} {seconds['draw']:7.3f} {build:10.3f} "
+                f"{record.pages:>5} {_kb(record.bytes):>8} "
+                f"{'-' if record.peak_memory is None else _kb(record.peak_memory):>9}"
+            )
+        parallel = f", parallel layout {self.seconds['parallel']:.3f}s" if self.seconds["parallel"] else ""
+        lines.append(f"Merge {self.seconds['merge']:.3f}s, write {self.seconds['write']:.3f}s{parallel}")
+        paragraphs = _paragraph_report(self.paragraphs)
+        if paragraphs["hit_rate"] is not None:
+            lines.append(
+                f"Paragraph cache: {paragraphs['reused']} reused, {paragraphs['parsed']} parsed "
+                f"({paragraphs['hit_rate']:.0%} hit rate)"
+            )
+
+        types = self.flowable_types()
+        if types:
+            lines.append("")
+            lines.append(f"{'Flowable type':<24} {'Count':>6} {'Layout':>8} {'Draw':>8}")
+            for kind, values in sorted(types.items(), key=lambda item: -(item[1]["layout"] + item[1]["draw"])):
+                lines.append(f"{kind:<24} {values['count']:>6} {values['layout']:8.3f} {values['draw']:8.3f}")
+        return "\n".join(lines)
+
+    def write(self, path):
+        """Write the JSON report to path and the text report next to it (.txt)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2), encoding="utf-8")
+        path.with_suffix(".txt").write_text(self.format() + "\n", encoding="utf-8")
+        return path
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every hook does nothing."""
+
+    def start(self, name=None):
+        pass
+
+    def finish(self, output_bytes=None):
+        pass
+
+    @contextmanager
+    def section(self, title=None, cached=False, index=None):
+        yield _NullSection()
+
+    @contextmanager
+    def phase(self, name):
+        yield
+
+
+class _NullSection:
+    pages = bytes = 0
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(SECTION_PHASES, 0.0)
+
+    @contextmanager
+    def phase(self, name):
+        yield
+
+    def instrument(self, flowables):
+        pass
+
+
+def _kb(size):
+    return f"{size / 1024:.0f} KB"
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Streaming layout for very large generated documents.
+
+SimpleDocTemplate.build() takes a list, so the caller has to create every
+flowable before layout starts.  stream_build() (and StreamingDocTemplate)
+accept any iterable instead: flowables are pulled from it only when layout
+reaches them and dropped as soon as they are drawn, so a generator of
+flowables keeps about one page of flowables alive at a time (plus any
+keepWithNext group that must be held together).  Page compression is
+switched on, so finished pages are held as compressed content streams.
+
+reportlab writes the file in canvas.save(), which means the compressed
+pages themselves stay in memory until the end; images are embedded once
+per file.  doc.multiBuild() needs the whole list for its repeated passes
+and cannot be streamed.
+"""
+
+from reportlab.platypus import SimpleDocTemplate
+
+
+def _keeps_with_next(flowable):
+    getter = getattr(flowable, "getKeepWithNext", None)
+    return bool(getter and getter())
+
+
+class FlowableStream:
+    """The subset of list behaviour BaseDocTemplate.build() uses, over an iterator.
+
+    The doc template only looks at the front of its flowable list: it reads
+    and deletes ``flowables[0]``, puts split remainders back with
+    ``flowables[0:0] = parts`` or ``insert(0, ...)``, and looks ahead across
+    keepWithNext chains.  FlowableStream buffers just enough of the iterator
+    to answer those.
+    """
+
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+        self._buffer = []
+        self._exhausted = False
+
+    def _fill(self, count):
+        while len(self._buffer) < count and not self._exhausted:
+            try:
+                self._buffer.append(next(self._iterator))
+            except StopIteration:
+                self._exhausted = True
+
+    def _fill_all(self):
+        self._buffer.extend(self._iterator)
+        self._exhausted = True
+
+    def _fill_for(self, index):
+        if isinstance(index, slice):
+            if index.stop is None or index.stop < 0 or (index.start or 0) < 0:
+                self._fill_all()
+            else:
+                self._fill(index.stop)
+        elif index < 0:
+            self._fill_all()
+        else:
+            self._fill(index + 1)
+
+    def __len__(self):
+        # handle_keepWithNext() scans len() items for a keepWithNext chain,
+        # so make sure a chain at the front is buffered with its successor.
+        self._fill(1)
+        while self._buffer and not self._exhausted and _keeps_with_next(self._buffer[-1]):
+            self._fill(len(self._buffer) + 1)
+        return len(self._buffer)
+
+    def __getitem__(self, index):
+        self._fill_for(index)
+        return self._buffer[index]
+
+    def __setitem__(self, index, value):
+        self._fill_for(index)
+        self._buffer[index] = value
+
+    def __delitem__(self, index):
+        self._fill_for(index)
+        del self._buffer[index]
+
+    def insert(self, index, value):
+        self._fill(index)
+        self._buffer.insert(index, value)
+
+
+def stream_build(doc, flowables, compress=True):
+    """Build ``doc`` (a SimpleDocTemplate) from any iterable of flowables."""
+    if compress:
+        doc.pageCompression = 1
+    doc.build(FlowableStream(flowables))
+
+
+class StreamingDocTemplate(SimpleDocTemplate):
+    """SimpleDocTemplate whose build() pulls flowables lazily from any iterable."""
+
+    def __init__(self, filename, **kw):
+        kw.setdefault("pageCompression", 1)
+        super().__init__(filename, **kw)
+
+    def build(self, flowables, *args, **kwargs):
+        super().build(FlowableStream(flowables), *args, **kwargs)
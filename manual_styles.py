@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Shared paragraph style registry for the manual generators.
+
+The house styles every manual uses (CustomTitle, CustomHeading, ...) are
+defined once in STYLE_DEFINITIONS.  stylesheet() builds reportlab's sample
+stylesheet plus those styles once per process, and derive_style() memoises
+variants, so parallel and batch builds do not rebuild ParagraphStyle objects
+for every document and typography stays identical across manuals.
+
+Style specs use the same keys as ParagraphStyle, except that ``parent``
+names another style, ``alignment`` is one of ALIGNMENTS and colours may be
+given as '#rrggbb' strings or reportlab colour names.  A ``fontName`` from
+manual_fonts.FONT_FAMILIES (``Lato``, ``Lato-Bold``, ...) is an embedded
+TrueType font, registered on first use.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+from manual_fonts import ensure_font, fonts_fingerprint
+
+
+ALIGNMENTS = {"left": TA_LEFT, "center": TA_CENTER, "right": TA_RIGHT, "justify": TA_JUSTIFY}
+
+STYLE_DEFINITIONS = {
+    "CustomTitle": {
+        "parent": "Heading1",
+        "fontSize": 28,
+        "textColor": "#667eea",
+        "spaceAfter": 30,
+        "alignment": "center",
+        "fontName": "Helvetica-Bold",
+    },
+    "CustomHeading": {
+        "parent": "Heading2",
+        "fontSize": 14,
+        "textColor": "#764ba2",
+        "spaceAfter": 12,
+        "spaceBefore": 12,
+        "fontName": "Helvetica-Bold",
+    },
+    "CustomSubHeading": {
+        "parent": "Heading3",
+        "fontSize": 11,
+        "textColor": "#667eea",
+        "spaceAfter": 8,
+        "fontName": "Helvetica-Bold",
+    },
+    "CustomBody": {
+        "parent": "BodyText",
+        "fontSize": 10,
+        "alignment": "justify",
+        "spaceAfter": 8,
+        "leading": 12,
+    },
+    "TitleStyle": {
+        "parent": "Title",
+        "alignment": "center",
+        "textColor": "#003D82",
+        "fontSize": 24,
+        "spaceAfter": 12,
+    },
+    "HeadingStyle": {
+        "parent": "Heading2",
+        "textColor": "#0EA5E9",
+        "spaceBefore": 12,
+        "spaceAfter": 8,
+    },
+    "DateStyle": {
+        "parent": "BodyText",
+        "alignment": "center",
+    },
+}
+
+_derived = {}
+
+
+def color(value):
+    """Return a reportlab Color for '#rrggbb' strings and colour names; other values pass through."""
+    return colors.toColor(value) if isinstance(value, str) else value
+
+
+def _attributes(spec):
+    attributes = dict(spec)
+    attributes.pop("parent", None)
+    if "alignment" in attributes:
+        attributes["alignment"] = ALIGNMENTS[attributes["alignment"]]
+    for key in ("textColor", "backColor", "borderColor"):
+        if key in attributes:
+            attributes[key] = color(attributes[key])
+    if "fontName" in attributes:
+        ensure_font(attributes["fontName"])
+    return attributes
+
+
+@lru_cache(maxsize=None)
+def stylesheet():
+    """Return the sample stylesheet extended with STYLE_DEFINITIONS, built once per process."""
+    sheet = getSampleStyleSheet()
+    for name, spec in STYLE_DEFINITIONS.items():
+        sheet.add(ParagraphStyle(name, parent=sheet[spec.get("parent", "Normal")], **_attributes(spec)))
+    return sheet
+
+
+def get_style(name):
+    """Return a registered style (house style or reportlab sample style) by name."""
+    return stylesheet()[name]
+
+
+def has_style(name):
+    return name in stylesheet()
+
+
+def derive_style(parent, name=None, **overrides):
+    """Return ``parent`` with ``overrides`` applied, memoised per process.
+
+    ``parent`` is a registered style name; ``name`` defaults to the parent's.
+    Override values use the spec conventions described above.
+    """
+    key = (parent, name, tuple(sorted((attr, repr(value)) for attr, value in overrides.items())))
+    style = _derived.get(key)
+    if style is None:
+        if not overrides and name in (None, parent):
+            style = get_style(parent)
+        else:
+            style = ParagraphStyle(name or parent, parent=get_style(parent), **_attributes(overrides))
+        _derived[key] = style
+    return style
+
+
+def registry_fingerprint():
+    """Return a digest of STYLE_DEFINITIONS and the embeddable font files, for cache keys."""
+    material = json.dumps(STYLE_DEFINITIONS, sort_keys=True) + fonts_fingerprint()
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Fixed-metric tables for large listings.
+
+reportlab's Table measures every cell to size its columns and rows, and
+splitting a long table across pages measures the remainder again on every
+page, which is fine for the three-row tables in the manuals but not for a
+contact listing with thousands of rows.  FixedTable takes its column widths
+up front, from widths_from_schema() (relative weights, as in the app's
+ExportToPdf) or widths_from_sample() (the natural widths of the first rows),
+and only holds plain strings:
+
+- ``overflow="truncate"`` cuts a value that does not fit its column short
+  with an ellipsis, so every row has the same height;
+- ``overflow="wrap"`` breaks it over several lines; row heights are then
+  computed once, the first time the table is laid out.
+
+Either way a split is a binary search over the row offsets, and the parts
+share the original rows, so laying out N rows over P pages costs O(N)
+rather than O(N * P).  Strings are measured with FontMetrics, which caches
+the width of every character (and of repeated values such as city names)
+per font and size; reportlab applies no kerning, so the sums are exact.
+
+In wrap mode a row taller than a whole frame is cut short with an
+ellipsis, as it could never be laid out otherwise.
+
+Rows are drawn by appending text operators to the text object's private
+``_code`` list through its private ``_formatText()``, which skips the
+number formatting and string measuring of the public text calls.  Both
+were checked against reportlab 5.0.1; if a release drops or changes them,
+the rows are drawn with setTextOrigin()/textOut() instead.
+"""
+
+from bisect import bisect_right
+
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import getFont, stringWidth
+from reportlab.platypus.flowables import Flowable
+
+from manual_fonts import ensure_font
+
+
+OVERFLOW_MODES = ("truncate", "wrap")
+ELLIPSIS = "..."
+# Values measured more than once are remembered, up to this many per font.
+MAX_CACHED_STRINGS = 50000
+
+_metrics = {}
+
+
+def font_metrics(font_name, font_size):
+    """Return the FontMetrics for a font and size, shared per process."""
+    key = (font_name, font_size)
+    metrics = _metrics.get(key)
+    if metrics is None:
+        metrics = _metrics[key] = FontMetrics(ensure_font(font_name), font_size)
+    return metrics
+
+
+class FontMetrics:
+    """String widths for one font and size from cached per-character widths."""
+
+    def __init__(self, font_name, font_size):
+        self.font_name = font_name
+        self.font_size = font_size
+        self.ascent = getFont(font_name).face.ascent * font_size / 1000.0
+        self._chars = {}
+        self._strings = {}
+        self.ellipsis = self.width(ELLIPSIS)
+
+    def _char(self, char):
+        width = self._chars.get(char)
+        if width is None:
+            width = self._chars[char] = stringWidth(char, self.font_name, self.font_size)
+        return width
+
+    def width(self, text):
+        width = self._strings.get(text)
+        if width is None:
+            chars = self._chars
+            width = 0.0
+            for char in text:
+                value = chars.get(char)
+                width += self._char(char) if value is None else value
+            if len(self._strings) >= MAX_CACHED_STRINGS:
+                self._strings.clear()
+            self._strings[text] = width
+        return width
+
+    def truncate(self, text, room):
+        """Return text, cut short with an ellipsis if it is wider than room points."""
+        if self.width(text) <= room:
+            return text
+        room -= self.ellipsis
+        used = 0.0
+        for index, char in enumerate(text):
+            used += self._char(char)
+            if used > room:
+                return text[:index].rstrip() + ELLIPSIS
+        return text + ELLIPSIS
+
+    def wrap(self, text, room):
+        """Return text broken into lines no wider than room points (long words are broken too)."""
+        if self.width(text) <= room:
+            return [text]
+        space = self._char(" ")
+        lines, line, used = [], [], 0.0
+        for word in text.split():
+            width = self.width(word)
+            if line and used + space + width <= room:
+                line.append(word)
+                used += space + width
+                continue
+            if line:
+                lines.append(" ".join(line))
+            line, used = [], 0.0
+            while width > room and len(word) > 1:
+                cut, taken = 0, 0.0
+                for char in word:
+                    if taken + self._char(char) > room and cut:
+                        break
+                    taken += self._char(char)
+                    cut += 1
+                lines.append(word[:cut])
+                word = word[cut:]
+                width = self.width(word)
+            line, used = [word], width
+        if line:
+            lines.append(" ".join(line))
+        return lines
+
+
+def widths_from_schema(weights, total_width):
+    """Split total_width between columns in proportion to their weights."""
+    total = float(sum(weights))
+    return [total_width * weight / total for weight in weights]
+
+
+def widths_from_sample(rows, total_width, font_name="Helvetica", font_size=9, padding=4, header=None,
+                       min_width=24):
+    """Column widths proportional to the widest value of each column in a sample of rows.
+
+    ``rows`` is the sample (say the first 200 rows); ``header`` counts as one
+    more row.  Every column gets at least ``min_width`` points.
+    """
+    metrics = font_metrics(font_name, font_size)
+    sample = ([header] if header else []) + list(rows)
+    columns = max(len(row) for row in sample)
+    natural = [min_width] * columns
+    for row in sample:
+        for column, text in enumerate(row):
+            natural[column] = max(natural[column], metrics.width(text) + 2 * padding)
+    widths = widths_from_schema(natural, total_width)
+    short = [column for column, width in enumerate(widths) if width < min_width]
+    if short and min_width * columns <= total_width:
+        spare = total_width - min_width * len(short)
+        rest = [natural[column] for column in range(columns) if column not in short]
+        scaled = iter(widths_from_schema(rest, spare))
+        widths = [min_width if column in short else next(scaled) for column in range(columns)]
+    return widths
+
+
+def _text_internals(text):
+    """Return the operator list and _formatText() of a PDFTextObject, or None if reportlab has changed them."""
+    code = getattr(text, "_code", None)
+    format_text = getattr(text, "_formatText", None)
+    if isinstance(code, list) and callable(format_text):
+        return code, format_text
+    return None
+
+
+class _Rows:
+    """The rows of a FixedTable and its parts, with their laid-out lines and offsets."""
+
+    def __init__(self, rows, col_widths, metrics, padding, leading, overflow):
+        self.rows = rows
+        self.col_widths = col_widths
+        self.metrics = metrics
+        self.padding = padding
+        self.leading = leading
+        self.overflow = overflow
+        self.row_height = leading + 2 * padding
+        self.lines = None
+        self.offsets = None
+
+    def prepare(self):
+        """Break every cell into lines (wrap mode) and record the row offsets, once."""
+        if self.overflow != "wrap" or self.offsets is not None:
+            return
+        rooms = [width - 2 * self.padding for width in self.col_widths]
+        wrap = self.metrics.wrap
+        self.lines = []
+        self.offsets = offsets = [0.0]
+        for row in self.rows:
+            cells = [wrap(text, room) for text, room in zip(row, rooms)]
+            self.lines.append(cells)
+            offsets.append(offsets[-1] + max((len(cell) for cell in cells), default=1) * self.leading
+                           + 2 * self.padding)
+
+    def clip(self, index, height):
+        """Cut the cells of row ``index`` (wrap mode) short with an ellipsis so the row fits in height."""
+        count = max(1, int((height - 2 * self.padding) // self.leading))
+        rooms = [width - 2 * self.padding for width in self.col_widths]
+        truncate = self.metrics.truncate
+        cells = self.lines[index] = [
+            cell if len(cell) <= count else cell[:count - 1] + [truncate(" ".join(cell[count - 1:]), room)]
+            for cell, room in zip(self.lines[index], rooms)
+        ]
+        offsets = self.offsets
+        shift = (offsets[index] + max((len(cell) for cell in cells), default=1) * self.leading
+                 + 2 * self.padding) - offsets[index + 1]
+        for later in range(index + 1, len(offsets)):
+            offsets[later] += shift
+
+    def offset(self, index):
+        return self.offsets[index] if self.offsets is not None else index * self.row_height
+
+    def index_at(self, height, start):
+        """Return the largest index i such that rows start..i-1 fit in height."""
+        if self.offsets is not None:
+            return bisect_right(self.offsets, self.offsets[start] + height) - 1
+        return start + int(height // self.row_height)
+
+    def cell_lines(self, index):
+        if self.lines is not None:
+            return self.lines[index]
+        truncate = self.metrics.truncate
+        return [[truncate(text, width - 2 * self.padding)] for text, width in zip(self.rows[index], self.col_widths)]
+
+
+class FixedTable(Flowable):
+    """A table of strings with fixed column widths that splits in O(rows).
+
+    ``rows`` is a list of lists of strings (``None`` prints as "").
+    ``header`` is an optional row repeated at the top of every part, in
+    ``bold_font``.  Rows are separated by ``line_color`` rules and the header
+    by a ``header_line_color`` rule; ``header_background`` fills the header
+    row.
+    """
+
+    def __init__(self, rows, col_widths, header=None, font_name="Helvetica", bold_font="Helvetica-Bold",
+                 font_size=9, leading=None, padding=4, overflow="truncate", line_color="#e0e0e0",
+                 header_line_color="black", header_background=None, hAlign="LEFT", _rows=None, _span=None):
+        if overflow not in OVERFLOW_MODES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_MODES}, not {overflow!r}")
+        super().__init__()
+        # What a part needs to be built over the same rows; layout state is not copied.
+        self._options = dict(
+            header=header, font_name=font_name, bold_font=bold_font, font_size=font_size, leading=leading,
+            padding=padding, overflow=overflow, line_color=line_color, header_line_color=header_line_color,
+            header_background=header_background, hAlign=hAlign,
+        )
+        self.header = None if header is None else ["" if text is None else str(text) for text in header]
+        self.col_widths = list(col_widths)
+        self.font_name = font_name
+        self.bold_font = ensure_font(bold_font)
+        self.font_size = font_size
+        self.leading = leading or font_size * 1.2
+        self.padding = padding
+        self.overflow = overflow
+        self.line_color = colors.toColor(line_color) if line_color else None
+        self.header_line_color = colors.toColor(header_line_color) if header_line_color else None
+        self.header_background = colors.toColor(header_background) if header_background else None
+        self.hAlign = hAlign
+        if _rows is None:
+            rows = [["" if text is None else str(text) for text in row] for row in rows]
+            _rows = _Rows(rows, self.col_widths, font_metrics(font_name, font_size), padding, self.leading, overflow)
+        self._rows = _rows
+        self._start, self._stop = _span or (0, len(_rows.rows))
+        self.width = sum(self.col_widths)
+
+    def __len__(self):
+        return self._stop - self._start
+
+    @property
+    def header_height(self):
+        return 0 if self.header is None else self.leading + 2 * self.padding
+
+    def _part(self, start, stop):
+        return FixedTable(None, self.col_widths, _rows=self._rows, _span=(start, stop), **self._options)
+
+    def wrap(self, availWidth, availHeight):
+        self._rows.prepare()
+        self.height = self.header_height + self._rows.offset(self._stop) - self._rows.offset(self._start)
+        return self.width, self.height
+
+    def _at_top(self):
+        # Frame.split() sets _frame on the flowable, and handle_flowable() sets
+        # _postponed once it has moved it on to the next frame.
+        return bool(getattr(getattr(self, "_frame", None), "_atTop", False) or getattr(self, "_postponed", False))
+
+    def split(self, availWidth, availHeight):
+        rows = self._rows
+        rows.prepare()
+        room = availHeight - self.header_height
+        end = min(rows.index_at(room, self._start), self._stop)
+        if end <= self._start and rows.lines is not None and self._at_top():
+            # A wrapped row taller than a whole frame would never fit; cut it short instead.
+            rows.clip(self._start, room)
+            end = min(rows.index_at(room, self._start), self._stop)
+        if end <= self._start:
+            return []
+        if end >= self._stop:
+            return [self]
+        return [self._part(self._start, end), self._part(end, self._stop)]
+
+    def _draw_row(self, text, cells, top, ascent):
+        # setTextOrigin()/textOut() would format every coordinate with fp_str()
+        # and measure every string to advance a cursor nothing here uses.
+        internals = _text_internals(text)
+        x = 0.0
+        for lines, width in zip(cells, self.col_widths):
+            y = top - self.padding - ascent
+            for line in lines:
+                if not line:
+                    pass
+                elif internals is not None:
+                    code, format_text = internals
+                    code.append(f"1 0 0 1 {x + self.padding:.2f} {y:.2f} Tm")
+                    code.append(format_text(line))
+                else:
+                    text.setTextOrigin(x + self.padding, y)
+                    text.textOut(line)
+                y -= self.leading
+            x += width
+
+    def draw(self):
+        canv = self.canv
+        rows = self._rows
+        top = self.height
+        rules = []
+        canv.saveState()
+        if self.header is not None:
+            height = self.header_height
+            if self.header_background is not None:
+                canv.setFillColor(self.header_background)
+                canv.rect(0, top - height, self.width, height, stroke=0, fill=1)
+            canv.setFillColor(colors.black)
+            text = canv.beginText()
+            text.setFont(self.bold_font, self.font_size)
+            header_metrics = font_metrics(self.bold_font, self.font_size)
+            self._draw_row(text, [[header_metrics.truncate(cell, width - 2 * self.padding)]
+                                  for cell, width in zip(self.header, self.col_widths)], top, header_metrics.ascent)
+            canv.drawText(text)
+            top -= height
+            if self.header_line_color is not None:
+                canv.setStrokeColor(self.header_line_color)
+                canv.line(0, top, self.width, top)
+
+        canv.setFillColor(colors.black)
+        text = canv.beginText()
+        text.setFont(self.font_name, self.font_size)
+        base = rows.offset(self._start)
+        for index in range(self._start, self._stop):
+            row_top = self.height - self.header_height - (rows.offset(index) - base)
+            row_bottom = self.height - self.header_height - (rows.offset(index + 1) - base)
+            self._draw_row(text, rows.cell_lines(index), row_top, rows.metrics.ascent)
+            rules.append((0, row_bottom, self.width, row_bottom))
+        canv.drawText(text)
+        if self.line_color is not None and rules:
+            canv.setStrokeColor(self.line_color)
+            canv.lines(rules)
+        canv.restoreState()
@@ -0,0 +1,18 @@
+from pathlib import Path
+
+from benchmark_manuals import synthetic_definition
+from manual_images import ImageStore
+
+
+def test_synthetic_copies_embed_screenshots_of_their_own(tmp_path):
+    definition = synthetic_definition(3, image_dir=tmp_path / "screenshots")
+    image_dir = Path(definition["image_dir"])
+    names = [name for section in definition["sections"] for block in section["blocks"]
+             for name in block.get("images", [])]
+    assert len(names) == len(set(names)) and all((image_dir / name).exists() for name in names)
+
+    # Prepared as the build prepares them (flattened and resampled), the copies still differ.
+    images = ImageStore(cache_dir=tmp_path / "cache")
+    copies = [image_dir / name for name in sorted(names) if name.startswith("Add_New_Contact-")]
+    assert len(copies) == 3
+    assert len({images.prepare(path, 450).path.read_bytes() for path in copies}) == 3
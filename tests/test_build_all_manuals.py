@@ -0,0 +1,13 @@
+import importlib
+import inspect
+
+from build_all_manuals import MANUALS
+
+
+def test_generators_share_one_build_manual_signature():
+    signatures = {
+        name: list(inspect.signature(importlib.import_module(module).build_manual).parameters)
+        for name, (module, _) in MANUALS.items()
+    }
+    assert all(parameters == ["output_pdf", "images", "profiler", "workers", "force"]
+               for parameters in signatures.values()), signatures
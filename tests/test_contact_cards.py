@@ -0,0 +1,57 @@
+import pytest
+
+from contact_cards import generate_cards, resolve_upload
+from contact_directory import synthetic_contacts
+
+
+@pytest.mark.parametrize("font", ["Times-Roman", "Courier", "Lato"])
+def test_cards_in_other_fonts(tmp_path, font):
+    report = generate_cards(synthetic_contacts(3), tmp_path / "cards", workers=1, font=font)
+
+    assert not report.failed
+    assert len(list((tmp_path / "cards").glob("*.pdf"))) == 3
+
+
+def test_unknown_font_is_rejected_before_any_card(tmp_path):
+    with pytest.raises(ValueError, match="unknown font 'Arial'"):
+        generate_cards(synthetic_contacts(3), tmp_path / "cards", workers=1, font="Arial")
+    assert not (tmp_path / "cards").exists()
+
+
+def test_photo_paths_cannot_leave_their_root(tmp_path):
+    from PIL import Image
+
+    uploads = tmp_path / "uploads"
+    (uploads / "photos").mkdir(parents=True)
+    Image.new("RGB", (40, 40), "red").save(uploads / "photos" / "inside.png")
+    Image.new("RGB", (40, 40), "blue").save(tmp_path / "outside.png")
+
+    assert resolve_upload("/uploads/photos/inside.png", uploads) == (uploads / "photos" / "inside.png").resolve()
+    assert resolve_upload("/uploads/photos/../photos/inside.png", uploads).name == "inside.png"
+    for escape in ("/uploads/../outside.png", "/uploads/photos/../../../../etc/passwd", "uploads\\..\\outside.png"):
+        with pytest.raises(ValueError, match="is outside"):
+            resolve_upload(escape, uploads)
+    with pytest.raises(ValueError, match="is outside"):
+        resolve_upload("/../outside.png", uploads, web_root=tmp_path / "wwwroot")
+
+    contacts = [{"Id": 1, "FirstName": "In", "PhotoPath": "/uploads/photos/inside.png"},
+                {"Id": 2, "FirstName": "Out", "PhotoPath": "/uploads/../outside.png"}]
+    report = generate_cards(contacts, tmp_path / "cards", workers=1, uploads_root=uploads)
+    assert not report.failed and report.cards == 2
+    (_, name, status, message), = report.problems
+    assert (name, status) == ("contact-2.pdf", "no photo") and "is outside" in message
+
+
+def test_only_date_fields_are_trimmed(tmp_path):
+    from pypdf import PdfReader
+
+    contact = {"Id": 7, "FirstName": "Ann", "DateOfBirth": "1990-05-01T00:00:00",
+               "Address": "1234-Some Town Center Road", "OtherDetails": "2024-01-01 Tuesday notes",
+               "Documents": [{"DocumentType": "ID", "FileName": "id.pdf", "FileSize": 2048,
+                              "UploadedAt": "2024-02-03T10:11:12"}]}
+    generate_cards([contact], tmp_path / "cards", workers=1)
+
+    text = PdfReader(tmp_path / "cards" / "contact-7.pdf").pages[0].extract_text()
+    assert "1990-05-01" in text and "T00:00:00" not in text
+    assert "2024-02-03" in text and "10:11:12" not in text
+    assert "1234-Some Town Center Road" in text and "2024-01-01 Tuesday notes" in text
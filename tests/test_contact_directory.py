@@ -0,0 +1,37 @@
+import pytest
+from pypdf import PdfReader
+
+from contact_directory import export_directory, main, synthetic_contacts
+
+
+@pytest.mark.parametrize("font, bold", [("Helvetica", "Helvetica-Bold"), ("Times-Roman", "Times-Bold"),
+                                        ("Courier", "Courier-Bold")])
+def test_built_in_fonts_use_their_bold_face(tmp_path, font, bold):
+    output = tmp_path / "directory.pdf"
+    report = export_directory(synthetic_contacts(50), output, font=font)
+
+    assert report.rows == 50 and report.pages >= 2
+    fonts = {str(font["/BaseFont"]) for font in PdfReader(output).pages[0]["/Resources"]["/Font"].values()}
+    # reportlab's canvas starts every page in Helvetica.
+    assert fonts - {"/Helvetica"} == {f"/{font}", f"/{bold}"} - {"/Helvetica"}
+
+
+def test_unknown_font_is_rejected(tmp_path, capsys):
+    with pytest.raises(ValueError, match="unknown font 'Arial'"):
+        export_directory(synthetic_contacts(5), tmp_path / "directory.pdf", font="Arial")
+    assert main(["--synthetic", "5", "-o", str(tmp_path / "directory.pdf"), "--font", "Arial"]) == 2
+    assert "unknown font 'Arial'" in capsys.readouterr().err
+    assert not (tmp_path / "directory.pdf").exists()
+
+
+@pytest.mark.parametrize("all_columns", [False, True])
+def test_empty_csv_gives_a_header_page(tmp_path, all_columns):
+    source = tmp_path / "contacts.csv"
+    source.write_text("FirstName,LastName,Email\n", encoding="utf-8")
+    output = tmp_path / "directory.pdf"
+
+    assert main([str(source), "-o", str(output)] + ["--all-columns"] * all_columns) == 0
+    reader = PdfReader(output)
+    assert len(reader.pages) == 1
+    text = reader.pages[0].extract_text()
+    assert "Contact List" in text and ("FirstName" if all_columns else "Mobile 1") in text
@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+import check_import_budget
+
+
+def test_no_heavy_imports():
+    heavy = check_import_budget.heavy_imports(list(check_import_budget.BUDGETS))
+    assert heavy == {module: [] for module in check_import_budget.BUDGETS}
+
+
+@pytest.mark.skipif(not os.environ.get("IMPORT_BUDGET"), reason="timing budgets run with IMPORT_BUDGET=1")
+@pytest.mark.parametrize("module, budget", check_import_budget.BUDGETS.items())
+def test_import_budget(module, budget):
+    median, heavy, slowest = check_import_budget.check(module, budget)
+    assert not heavy, f"{module} imports {', '.join(heavy)} at import time"
+    assert median <= budget, f"{module} imports in {median:.1f} ms (budget {budget} ms); slowest: {slowest}"
@@ -0,0 +1,48 @@
+import csv
+import io
+import itertools
+
+import pytest
+
+from contact_import_check import CheckReport, check_rows
+
+NAMES = ("Ann", "A\nB", "\nZ", "\n", " \n ", "", " ", "\t")
+
+
+class Problems:
+    def __init__(self):
+        self.rows = []
+
+    def writerows(self, rows):
+        self.rows.extend(rows)
+
+
+def csv_lines(rows):
+    buffer = io.StringIO(newline="")
+    writer = csv.writer(buffer)
+    writer.writerow(("FirstName", "LastName", "Mobile1"))
+    writer.writerows(rows)
+    return io.StringIO(buffer.getvalue(), newline="")
+
+
+def server_verdict(first, last):
+    """ImportFromCsv keeps a row unless both names are IsNullOrWhiteSpace; [Required] needs a FirstName."""
+    if not first.strip() and not last.strip():
+        return "skipped"
+    if not first.strip():
+        return "required"
+    return None
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1000])
+def test_name_rules_match_the_server_on_multiline_fields(chunk_size):
+    pairs = list(itertools.product(NAMES, NAMES))
+    rows = [(first, last, f"+1 555 {number:04d}") for number, (first, last) in enumerate(pairs)]
+    problems = Problems()
+    report = check_rows(csv_lines(rows), CheckReport(problems), chunk_size=chunk_size)
+
+    found = {row - 2: rule for row, column, _, rule, _, _ in problems.rows if column == "FirstName"}
+    expected = {index: server_verdict(first, last) for index, (first, last) in enumerate(pairs)}
+    assert found == {index: verdict for index, verdict in expected.items() if verdict}
+    assert report.skipped == sum(verdict == "skipped" for verdict in expected.values())
+    assert report.imported == len(rows) - report.skipped
@@ -0,0 +1,168 @@
+import asyncio
+import html
+import random
+
+import pytest
+
+import contact_import_upload
+from contact_import_check import synthetic_lines
+from contact_import_stub import ImportStub
+from contact_import_upload import Checkpoint, Uploader, UploadReport, parse_outcome
+
+ROWS = 1000
+
+
+class Messages:
+    def __init__(self):
+        self.rows = []
+
+    def writerows(self, rows):
+        self.rows.extend(rows)
+
+
+class StallingStub(ImportStub):
+    """Saves the first ``stalls`` imports, then answers them too late."""
+
+    def __init__(self, stall, stalls, **options):
+        super().__init__(**options)
+        self.stall = stall
+        self.stalls = stalls
+
+    async def _import(self, session, fields):
+        response = await super()._import(session, fields)
+        if self.stalls:
+            self.stalls -= 1
+            await asyncio.sleep(self.stall)
+        return response
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(contact_import_upload, "backoff", lambda *args, **kwargs: 0.0)
+
+
+def run(stub, *uploads):
+    """Start the stub and run each (options, report) upload against it in turn."""
+    async def go():
+        async with stub:
+            return [await Uploader(stub.url, "admin", "admin", rng=random.Random(0), **options).run(synthetic_lines(ROWS))
+                    for options in uploads]
+    return asyncio.run(go())
+
+
+def test_retries_server_errors_dropped_connections_and_expired_sessions():
+    stub = ImportStub(failure_rate=0.3, drop_rate=0.2, max_in_flight=2, session_limit=4, seed=3)
+    report, = run(stub, dict(batch_size=50, concurrency=4, retries=20))
+
+    assert not report.failures and report.error is None
+    assert stub.stats["failed"] and stub.stats["dropped"] and stub.stats["throttled"] and stub.stats["logins"] > 1
+    assert report.retries >= stub.stats["failed"] + stub.stats["dropped"] + stub.stats["throttled"]
+    assert report.rows == ROWS and report.rejected == 0
+    assert report.imported + report.replayed == stub.contacts == ROWS
+
+
+def test_timeout_after_save_counts_rows_as_replayed():
+    stub = StallingStub(stall=1.0, stalls=2)
+    report, = run(stub, dict(batch_size=100, concurrency=2, retries=2, timeout=0.3))
+
+    assert not report.failures
+    assert report.retries == 2
+    assert report.replayed == 200 and report.rejected == 0
+    assert report.imported + report.replayed == stub.contacts == ROWS
+
+
+def test_timeouts_exhaust_retries():
+    stub = StallingStub(stall=1.0, stalls=100)
+    report, = run(stub, dict(batch_size=ROWS, concurrency=1, retries=1, timeout=0.2))
+
+    (number, first_row, rows, reason), = report.failures
+    assert (number, first_row, rows) == (1, 2, ROWS)
+    assert reason.startswith("gave up after 2 attempts: TimeoutError")
+
+
+def test_resume_skips_done_batches_and_replays_unanswered_ones(tmp_path):
+    path = tmp_path / "contacts.csv.upload.jsonl"
+    identity = {"source": "synthetic", "batch_size": 50}
+    stub = ImportStub(drop_rate=0.6, seed=5)
+
+    first = Checkpoint(path, identity)
+    try:
+        interrupted, = run(stub, dict(batch_size=50, concurrency=2, retries=0, checkpoint=first))
+    finally:
+        first.close()
+    assert interrupted.failures and interrupted.batches
+    saved_before = stub.contacts
+    assert saved_before > interrupted.imported  # some batches were saved but never answered
+
+    stub.drop_rate = 0.0
+    second = Checkpoint(path, identity)
+    assert set(second.done) and second.sent == {number for number, _, _, _ in interrupted.failures}
+    try:
+        resumed, = run(stub, dict(batch_size=50, concurrency=2, checkpoint=second))
+    finally:
+        second.close()
+
+    assert resumed.resumed == interrupted.batches and resumed.resumed_rows == interrupted.rows
+    assert resumed.batches == len(interrupted.failures) and not resumed.failures
+    assert resumed.replayed == saved_before - interrupted.imported and resumed.rejected == 0
+    assert interrupted.imported + resumed.imported + resumed.replayed == stub.contacts == ROWS
+
+    with pytest.raises(ValueError, match="different upload"):
+        Checkpoint(path, dict(identity, batch_size=100))
+
+
+def test_duplicates_are_rejected_with_the_server_messages():
+    messages = Messages()
+    stub = ImportStub()
+    first, second = run(stub, dict(batch_size=100), dict(batch_size=100, report=UploadReport(messages)))
+
+    assert first.imported == ROWS
+    assert (second.imported, second.rejected, second.replayed) == (0, ROWS, 0)
+    assert len(messages.rows) == ROWS
+    assert messages.rows[0] == [1, 2, "Row 1 (Contact1 Surname1): Mobile1 already exists."]
+    assert stub.contacts == ROWS
+
+
+@pytest.mark.parametrize("encode", [html.escape, lambda text: text], ids=["Index", "Import"])
+def test_parse_outcome(encode):
+    message = "Import completed with errors:<br/>Row 1 (Ann & Bo): Mobile1 already exists.<br/>Row 3 (): x"
+    page = ('<div class="alert alert-success" style="padding: 15px;"><i class="fas fa-check-circle"></i> '
+            'Successfully imported 7 contact(s)!</div>'
+            f'<div class="alert alert-danger alert-dismissible fade show" role="alert">{encode(message)}'
+            '<button type="button" class="btn-close"></button></div>')
+
+    assert parse_outcome(page) == (7, ["Row 1 (Ann & Bo): Mobile1 already exists.", "Row 3 (): x"])
+    assert parse_outcome("<table></table>") == (None, [])
+
+
+def duplicate_csv(path):
+    """40 contacts whose last 20 repeat the Mobile1 of the first 20, under other names."""
+    lines = ["FirstName,LastName,Mobile1"]
+    lines += [f"First{number},Last{number},+1-555-{number % 20:04d}" for number in range(40)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_stub_saves_duplicates_of_batches_in_flight_together(tmp_path):
+    stub = ImportStub(latency=0.05)
+
+    async def go():
+        async with stub:
+            with open(duplicate_csv(tmp_path / "contacts.csv"), newline="", encoding="utf-8") as lines:
+                return await Uploader(stub.url, "admin", "admin", batch_size=10, concurrency=4).run(lines)
+
+    asyncio.run(go())
+    assert stub.stats["duplicates"] > 0
+
+
+def test_concurrent_upload_refuses_a_file_with_duplicates(tmp_path, monkeypatch, capsys):
+    monkeypatch.delenv(contact_import_upload.PASSWORD_ENV, raising=False)
+    source = duplicate_csv(tmp_path / "contacts.csv")
+
+    assert contact_import_upload.main([str(source), "--stub", "--batch-size", "10", "--concurrency", "4"]) == 1
+    assert "20 row(s) repeat a contact" in capsys.readouterr().err
+    assert not source.with_name("contacts.csv.upload.jsonl").exists()
+
+    assert contact_import_upload.main([str(source), "--stub", "--batch-size", "10", "--concurrency", "1"]) == 0
+    output = capsys.readouterr().out
+    assert "20 contacts saved" in output and "'duplicates': 0" in output
@@ -0,0 +1,68 @@
+import io
+from datetime import datetime
+from pathlib import Path
+
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+from manual_cache import CachedSection, build_sections, render_section
+from manual_definitions import build_from_definition
+
+MANUALS = Path(__file__).resolve().parent.parent / "manuals"
+
+
+def paragraphs():
+    return [Paragraph(f"Paragraph {number}", getSampleStyleSheet()["Normal"]) for number in range(20)]
+
+
+def test_manual_sections_skip_ascii85_without_changing_the_process_default():
+    default = rl_config.useA85
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+
+    section = render_section(doc, paragraphs())
+    assert b"/FlateDecode" in section and b"/ASCII85Decode" not in section
+    assert rl_config.useA85 == default
+
+    doc.build(paragraphs())
+    assert (b"/ASCII85Decode" in buffer.getvalue()) == bool(default)
+
+
+def keyed_sections(texts, made):
+    def make(text):
+        made.append(text)
+        return [Paragraph(text, getSampleStyleSheet()["Normal"])]
+
+    return [CachedSection(text, lambda text=text: make(text), title=text) for text in texts]
+
+
+def test_only_edited_sections_are_laid_out_again(tmp_path):
+    doc = SimpleDocTemplate(str(tmp_path / "manual.pdf"), pagesize=A4)
+    texts = [f"Section {number}" for number in range(4)]
+    made = []
+    assert build_sections(doc, keyed_sections(texts, made), "manual", cache_dir=tmp_path)["misses"] == 4
+
+    edited = texts[:2] + ["Section 2, edited"] + texts[3:]
+    made.clear()
+    stats = build_sections(doc, keyed_sections(edited, made), "manual", cache_dir=tmp_path)
+    assert stats == {"sections": 4, "hits": 3, "misses": 1} and made == ["Section 2, edited"]
+
+    # Reverting the edit finds the section as it was before.
+    made.clear()
+    stats = build_sections(doc, keyed_sections(texts, made), "manual", cache_dir=tmp_path)
+    assert stats == {"sections": 4, "hits": 4, "misses": 0} and made == []
+
+
+def test_cached_build_matches_a_forced_build_from_scratch(tmp_path):
+    now = datetime(2026, 3, 4, 9, 0)
+    cached = tmp_path / "cached.pdf"
+    build_from_definition(MANUALS / "user_manual.yaml", cached, now=now, cache_dir=tmp_path / "cache")
+    before = cached.read_bytes()
+    build_from_definition(MANUALS / "user_manual.yaml", cached, now=now, cache_dir=tmp_path / "cache", force=True)
+    assert cached.read_bytes() == before
+
+    fresh = tmp_path / "fresh.pdf"
+    build_from_definition(MANUALS / "user_manual.yaml", fresh, now=now, cache_dir=tmp_path / "fresh", force=True)
+    assert fresh.read_bytes() == cached.read_bytes()
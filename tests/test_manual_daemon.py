@@ -0,0 +1,10 @@
+import io
+
+from manual_daemon import ManualDaemon
+from manual_definitions import BASE_DIR, PIPELINE_MODULES
+
+
+def test_daemon_watches_only_the_pipeline_code():
+    daemon = ManualDaemon([], output=io.StringIO())
+    assert daemon.watched_paths() == {BASE_DIR / f"{name}.py" for name in PIPELINE_MODULES}
+    assert BASE_DIR / "manual_html.py" in ManualDaemon([], html=True, output=io.StringIO()).watched_paths()
@@ -0,0 +1,34 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from manual_definitions import build_from_definition, inputs_digest, load_manual
+
+MANUALS = sorted((Path(__file__).resolve().parent.parent / "manuals").glob("*.yaml"))
+
+
+@pytest.mark.parametrize("path", MANUALS, ids=lambda path: path.stem)
+def test_inputs_digest_is_stable_within_a_day(path):
+    definition = load_manual(path)
+    morning, evening = datetime(2026, 3, 4, 9, 0), datetime(2026, 3, 4, 17, 59, 59)
+
+    assert inputs_digest(definition, morning) == inputs_digest(definition, evening)
+    assert inputs_digest(definition, morning) != inputs_digest(definition, datetime(2026, 3, 5, 9, 0))
+
+
+@pytest.mark.parametrize("name", ["user_manual", "complete_manual"])
+def test_table_of_contents_points_at_the_merged_pages(tmp_path, name):
+    from pypdf import PdfReader
+
+    output = build_from_definition(MANUALS[0].parent / f"{name}.yaml", tmp_path / "manual.pdf",
+                                   now=datetime(2026, 3, 4, 9, 0), cache_dir=tmp_path / "cache")
+    pages = [page.extract_text() for page in PdfReader(str(output)).pages]
+    contents = next(index for index, text in enumerate(pages) if "TABLE OF CONTENTS" in text)
+    # Every entry is its text on one line and its page number on the next.
+    lines = [line.strip() for line in pages[contents].splitlines()[1:] if line.strip()]
+    entries = [(text, int(page)) for text, page in zip(lines[::2], lines[1::2])]
+
+    assert len(entries) > 3
+    for text, page in entries:
+        assert page > contents + 1 and text in pages[page - 1], (text, page)
@@ -0,0 +1,29 @@
+import html
+import re
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from manual_cache import plain_text
+from manual_definitions import expand_placeholders, load_manual
+from manual_html import build_html
+
+MANUALS = Path(__file__).resolve().parent.parent / "manuals"
+
+
+@pytest.mark.parametrize("name", ["user_manual", "complete_manual"])
+def test_every_section_page_has_its_headings(tmp_path, name):
+    definition = load_manual(MANUALS / f"{name}.yaml")
+    now = datetime(2026, 3, 4, 9, 0)
+    written = build_html(definition, help_dir=tmp_path, now=now)
+
+    sections = expand_placeholders(definition["sections"], now)
+    assert len(written) == len(sections)
+    for section, file_name in zip(sections, written):
+        page = (tmp_path / definition["cache_name"] / file_name).read_text(encoding="utf-8")
+        found = [html.unescape(re.sub(r"<[^>]+>", "", heading))
+                 for heading in re.findall(r"<h2[^>]*>(.*?)</h2>", page, re.DOTALL)]
+        for block in section["blocks"]:
+            if "heading" in block:
+                assert plain_text(block["heading"]) in found, (file_name, block["heading"])
@@ -0,0 +1,33 @@
+import pytest
+from reportlab.pdfbase.pdfdoc import PDFDocument, PDFStream
+
+import generate_screenshot_manual_pdf
+from manual_memory import ImageBufferCache
+
+
+def test_spilled_entry_comes_back_as_bytes_reportlab_can_write(tmp_path):
+    cache = ImageBufferCache(max_bytes=1500, spill_dir=tmp_path)
+    try:
+        first = [b"a" * 1000, b"m" * 10]
+        cache.put("first", {"name": "first"}, first)
+        cache.put("second", {"name": "second"}, [b"b" * 1000])
+        assert cache.stats["spilled"] == 1 and cache.memory_bytes == 1000
+
+        meta, chunks = cache.get("first")
+        assert meta == {"name": "first"} and chunks == first
+        assert all(type(chunk) is bytes for chunk in chunks)
+        assert cache.stats["spill_hits"] == 1
+        # Counted in memory again, so the older entry went out to make room (and "first" was not written twice).
+        assert cache.memory_bytes == 1010 and cache.stats["spilled"] == 2
+
+        stream = PDFStream(content=chunks[0], filters=()).format(PDFDocument())
+        assert b"\nstream\n" + first[0] in stream
+    finally:
+        cache.close()
+
+
+def test_memory_ceiling_is_refused_with_workers(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        generate_screenshot_manual_pdf.main(["--memory-ceiling", "512M", "--workers", "2"])
+    assert exit_info.value.code == 2
+    assert "cannot be used with --workers" in capsys.readouterr().err
@@ -0,0 +1,30 @@
+import io
+
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+from manual_cache import render_section
+from manual_paragraphs import ParagraphCache
+
+TEXT = ("<b>Step 3:</b> Click <i>Save</i> &amp; check the contact list; long enough to wrap onto a second "
+        "line, with <font color='#c0392b'>coloured</font> text and a <br/>forced break. " * 30)
+
+
+def rendered(doc, flowables):
+    # The pages' content streams: a section's info carries its creation time and a random /ID.
+    return [page.get_contents().get_data() for page in PdfReader(io.BytesIO(render_section(doc, flowables))).pages]
+
+
+def test_memoised_paragraph_renders_like_a_fresh_one(tmp_path):
+    style = getSampleStyleSheet()["Normal"]
+    doc = SimpleDocTemplate(str(tmp_path / "unused.pdf"), pagesize=A4)
+    fresh = rendered(doc, [Paragraph(TEXT, style, bulletText="•") for _ in range(3)])
+
+    cache = ParagraphCache()
+    # Laid out twice: layout (and splitting across pages) writes to the fragments, which must not leak
+    # into the next copy.
+    for _ in range(2):
+        assert rendered(doc, [cache.paragraph(TEXT, style, "•") for _ in range(3)]) == fresh
+    assert cache.stats() == {"hits": 5, "misses": 1, "entries": 1}
@@ -0,0 +1,29 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from manual_definitions import build_from_definition
+
+MANUALS = Path(__file__).resolve().parent.parent / "manuals"
+
+
+def page_texts(path):
+    from pypdf import PdfReader
+
+    return [page.extract_text() for page in PdfReader(str(path)).pages]
+
+
+@pytest.mark.parametrize("name", ["user_manual", "complete_manual"])
+def test_streamed_build_matches_the_cached_build(tmp_path, name):
+    now = datetime(2026, 3, 4, 9, 0)
+    cached = page_texts(build_from_definition(MANUALS / f"{name}.yaml", tmp_path / "cached.pdf", now=now,
+                                              cache_dir=tmp_path / "cache"))
+    streamed = page_texts(build_from_definition(MANUALS / f"{name}.yaml", tmp_path / "streamed.pdf", now=now,
+                                                cache_dir=tmp_path / "cache", stream=True))
+
+    assert len(streamed) == len(cached)
+    # A streamed build has no page numbers to offer, so its table of contents is empty.
+    contents = next(index for index, text in enumerate(cached) if "TABLE OF CONTENTS" in text)
+    assert streamed[contents].split() == ["TABLE", "OF", "CONTENTS"]
+    assert streamed[:contents] + streamed[contents + 1:] == cached[:contents] + cached[contents + 1:]
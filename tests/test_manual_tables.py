@@ -0,0 +1,67 @@
+import io
+import re
+
+import pytest
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import A6
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+import manual_tables
+from manual_tables import FixedTable
+
+
+def build(*flowables):
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A6).build(list(flowables))
+    return PdfReader(buffer)
+
+
+def text(reader):
+    return "\n".join(page.extract_text() for page in reader.pages)
+
+
+@pytest.mark.parametrize("overflow", ["truncate", "wrap"])
+def test_row_without_columns(overflow):
+    table = FixedTable([[], ["a", "b"]], [100, 100], header=["A", "B"], overflow=overflow)
+    assert "a" in text(build(table))
+
+
+def test_wrapped_row_taller_than_a_frame_is_cut_short():
+    rows = [["first", "short"], ["tall", " ".join(["word"] * 2000)], ["last", "short"]]
+    table = FixedTable(rows, [60, 150], header=["Name", "Notes"], overflow="wrap")
+    reader = build(Paragraph("Intro", getSampleStyleSheet()["Normal"]), table)
+
+    content = text(reader)
+    assert "first" in content and "last" in content
+    assert "word..." in content
+    assert len(reader.pages) == 3  # no empty page before the cut row
+
+
+def test_public_text_calls_draw_the_same_rows(monkeypatch):
+    rows = [[f"Contact {number}", "a value that is wrapped over a few lines"] for number in range(60)]
+
+    def table():
+        return FixedTable(rows, [80, 100], header=["Name", "Notes"], overflow="wrap")
+
+    fast = text(build(table()))
+    monkeypatch.setattr(manual_tables, "_text_internals", lambda text: None)
+    assert text(build(table())) == fast
+
+
+def test_header_baseline_uses_the_bold_font_ascent():
+    from reportlab.pdfbase.pdfmetrics import getFont
+    from reportlab.pdfgen.canvas import Canvas
+
+    table = FixedTable([["body"]], [100], header=["Head"], font_name="Helvetica", bold_font="Times-Bold",
+                       font_size=20)
+    canv = Canvas(io.BytesIO(), pageCompression=0)
+    table.wrapOn(canv, 100, 500)
+    table.drawOn(canv, 0, 0)
+    # Each cell is placed with its own text matrix, at x = padding (4).
+    baselines = [float(y) for y in re.findall(r"1 0 0 1 4\.00 (\S+) Tm", canv.getpdfdata().decode("latin-1"))]
+
+    header, body = baselines
+    assert header == pytest.approx(table.height - 4 - getFont("Times-Bold").face.ascent * 20 / 1000, abs=0.01)
+    assert body == pytest.approx(table.height - table.header_height - 4 - getFont("Helvetica").face.ascent * 20 / 1000,
+                                 abs=0.01)
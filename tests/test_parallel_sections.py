@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+from manual_cache import CachedSection, build_sections
+from manual_definitions import build_from_definition
+
+
+MANUALS = Path(__file__).resolve().parent.parent / "manuals"
+
+
+def section_flowables(title, paragraphs):
+    styles = getSampleStyleSheet()
+    return [Paragraph(title, styles["Heading1"])] + [
+        Paragraph(f"{title} paragraph {number}", styles["Normal"]) for number in range(paragraphs)
+    ]
+
+
+def sections(count):
+    return [
+        CachedSection(f"section-{index}", lambda index=index: section_flowables(f"Section {index}", 80),
+                      title=f"Section {index}", shard=(section_flowables, (f"Section {index}", 80)))
+        for index in range(count)
+    ]
+
+
+def page_count(path):
+    from pypdf import PdfReader
+
+    return len(PdfReader(str(path)).pages)
+
+
+def test_build_sections_in_workers_without_profiler(tmp_path):
+    serial = SimpleDocTemplate(str(tmp_path / "serial.pdf"), pagesize=A4)
+    parallel = SimpleDocTemplate(str(tmp_path / "parallel.pdf"), pagesize=A4)
+
+    build_sections(serial, sections(4), "serial", cache_dir=tmp_path)
+    stats = build_sections(parallel, sections(4), "parallel", cache_dir=tmp_path, workers=2)
+
+    assert stats == {"sections": 4, "hits": 0, "misses": 4}
+    assert page_count(tmp_path / "parallel.pdf") == page_count(tmp_path / "serial.pdf") > 4
+
+
+def test_screenshot_manual_with_workers(tmp_path):
+    output = build_from_definition(MANUALS / "screenshot_manual.yaml", output_pdf=tmp_path / "manual.pdf",
+                                   cache_dir=tmp_path / "cache", workers=2, force=True)
+    assert page_count(output) > 0